@@ -0,0 +1,254 @@
+"""
+Пакетная загрузка отзывов и комментариев.
+
+Все связи пачки (произведения, отзывы, авторы, уже написанные отзывы)
+проверяются несколькими запросами на всю пачку в той же транзакции,
+что и вставка; строки вставляются через bulk_create, а рейтинг и кеш
+обновляются один раз на каждое затронутое произведение.
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, connection, transaction
+
+from reviews.models import Comment, Review, Title
+from reviews.ratings import change_title_rating
+from users.models import User
+
+from . import cache
+from .serializers import BulkCommentItemSerializer, BulkReviewItemSerializer
+
+
+def is_admin(user):
+    return user.role == 'admin' or user.is_superuser
+
+
+def _validate_items(items, serializer_class):
+    valid = {}
+    errors = {}
+    for index, item in enumerate(items):
+        serializer = serializer_class(data=item)
+        if serializer.is_valid():
+            valid[index] = dict(serializer.validated_data)
+        else:
+            errors[index] = serializer.errors
+    return valid, errors
+
+
+def _resolve_authors(valid, errors, user):
+    """Заменяет имя автора на id; указывать автора может только админ."""
+    usernames = {
+        item['author'] for item in valid.values() if 'author' in item
+    }
+    if usernames and not is_admin(user):
+        for index, item in list(valid.items()):
+            if 'author' in item:
+                errors[index] = {
+                    'author': ['Указывать автора может только администратор.']
+                }
+                del valid[index]
+        usernames = set()
+    authors = dict(
+        User.objects.filter(
+            username__in=usernames
+        ).values_list('username', 'id')
+    ) if usernames else {}
+    for index, item in list(valid.items()):
+        username = item.pop('author', None)
+        if username is None:
+            item['author_id'] = user.pk
+        elif username in authors:
+            item['author_id'] = authors[username]
+        else:
+            errors[index] = {'author': ['Пользователь не найден.']}
+            del valid[index]
+
+
+def _returns_bulk_ids():
+    return (
+        connection.features.can_return_ids_from_bulk_insert
+        or connection.vendor == 'sqlite'
+    )
+
+
+def _bulk_ids(objects):
+    """
+    Id строк, только что вставленных bulk_create.
+
+    SQLite не возвращает id из bulk_create; они берутся из
+    last_insert_rowid() своего соединения. После первой вставки
+    транзакция держит блокировку записи до конца, поэтому id пачки
+    идут подряд и заканчиваются этим значением.
+    """
+    if connection.features.can_return_ids_from_bulk_insert:
+        return [obj.pk for obj in objects]
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT last_insert_rowid()')
+        last = cursor.fetchone()[0]
+    return list(range(last - len(objects) + 1, last + 1))
+
+
+def _insert(model, objects):
+    """
+    Вставляет objects в текущей транзакции.
+
+    Обычно пачка вставляется одним bulk_create. Если СУБД не сообщает
+    id вставленных строк или пачка нарушила уникальность (такую же
+    строку успела вставить одновременная запись), объекты вставляются
+    по одному через save(), каждый в своей точке сохранения; рейтинг
+    и кеш тогда обновляют сигналы.
+
+    Возвращает id вставленных объектов по их позициям, позиции
+    отклонённых и признак вставки одним bulk_create.
+    """
+    if _returns_bulk_ids():
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(objects)
+                return dict(enumerate(_bulk_ids(objects))), [], True
+        except IntegrityError:
+            pass
+    ids = {}
+    rejected = []
+    for position, obj in enumerate(objects):
+        obj.pk = None
+        try:
+            with transaction.atomic():
+                obj.save(force_insert=True)
+        except IntegrityError:
+            rejected.append(position)
+        else:
+            ids[position] = obj.pk
+    return ids, rejected, False
+
+
+def _results(count, created, errors):
+    results = []
+    for index in range(count):
+        if index in created:
+            results.append(
+                {'index': index, 'status': 201, 'id': created[index]}
+            )
+        else:
+            results.append(
+                {'index': index, 'status': 400, 'errors': errors[index]}
+            )
+    return results
+
+
+DUPLICATE_REVIEW = {
+    'non_field_errors': ['Вы уже писали отзыв к данному произведению']
+}
+
+
+def _check_reviews(valid, errors):
+    """Отбрасывает отзывы к несуществующим и уже оценённым произведениям."""
+    title_ids = {item['title'] for item in valid.values()}
+    existing_titles = set(
+        Title.objects.filter(pk__in=title_ids).values_list('pk', flat=True)
+    )
+    author_ids = {item['author_id'] for item in valid.values()}
+    taken = set(
+        Review.objects.filter(
+            title_id__in=existing_titles, author_id__in=author_ids
+        ).values_list('author_id', 'title_id')
+    ) if existing_titles else set()
+
+    for index, item in list(valid.items()):
+        key = (item['author_id'], item['title'])
+        if item['title'] not in existing_titles:
+            errors[index] = {'title': ['Произведение не найдено.']}
+        elif key in taken:
+            errors[index] = DUPLICATE_REVIEW
+        else:
+            taken.add(key)
+            continue
+        del valid[index]
+
+
+def create_reviews(items, user):
+    valid, errors = _validate_items(items, BulkReviewItemSerializer)
+    _resolve_authors(valid, errors, user)
+
+    created = {}
+    totals = defaultdict(lambda: [0, 0])
+    with transaction.atomic():
+        _check_reviews(valid, errors)
+        indexes = list(valid)
+        reviews = [
+            Review(
+                title_id=item['title'],
+                author_id=item['author_id'],
+                text=item['text'],
+                score=item['score'],
+            )
+            for item in valid.values()
+        ]
+        ids, rejected, bulk = _insert(Review, reviews) if reviews else (
+            {}, [], False
+        )
+        for position in rejected:
+            errors[indexes[position]] = DUPLICATE_REVIEW
+        created = {
+            indexes[position]: review_id
+            for position, review_id in ids.items()
+        }
+        for position in ids:
+            totals[reviews[position].title_id][0] += reviews[position].score
+            totals[reviews[position].title_id][1] += 1
+        if bulk:
+            for title_id, (score_sum, count) in totals.items():
+                change_title_rating(title_id, score_sum, count)
+    if totals:
+        cache.invalidate(cache.TITLES_LIST, *(
+            namespace
+            for title_id in totals
+            for namespace in (
+                cache.title_namespace(title_id),
+                cache.reviews_namespace(title_id),
+            )
+        ))
+    return _results(len(items), created, errors)
+
+
+def create_comments(items, user):
+    valid, errors = _validate_items(items, BulkCommentItemSerializer)
+    _resolve_authors(valid, errors, user)
+
+    created = {}
+    with transaction.atomic():
+        review_ids = {item['review'] for item in valid.values()}
+        existing_reviews = set(
+            Review.objects.filter(
+                pk__in=review_ids
+            ).values_list('pk', flat=True)
+        )
+        for index, item in list(valid.items()):
+            if item['review'] not in existing_reviews:
+                errors[index] = {'review': ['Отзыв не найден.']}
+                del valid[index]
+        indexes = list(valid)
+        comments = [
+            Comment(
+                review_id=item['review'],
+                author_id=item['author_id'],
+                text=item['text'],
+            )
+            for item in valid.values()
+        ]
+        ids, rejected, _ = _insert(Comment, comments) if comments else (
+            {}, [], False
+        )
+        for position in rejected:
+            errors[indexes[position]] = {
+                'non_field_errors': ['Комментарий не сохранён.']
+            }
+        created = {
+            indexes[position]: comment_id
+            for position, comment_id in ids.items()
+        }
+    if created:
+        cache.invalidate(*(
+            cache.comments_namespace(review_id)
+            for review_id in {comment.review_id for comment in comments}
+        ))
+    return _results(len(items), created, errors)
@@ -0,0 +1,154 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+# Поколения пространств кеша. Поколение - это время последней записи
+# в наносекундах: при записи оно меняется, и все ключи и ETag,
+# построенные на старом значении, перестают совпадать.
+# При нескольких процессах кеш API_RESPONSE_CACHE должен быть общим.
+TITLES_LIST = 'titles-list'
+TITLES_ALL = 'titles-all'
+GENRES = 'genres'
+CATEGORIES = 'categories'
+AUTHORS = 'authors'
+
+VARY_HEADERS = ('Accept', 'Authorization')
+
+
+def get_response_cache():
+    return caches[getattr(settings, 'API_RESPONSE_CACHE', 'default')]
+
+
+def title_namespace(title_id):
+    return f'title:{title_id}'
+
+
+def reviews_namespace(title_id):
+    return f'reviews:{title_id}'
+
+
+def comments_namespace(review_id):
+    return f'comments:{review_id}'
+
+
+def generation_key(namespace):
+    return f'api-generation:{namespace}'
+
+
+def get_generations(namespaces):
+    cache = get_response_cache()
+    keys = [generation_key(namespace) for namespace in namespaces]
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        # Вытесненное или ещё не созданное поколение начинается заново
+        # с текущего времени, поэтому не совпадёт ни с одним старым.
+        now = time.time_ns()
+        for key in missing:
+            cache.add(key, now, None)
+        found.update(cache.get_many(missing))
+    return [found.get(key, 0) for key in keys]
+
+
+def _new_generations(namespaces):
+    now = time.time_ns()
+    get_response_cache().set_many(
+        {generation_key(namespace): now for namespace in namespaces}, None
+    )
+
+
+def invalidate(*namespaces):
+    """
+    Сбрасывает все закешированные ответы указанных пространств.
+
+    Поколения меняются после фиксации текущей транзакции: иначе
+    параллельный GET успел бы прочитать ещё старые строки
+    и закешировать их под новым поколением.
+    """
+    transaction.on_commit(lambda: _new_generations(namespaces))
+
+
+def response_fingerprint(request, namespaces, generations):
+    query = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    )
+    # HTML Browsable API и JSON по одному адресу - разные ответы.
+    raw = repr((
+        request.get_host(), request.path, query,
+        request.accepted_media_type, namespaces, generations
+    ))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+class CachedResponseMixin:
+    """
+    Кеширует ответы list и поддерживает условные GET-запросы.
+
+    ETag и Last-Modified вычисляются по адресу со всеми параметрами
+    запроса, выбранному формату ответа и поколениям пространств,
+    от которых зависит ответ (см. api.signals), поэтому
+    на If-None-Match/If-Modified-Since ответ 304 отдаётся без обращения
+    к БД и сериализации. Ответ помечается Vary: Accept, Authorization.
+    При cache_responses = False сам ответ не кешируется.
+    """
+
+    list_cache_namespaces = ()
+    cache_responses = True
+
+    def get_cache_namespaces(self):
+        return self.list_cache_namespaces
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        namespaces = self.get_cache_namespaces()
+        generations = get_generations(namespaces)
+        fingerprint = response_fingerprint(request, namespaces, generations)
+        etag = quote_etag(fingerprint)
+        last_modified = max(generations, default=0) // 10 ** 9 or None
+
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if not_modified is not None:
+            patch_vary_headers(not_modified, VARY_HEADERS)
+            return not_modified
+
+        cache = get_response_cache()
+        key = 'api-response:' + fingerprint
+        cached = cache.get(key) if self.cache_responses else None
+        if cached is not None:
+            response = Response(cached)
+        else:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            if self.cache_responses:
+                cache.set(
+                    key,
+                    response.data,
+                    getattr(settings, 'API_RESPONSE_CACHE_TIMEOUT', 60)
+                )
+        response['ETag'] = etag
+        patch_vary_headers(response, VARY_HEADERS)
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+    """Кеширует также ответы retrieve."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
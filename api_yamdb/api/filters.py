@@ -1,8 +1,14 @@
+from django.db.models import Case, IntegerField, Value, When
 from django_filters import rest_framework as filters
+from rest_framework.filters import BaseFilterBackend
 
+from reviews import search
 from reviews.models import Title
 
 
+SEARCH_RANK = 'search_rank'
+
+
 class TitleFilter(filters.FilterSet):
     name = filters.CharFilter(field_name='name', lookup_expr='contains')
     category = filters.CharFilter(field_name='category__slug',
@@ -12,3 +18,37 @@ class TitleFilter(filters.FilterSet):
     class Meta:
         model = Title
         fields = ('name', 'category', 'genre', 'year',)
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    Полнотекстовый поиск по параметру ?q= (см. reviews.search).
+
+    Каждое слово запроса ищется как префикс, результаты
+    упорядочены по релевантности: место в выдаче хранится
+    в аннотации SEARCH_RANK, по ней же идёт пагинация по курсору
+    (см. api.mixins.CursorPaginationMixin).
+    """
+
+    search_param = 'q'
+
+    @classmethod
+    def is_searching(cls, request):
+        return bool(request.query_params.get(cls.search_param, '').strip())
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        ids = search.search(view.search_kind, query)
+        if not ids:
+            return queryset.annotate(
+                **{SEARCH_RANK: Value(0, output_field=IntegerField())}
+            ).none()
+        rank = Case(
+            *[When(pk=pk, then=position) for position, pk in enumerate(ids)],
+            output_field=IntegerField()
+        )
+        return queryset.filter(pk__in=ids).annotate(
+            **{SEARCH_RANK: rank}
+        ).order_by(SEARCH_RANK)
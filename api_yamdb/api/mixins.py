@@ -1,5 +1,10 @@
 from rest_framework import viewsets, mixins
 
+from core import profiling
+
+from .filters import SEARCH_RANK, FullTextSearchFilter
+from .pagination import KeysetPagination
+
 
 class ListCreateDeleteViewSet(mixins.ListModelMixin,
                               mixins.CreateModelMixin,
@@ -14,3 +19,104 @@ class CreateViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
     """Вьюсет только для создания объекта."""
 
     pass
+
+
+class CursorPaginationMixin:
+    """
+    Включает пагинацию по курсору параметром запроса ?pagination=cursor.
+
+    По умолчанию используется обычная постраничная пагинация.
+    Результаты полнотекстового поиска листаются в порядке
+    релевантности: место в выдаче уникально и само служит ключом.
+    """
+
+    cursor_ordering = ('-id',)
+    cursor_query_param = 'cursor'
+    pagination_query_param = 'pagination'
+
+    def use_cursor_pagination(self):
+        params = self.request.query_params
+        return (
+            params.get(self.pagination_query_param) == 'cursor'
+            or self.cursor_query_param in params
+        )
+
+    def get_cursor_ordering(self):
+        if getattr(self, 'search_kind', None) and (
+            FullTextSearchFilter.is_searching(self.request)
+        ):
+            return (SEARCH_RANK,)
+        return self.cursor_ordering
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.use_cursor_pagination():
+                self._paginator = KeysetPagination(self.get_cursor_ordering())
+            else:
+                self._paginator = super().paginator
+        return self._paginator
+
+
+class ProfiledViewMixin:
+    """
+    Отмечает в профиле запроса (см. core.profiling) время
+    аутентификации, проверки прав и окончание работы представления.
+    """
+
+    def perform_authentication(self, request):
+        with profiling.timed('auth'):
+            super().perform_authentication(request)
+
+    def check_permissions(self, request):
+        with profiling.timed('permissions'):
+            super().check_permissions(request)
+
+    def check_object_permissions(self, request, obj):
+        with profiling.timed('permissions'):
+            super().check_object_permissions(request, obj)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        profiling.mark_view_finished()
+        return response
+
+
+class ProfiledSerializerMixin:
+    """Учитывает время сериализации в профиле запроса."""
+
+    def to_representation(self, instance):
+        with profiling.timed('serializer'):
+            return super().to_representation(instance)
+
+
+class ValuesReadMixin:
+    """
+    Отдаёт list и retrieve через values_serializer_class.
+
+    Для GET и HEAD отфильтрованный queryset превращается в values(), а строки
+    выводит лёгкий сериализатор (см. api.serializers.ValuesSerializer).
+    Остальные запросы, в том числе формы Browsable API, используют
+    обычные сериализаторы и объекты моделей.
+    """
+
+    values_serializer_class = None
+
+    def use_values(self):
+        return (
+            self.action in ('list', 'retrieve')
+            and self.request.method in ('GET', 'HEAD')
+        )
+
+    def get_serializer_class(self):
+        if self.use_values():
+            return self.values_serializer_class
+        return super().get_serializer_class()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.use_values():
+            return self.values_serializer_class.values(queryset)
+        return queryset
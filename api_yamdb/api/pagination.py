@@ -0,0 +1,150 @@
+import base64
+import json
+from collections import OrderedDict
+from datetime import date
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def _field_name(ordering_field):
+    return ordering_field.lstrip('-')
+
+
+def _encode_value(value):
+    # Даты целиком, с микросекундами: иначе строка на границе
+    # страницы не совпадёт сама с собой.
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} нельзя записать в курсор')
+
+
+def _reverse(ordering):
+    return tuple(
+        _field_name(field) if field.startswith('-') else f'-{field}'
+        for field in ordering
+    )
+
+
+class KeysetPagination(BasePagination):
+    """
+    Постраничный вывод по курсору.
+
+    Курсор хранит значения всех полей сортировки крайней строки
+    страницы, и следующая страница выбирается условием вида
+    (name, id) > (name, id) последней строки. Поэтому выборка страницы
+    не требует ни COUNT(*), ни OFFSET, в том числе при повторяющихся
+    значениях первого поля. Последнее поле сортировки (id) должно
+    быть уникальным.
+    """
+
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def __init__(self, ordering):
+        self.ordering = tuple(ordering)
+        self.page_size = api_settings.PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        cursor = self.decode_cursor(request)
+        backwards = bool(cursor and cursor['backwards'])
+        ordering = _reverse(self.ordering) if backwards else self.ordering
+
+        queryset = queryset.order_by(*ordering)
+        if cursor is not None:
+            queryset = queryset.filter(self.after(ordering, cursor['values']))
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, cursor is not None
+
+        self.next_position = (
+            self.position(rows[-1]) if has_next and rows else None
+        )
+        self.previous_position = (
+            self.position(rows[0]) if has_previous and rows else None
+        )
+        return rows
+
+    @staticmethod
+    def after(ordering, values):
+        """Условие «строка идёт после values» для сортировки ordering."""
+        parts = []
+        for index, field in enumerate(ordering):
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal = {
+                _field_name(previous): value
+                for previous, value in zip(ordering[:index], values)
+            }
+            parts.append(Q(
+                **equal, **{f'{_field_name(field)}__{lookup}': values[index]}
+            ))
+        return reduce(or_, parts)
+
+    def position(self, row):
+        if isinstance(row, dict):
+            return [row[_field_name(field)] for field in self.ordering]
+        return [getattr(row, _field_name(field)) for field in self.ordering]
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            values = cursor['values']
+            backwards = bool(cursor.get('backwards'))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return {'values': values, 'backwards': backwards}
+
+    def encode_cursor(self, values, backwards=False):
+        cursor = {'values': values}
+        if backwards:
+            cursor['backwards'] = True
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(cursor, default=_encode_value).encode()
+        ).decode()
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, backwards=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
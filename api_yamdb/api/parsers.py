@@ -0,0 +1,38 @@
+import codecs
+from io import BytesIO
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from .renderers import FastJSONRenderer, orjson, use_orjson
+
+# orjson читает целые за пределами 64 бит как float, json - как int:
+# такие тела (19 цифр подряд и больше) разбираются json.
+_DIGITS_TO_ZERO = bytes.maketrans(b'123456789', b'000000000')
+_LONG_NUMBER = b'0' * 19
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser, который разбирает UTF-8 через orjson, если тот установлен.
+
+    Всё, что orjson отклоняет или читает иначе (очень большие целые,
+    одиночные суррогаты, NaN при STRICT_JSON = False, ошибки
+    синтаксиса), разбирается обычным json, поэтому результат и сообщения
+    об ошибках совпадают с JSONParser.
+    """
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if not use_orjson() or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read() if stream is not None else b''
+        if _LONG_NUMBER not in body.translate(_DIGITS_TO_ZERO):
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(BytesIO(body), media_type, parser_context)
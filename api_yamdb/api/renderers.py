@@ -0,0 +1,103 @@
+from django.conf import settings
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Числа с плавающей точкой, которые orjson записывает иначе, чем json:
+# 1e16 вместо 1e+16 и 0.00001 вместо 1e-05. Совпадение внутри строки
+# лишь отправляет ответ в json, на результат это не влияет. Цифры
+# заменяются нулями, чтобы искать подстроку, а не регулярное выражение.
+_DIGITS_TO_ZERO = bytes.maketrans(b'123456789', b'000000000')
+
+
+def _float_mismatch(ret):
+    return b'.0000' in ret or b'0e' in ret.translate(_DIGITS_TO_ZERO)
+
+
+_encoder = encoders.JSONEncoder()
+
+
+def use_orjson():
+    """Кодировать ли JSON через orjson (настройка API_JSON_BACKEND)."""
+    backend = getattr(settings, 'API_JSON_BACKEND', 'auto')
+    if backend == 'orjson' and orjson is None:
+        raise ImportError(
+            'API_JSON_BACKEND = "orjson", но orjson не установлен'
+        )
+    return orjson is not None and backend in ('auto', 'orjson')
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer, который кодирует через orjson, если тот установлен.
+
+    Результат побайтно совпадает с JSONRenderer: типы, которые orjson
+    записывает по-своему (даты, время), передаются кодировщику DRF,
+    а ответы с отступами, числами вида 1e+16 и всем, что orjson
+    не умеет, кодируются обычным json. Единственное отличие -
+    NaN и бесконечность orjson записывает как null, а не падает.
+    """
+
+    def can_use_orjson(self, accepted_media_type, renderer_context):
+        return (
+            use_orjson()
+            and self.compact
+            and not self.ensure_ascii
+            and self.get_indent(accepted_media_type, renderer_context) is None
+        )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        ret = None
+        if data is not None and self.can_use_orjson(
+            accepted_media_type, renderer_context or {}
+        ):
+            ret = self.render_orjson(data)
+        if ret is None:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        return ret
+
+    @staticmethod
+    def render_orjson(data):
+        """JSON от orjson или None, если он разошёлся бы с json."""
+        try:
+            ret = orjson.dumps(
+                data,
+                default=_encoder.default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME
+            )
+        except (orjson.JSONEncodeError, TypeError):
+            return None
+        if _float_mismatch(ret):
+            return None
+        # Как и JSONRenderer, экранируем U+2028 и U+2029.
+        return ret.replace(
+            b'\xe2\x80\xa8', b'\\u2028'
+        ).replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class PassthroughRenderer(BaseRenderer):
+    """
+    Рендерер для потоковых ответов, которые формируются во view.
+
+    Принимает любой Accept, чтобы согласование формата DRF
+    не отклоняло запросы text/csv и application/x-ndjson.
+    Потоковый ответ не проходит через рендерер, поэтому сюда
+    попадают только ответы DRF с ошибками: они отдаются в JSON.
+    """
+
+    media_type = '*/*'
+    format = None
+    fallback = FastJSONRenderer()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        response = renderer_context.get('response')
+        if response is not None:
+            response['Content-Type'] = self.fallback.media_type
+        return self.fallback.render(data, None, renderer_context)
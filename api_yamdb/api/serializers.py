@@ -1,12 +1,16 @@
+from collections import defaultdict
 from datetime import datetime
 from django.forms import ValidationError
 from rest_framework import serializers
 
-from reviews.models import Category, Comment, Genre, Review, Title
+from core import profiling
+from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
 from users.models import User
 
+from .mixins import ProfiledSerializerMixin
 
-class CategorySerializer(serializers.ModelSerializer):
+
+class CategorySerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     """Сериализатор категорий."""
 
     class Meta:
@@ -14,7 +18,7 @@ class CategorySerializer(serializers.ModelSerializer):
         model = Category
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     """Сериализатор жанров."""
 
     class Meta:
@@ -30,12 +34,13 @@ class GenreForTitle(serializers.ModelSerializer):
         model = Genre
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(ProfiledSerializerMixin,
+                          serializers.ModelSerializer):
     """Сериализатор для просмотра произведений."""
 
     genre = GenreSerializer(read_only=True, many=True)
     category = CategorySerializer(read_only=True)
-    rating = serializers.IntegerField()
+    rating = serializers.IntegerField(read_only=True)
 
     class Meta:
         fields = ('id',
@@ -54,7 +59,8 @@ class TitleReadSerializer(serializers.ModelSerializer):
         return value
 
 
-class TitleWriteSerializer(serializers.ModelSerializer):
+class TitleWriteSerializer(ProfiledSerializerMixin,
+                           serializers.ModelSerializer):
     """Сериализатор для создания произведений."""
 
     genre = serializers.SlugRelatedField(
@@ -68,10 +74,15 @@ class TitleWriteSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        fields = ('id',
+                  'name',
+                  'year',
+                  'description',
+                  'genre',
+                  'category')
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     """Сериализатор отзывов."""
 
     author = serializers.SlugRelatedField(
@@ -103,7 +114,24 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class BulkReviewItemSerializer(serializers.Serializer):
+    """Отзыв в пакетной загрузке; связи проверяются для всей пачки."""
+
+    title = serializers.IntegerField()
+    text = serializers.CharField()
+    score = serializers.IntegerField(min_value=1, max_value=10)
+    author = serializers.CharField(required=False)
+
+
+class BulkCommentItemSerializer(serializers.Serializer):
+    """Комментарий в пакетной загрузке."""
+
+    review = serializers.IntegerField()
+    text = serializers.CharField()
+    author = serializers.CharField(required=False)
+
+
+class CommentSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     """Сериализатор комментариев."""
 
     review = serializers.SlugRelatedField(
@@ -120,7 +148,7 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     """Сериализатор пользователей."""
 
     class Meta:
@@ -156,3 +184,122 @@ class UserSignupSerializer(serializers.ModelSerializer):
         if value is None or exists:
             raise serializers.ValidationError('Заполните поля регистрации!')
         return value
+
+
+class ValuesSerializer:
+    """
+    Сериализатор только для чтения строк queryset.values().
+
+    Выводит то же, что ModelSerializer в list и retrieve, но без
+    объектов полей и моделей: словари собираются прямо из строк
+    (см. api.mixins.ValuesReadMixin). Подклассы задают values_fields
+    и, если поля нужно переименовать или сгруппировать, represent(row);
+    связанные данные страницы догружает prepare(rows).
+    """
+
+    values_fields = ()
+
+    def __init__(self, instance=None, many=False, context=None, **kwargs):
+        self.instance = instance
+        self.many = many
+        self.context = context or {}
+
+    @classmethod
+    def values(cls, queryset):
+        # Аннотации (например, место в выдаче поиска) остаются в строках:
+        # по ним может идти пагинация по курсору.
+        return queryset.prefetch_related(None).values(
+            *cls.values_fields, *queryset.query.annotation_select
+        )
+
+    def prepare(self, rows):
+        pass
+
+    def represent(self, row):
+        # По умолчанию поля values_fields выводятся как есть.
+        return {field: row[field] for field in self.values_fields}
+
+    @property
+    def data(self):
+        with profiling.timed('serializer'):
+            if not self.many:
+                self.prepare([self.instance])
+                return self.represent(self.instance)
+            rows = list(self.instance)
+            self.prepare(rows)
+            return [self.represent(row) for row in rows]
+
+
+# Поле DRF для дат: формат и часовой пояс как у ModelSerializer.
+_pub_date = serializers.DateTimeField().to_representation
+
+
+class TitleValuesSerializer(ValuesSerializer):
+    """Вывод TitleReadSerializer; жанры страницы - одним запросом."""
+
+    values_fields = (
+        'id', 'name', 'year', 'rating_sum', 'rating_count', 'description',
+        'category__name', 'category__slug',
+    )
+
+    def prepare(self, rows):
+        # Порядок жанров как у prefetch_related('genre'): Genre.Meta.ordering.
+        self.genres = defaultdict(list)
+        if not rows:
+            return
+        for title_id, name, slug in TitleGenre.objects.filter(
+            title_id__in=[row['id'] for row in rows]
+        ).order_by('-genre_id').values_list(
+            'title_id', 'genre__name', 'genre__slug'
+        ):
+            self.genres[title_id].append({'name': name, 'slug': slug})
+
+    def represent(self, row):
+        count = row['rating_count']
+        category = None
+        if row['category__slug'] is not None:
+            category = {
+                'name': row['category__name'],
+                'slug': row['category__slug'],
+            }
+        return {
+            'id': row['id'],
+            'name': row['name'],
+            'year': row['year'],
+            'rating': int(row['rating_sum'] / count) if count else None,
+            'description': row['description'],
+            'genre': self.genres.get(row['id'], []),
+            'category': category,
+        }
+
+
+class ReviewValuesSerializer(ValuesSerializer):
+    """Вывод ReviewSerializer."""
+
+    values_fields = ('id', 'text', 'author__username', 'score', 'pub_date')
+
+    def represent(self, row):
+        return {
+            'id': row['id'],
+            'text': row['text'],
+            'author': row['author__username'],
+            'score': row['score'],
+            'pub_date': _pub_date(row['pub_date']),
+        }
+
+
+class CommentValuesSerializer(ValuesSerializer):
+    """Вывод CommentSerializer."""
+
+    values_fields = (
+        'id', 'review__text', 'author__username', 'text', 'pub_date'
+    )
+
+    def represent(self, row):
+        return {
+            'id': row['id'],
+            'review': row['review__text'],
+            'author': row['author__username'],
+            'text': row['text'],
+            'pub_date': _pub_date(row['pub_date']),
+        }
@@ -0,0 +1,75 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+from users.models import User
+
+from . import cache
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def title_changed(sender, instance, **kwargs):
+    cache.invalidate(cache.TITLES_LIST, cache.title_namespace(instance.pk))
+
+
+@receiver(post_save, sender=TitleGenre)
+@receiver(post_delete, sender=TitleGenre)
+def title_genre_changed(sender, instance, **kwargs):
+    cache.invalidate(
+        cache.TITLES_LIST, cache.title_namespace(instance.title_id)
+    )
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_set(sender, instance, action, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if isinstance(instance, Title):
+        cache.invalidate(cache.TITLES_LIST, cache.title_namespace(instance.pk))
+    else:
+        cache.invalidate(cache.TITLES_LIST, cache.TITLES_ALL)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def review_changed(sender, instance, **kwargs):
+    # Изменение оценки меняет рейтинг произведения,
+    # а текст отзыва выводится в его комментариях.
+    cache.invalidate(
+        cache.TITLES_LIST,
+        cache.title_namespace(instance.title_id),
+        cache.reviews_namespace(instance.title_id),
+        cache.comments_namespace(instance.pk),
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    cache.invalidate(cache.comments_namespace(instance.review_id))
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    # Из пользователя в отзывах и комментариях выводится только имя;
+    # у нового пользователя их ещё нет.
+    if not created and instance.username_changed():
+        cache.invalidate(cache.AUTHORS)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    cache.invalidate(cache.AUTHORS)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def genre_changed(sender, instance, **kwargs):
+    cache.invalidate(cache.GENRES, cache.TITLES_LIST, cache.TITLES_ALL)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    cache.invalidate(cache.CATEGORIES, cache.TITLES_LIST, cache.TITLES_ALL)
@@ -24,9 +24,24 @@ router_v1.register(
     r'titles/(?P<title_id>\d+)/reviews/(?P<review_id>\d+)/comments',
     views.CommentViewSet,
     basename='comments')
+router_v1.register(
+    'reviews/bulk',
+    views.BulkReviewViewSet,
+    basename='reviews-bulk'
+)
+router_v1.register(
+    'comments/bulk',
+    views.BulkCommentViewSet,
+    basename='comments-bulk'
+)
 
 
 urlpatterns = [
     path('v1/', include(router_v1.urls)),
-    path('v1/auth/token/', views.get_tokens_for_user, name='token')
+    path('v1/auth/token/', views.get_tokens_for_user, name='token'),
+    path(
+        'v1/export/<slug:table>.<slug:output_format>',
+        views.export_table,
+        name='export'
+    ),
 ]
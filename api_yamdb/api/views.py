@@ -1,111 +1,260 @@
 from rest_framework import status, filters
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.core.mail import send_mail
+from django.db import transaction
 from rest_framework import viewsets, filters
-from rest_framework.decorators import api_view, permission_classes, action
-from rest_framework.permissions import AllowAny
+from rest_framework.exceptions import (NotAuthenticated, NotFound,
+                                       PermissionDenied, ValidationError)
+from rest_framework.decorators import (action, api_view, permission_classes,
+                                       renderer_classes, throttle_classes)
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
-from django.contrib.auth.tokens import default_token_generator
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Avg
 
+from core import export
+from core.outbox import enqueue_email
+from reviews import facets, search
 from reviews.models import Title, Review, Genre, Category
-from api import serializers, permissions, mixins
+from api import bulk, cache, serializers, permissions, mixins
+from api.cache import CachedResponseMixin, CachedRetrieveMixin
+from users.confirmation import check_code, consume_code, create_code
 from users.models import User
-from .filters import TitleFilter
+from users.throttling import IPThrottle, UsernameThrottle
+from users.tokens import RoleAccessToken
+from .filters import FullTextSearchFilter, TitleFilter
+from .renderers import PassthroughRenderer
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(mixins.ProfiledViewMixin,
+                   mixins.ValuesReadMixin,
+                   CachedRetrieveMixin,
+                   mixins.CursorPaginationMixin,
+                   viewsets.ModelViewSet):
     """
     Обработка операций с произведениями.
     """
 
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')).order_by('name')
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre').order_by('name', 'id')
+    cursor_ordering = ('name', 'id')
     permission_classes = (permissions.IsAdminOrReadOnly, )
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (DjangoFilterBackend, FullTextSearchFilter)
     filterset_class = TitleFilter
+    search_kind = search.TITLE
 
-    def get_serializer_class(self):
-        if self.action in ('list', 'retrieve'):
-            return serializers.TitleReadSerializer
-        return serializers.TitleWriteSerializer
+    # Чтение (list, retrieve) выводит TitleValuesSerializer в формате
+    # TitleReadSerializer.
+    serializer_class = serializers.TitleWriteSerializer
+    values_serializer_class = serializers.TitleValuesSerializer
 
-
-class ReviewViewSet(viewsets.ModelViewSet):
+    def get_cache_namespaces(self):
+        if self.action == 'retrieve':
+            return (
+                cache.TITLES_ALL, cache.title_namespace(self.kwargs['pk'])
+            )
+        return (cache.TITLES_LIST,)
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """
+        Количество произведений по жанрам, категориям и годам
+        для текущих фильтров (см. reviews.facets).
+        """
+        return self.cached_response(self.count_facets, request)
+
+    def count_facets(self, request):
+        filterset = self.filterset_class(request.query_params)
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        params = filterset.form.cleaned_data
+        dimensions = {
+            'category': params.get('category'),
+            'genre': params.get('genre'),
+            'year': params.get('year'),
+        }
+        if not params.get('name') and not request.query_params.get('q'):
+            return Response(facets.facet_counts(**dimensions))
+        # По названию и поиску счётчики не хранятся:
+        # считаются по отобранным произведениям.
+        titles = Title.objects.all()
+        if params.get('name'):
+            titles = titles.filter(name__contains=params['name'])
+        titles = FullTextSearchFilter().filter_queryset(request, titles, self)
+        return Response(facets.count_title_facets(titles, **dimensions))
+
+
+class ReviewViewSet(mixins.ProfiledViewMixin,
+                    mixins.ValuesReadMixin,
+                    CachedRetrieveMixin,
+                    mixins.CursorPaginationMixin,
+                    viewsets.ModelViewSet):
     """
     Обработка операций с отзывами.
     """
 
+    cache_responses = False
+    cursor_ordering = ('-pub_date', '-id')
     serializer_class = serializers.ReviewSerializer
+    values_serializer_class = serializers.ReviewValuesSerializer
     permission_classes = (permissions.IsStaffOrAuthorOrReadOnly, )
 
+    def get_title(self):
+        """Произведение из адреса; загружается один раз за запрос."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title.objects.only('id'), id=self.kwargs.get('title_id')
+            )
+        return self._title
+
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        return title.reviews.all()
+        return self.get_title().reviews.select_related('author').only(
+            'id', 'text', 'score', 'pub_date', 'title_id', 'author__username'
+        )
+
+    def get_cache_namespaces(self):
+        return (
+            cache.reviews_namespace(self.kwargs.get('title_id')),
+            cache.AUTHORS,
+        )
 
     def perform_create(self, serializer):
         serializer.save(
             author=self.request.user,
-            title=get_object_or_404(
-                Title,
-                id=self.kwargs.get('title_id')
+            title=self.get_title()
+        )
+
+
+class BulkCreateViewSet(mixins.ProfiledViewMixin, viewsets.ViewSet):
+    """
+    Пакетное создание объектов из списка.
+
+    Отвечает списком результатов по каждому элементу: 201 с id
+    или 400 с ошибками. Общий статус 201, если созданы все элементы,
+    иначе 207.
+    """
+
+    permission_classes = (IsAuthenticated, )
+    create_items = None
+
+    def create(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                {'detail': 'Ожидается непустой список объектов.'},
+                status=status.HTTP_400_BAD_REQUEST
             )
+        if len(items) > settings.BULK_MAX_ITEMS:
+            return Response(
+                {'detail': f'Не больше {settings.BULK_MAX_ITEMS} объектов.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        results = self.create_items(items, request.user)
+        all_created = all(
+            result['status'] == status.HTTP_201_CREATED for result in results
         )
+        return Response(
+            {'results': results},
+            status=(
+                status.HTTP_201_CREATED if all_created
+                else status.HTTP_207_MULTI_STATUS
+            )
+        )
+
+
+class BulkReviewViewSet(BulkCreateViewSet):
+    """Пакетная загрузка отзывов."""
+
+    create_items = staticmethod(bulk.create_reviews)
+
 
+class BulkCommentViewSet(BulkCreateViewSet):
+    """Пакетная загрузка комментариев."""
 
-class GenreViewSet(mixins.ListCreateDeleteViewSet):
+    create_items = staticmethod(bulk.create_comments)
+
+
+class GenreViewSet(mixins.ProfiledViewMixin,
+                   CachedResponseMixin,
+                   mixins.ListCreateDeleteViewSet):
     """
     Обработка операций с жанрами.
     """
 
+    list_cache_namespaces = (cache.GENRES,)
     queryset = Genre.objects.all()
     serializer_class = serializers.GenreSerializer
     permission_classes = (permissions.IsAdminOrReadOnly, )
     lookup_field = 'slug'
-    filter_backends = (filters.SearchFilter, )
+    filter_backends = (filters.SearchFilter, FullTextSearchFilter)
     search_fields = ('name',)
+    search_kind = search.GENRE
 
 
-class CategoryViewSet(mixins.ListCreateDeleteViewSet):
+class CategoryViewSet(mixins.ProfiledViewMixin,
+                      CachedResponseMixin,
+                      mixins.ListCreateDeleteViewSet):
     """
     Обработка операций с категориями.
     """
 
+    list_cache_namespaces = (cache.CATEGORIES,)
     queryset = Category.objects.all()
     serializer_class = serializers.CategorySerializer
     permission_classes = (permissions.IsAdminOrReadOnly, )
     lookup_field = 'slug'
-    filter_backends = (filters.SearchFilter,)
+    filter_backends = (filters.SearchFilter, FullTextSearchFilter)
     search_fields = ('name',)
+    search_kind = search.CATEGORY
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(mixins.ProfiledViewMixin,
+                     mixins.ValuesReadMixin,
+                     CachedRetrieveMixin,
+                     mixins.CursorPaginationMixin,
+                     viewsets.ModelViewSet):
     """
     Обработка операций с комментариями.
     """
 
+    cache_responses = False
+    cursor_ordering = ('-pub_date', '-id')
     serializer_class = serializers.CommentSerializer
+    values_serializer_class = serializers.CommentValuesSerializer
     permission_classes = (permissions.IsStaffOrAuthorOrReadOnly, )
 
+    def get_review(self):
+        """Отзыв из адреса, проверенный вместе с произведением."""
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review.objects.only('id', 'text', 'title_id'),
+                id=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id')
+            )
+        return self._review
+
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, id=review_id)
-        if review.title == title:
-            return review.comments.all()
+        # Через менеджер отзыва у комментариев уже заполнено поле review,
+        # автор подгружается тем же запросом.
+        return self.get_review().comments.select_related('author').only(
+            'id', 'text', 'pub_date', 'review_id', 'author__username'
+        )
+
+    def get_cache_namespaces(self):
+        return (
+            cache.comments_namespace(self.kwargs.get('review_id')),
+            cache.AUTHORS,
+        )
 
     def perform_create(self, serializer):
         serializer.save(
             author=self.request.user,
-            review=get_object_or_404(Review, id=self.kwargs.get('review_id'))
+            review=self.get_review()
         )
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(mixins.ProfiledViewMixin, viewsets.ModelViewSet):
     """
     Обработка операций с пользователями.
     """
@@ -115,15 +264,24 @@ class UserViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         if self.request.path == '/api/v1/users/me/':
-            return User.objects.get(id=self.request.user.id)
+            return self.request.user
         else:
             return User.objects.all()
 
     def get_object(self):
         if self.request.path == '/api/v1/users/me/':
-            return User.objects.get(id=self.request.user.id)
+            return self.get_me()
         return super().get_object()
 
+    def get_me(self):
+        """
+        Текущий пользователь со всеми полями: пользователь из токена
+        (users.tokens.token_user) загружен не полностью.
+        """
+        if self.request.user.get_deferred_fields():
+            self.request.user = User.objects.get(pk=self.request.user.pk)
+        return self.request.user
+
     def get_permissions(self):
         if self.request.path == '/api/v1/users/me/':
             permission_classes = (permissions.IsUser, )
@@ -146,8 +304,7 @@ class UserViewSet(viewsets.ModelViewSet):
         admin = request.user.role == 'admin' or request.user.is_superuser
 
         if 'role' in request.data and (not admin or not_valid):
-            user = User.objects.get(id=self.request.user.id)
-            serializer = self.get_serializer(user)
+            serializer = self.get_serializer(self.get_me())
             return Response(
                 serializer.data,
                 status=status.HTTP_400_BAD_REQUEST)
@@ -157,8 +314,7 @@ class UserViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['get', 'patch'], url_path='me')
     def my_profile(self, request):
-        user = User.objects.get(id=self.request.user.id)
-        serializer = self.get_serializer(user)
+        serializer = self.get_serializer(self.get_me())
         return Response(serializer.data)
 
 
@@ -167,6 +323,7 @@ class UserSignup(mixins.CreateViewSet):
     serializer_class = serializers.UserSignupSerializer
     queryset = User.objects.all()
     permission_classes = (AllowAny, )
+    throttle_classes = (IPThrottle, )
     http_method_names = ['post']
 
     def create(self, request):
@@ -174,36 +331,59 @@ class UserSignup(mixins.CreateViewSet):
 
         serializer = serializers.UserSignupSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
-        user = User.objects.get(
-            username=serializer.validated_data['username']
-        )
-        code = default_token_generator.make_token(user)
-        user.confirmation_code = code
-        user.save()
-        user_email = user.email
-        send_mail(
-            'Код подтверждения',
-            f'Используй этот код {code}',
-            'auth@yamdb.ru',
-            [f'{user_email}'],
-        )
+        with transaction.atomic():
+            user = serializer.save()
+            code = create_code(user)
+            enqueue_email(
+                'Код подтверждения',
+                f'Используй этот код {code}',
+                'auth@yamdb.ru',
+                user.email,
+            )
         return Response(serializer.data)
 
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@renderer_classes([PassthroughRenderer])
+def export_table(request, table, output_format):
+    """Потоковая выгрузка таблицы в csv или NDJSON."""
+    if table not in export.EXPORTS or output_format not in export.FORMATS:
+        raise NotFound()
+    if export.EXPORTS[table].private:
+        if not request.user.is_authenticated:
+            raise NotAuthenticated()
+        if not bulk.is_admin(request.user):
+            raise PermissionDenied()
+    content_type = {
+        'csv': 'text/csv; charset=utf-8',
+        'ndjson': 'application/x-ndjson; charset=utf-8',
+    }[output_format]
+    response = StreamingHttpResponse(
+        export.iter_export(table, output_format), content_type=content_type
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{table}.{output_format}"'
+    )
+    return response
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([IPThrottle, UsernameThrottle])
 def get_tokens_for_user(request):
     """Создание JWT-токена."""
     if 'username' in request.data:
+        # Пользователь, код подтверждения и версия токенов одним запросом.
         user = get_object_or_404(
-            User,
+            User.objects.select_related('confirmation', 'token_version'),
             username=request.data['username']
         )
-        if 'confirmation_code' in request.data:
-            confirmation_code = request.data['confirmation_code']
-            if confirmation_code == user.confirmation_code:
-                access = AccessToken.for_user(user)
-                return Response({'token': str(access), })
+        confirmation = getattr(user, 'confirmation', None)
+        if 'confirmation_code' in request.data and check_code(
+            confirmation, request.data['confirmation_code']
+        ) and consume_code(confirmation):
+            access = RoleAccessToken.for_user(user)
+            return Response({'token': str(access), })
         return Response(request.data, status=status.HTTP_400_BAD_REQUEST)
     return Response(request.data, status=status.HTTP_400_BAD_REQUEST)
@@ -3,14 +3,19 @@ ASGI config for YaMDb project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
-For more information on this file, see
-https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
+Django 2.2 has no native ASGI support, so the WSGI handler runs in bounded
+thread pools behind an asyncio front (see core.asgi). Serve it with any
+ASGI server, e.g. ``uvicorn api_yamdb.asgi:application``.
 """
 
 import os
 
-from django.core.asgi import get_asgi_application
+from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
-application = get_asgi_application()
+wsgi_application = get_wsgi_application()
+
+from core.asgi import ThreadPoolASGIHandler  # noqa: E402
+
+application = ThreadPoolASGIHandler(wsgi_application)
@@ -25,20 +25,24 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'rest_framework_simplejwt',
-    'api.apps.ApiConfig',
     'reviews.apps.ReviewsConfig',
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
+    # После reviews: сброс кеша ответов должен идти после
+    # обновления рейтинга в обработчиках сигналов отзывов.
+    'api.apps.ApiConfig',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -65,11 +69,81 @@ WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
 # Database
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+# СУБД выбирается переменными окружения. Для PostgreSQL:
+# DB_ENGINE=django.db.backends.postgresql или, с пулом соединений
+# внутри процесса, DB_ENGINE=core.db.pooled_postgresql (нужен psycopg2).
+
+DB_ENGINE = os.getenv('DB_ENGINE', 'django.db.backends.sqlite3')
+
+# Сколько секунд держать соединение открытым между запросами.
+CONN_MAX_AGE = int(os.getenv('CONN_MAX_AGE', 60))
+
+if DB_ENGINE == 'django.db.backends.sqlite3':
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINE,
+            'NAME': os.getenv('DB_NAME', os.path.join(BASE_DIR, 'db.sqlite3')),
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+        }
     }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINE,
+            'NAME': os.getenv('DB_NAME', 'postgres'),
+            'USER': os.getenv('POSTGRES_USER', 'postgres'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', 'localhost'),
+            'PORT': os.getenv('DB_PORT', '5432'),
+            # Пул сам переиспользует соединения.
+            'CONN_MAX_AGE': (
+                0 if DB_ENGINE == 'core.db.pooled_postgresql'
+                else CONN_MAX_AGE
+            ),
+            'POOL': {
+                'MIN_SIZE': int(os.getenv('DB_POOL_MIN_SIZE', 1)),
+                'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', 20)),
+                'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', 30)),
+            },
+        }
+    }
+
+# Реплики для чтения: DB_REPLICAS - через запятую имена файлов SQLite
+# или хосты PostgreSQL. В тестах реплики повторяют основную БД.
+REPLICA_DATABASES = []
+
+for number, replica in enumerate(filter(None, os.getenv(
+    'DB_REPLICAS', ''
+).split(','))):
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    if DB_ENGINE == 'django.db.backends.sqlite3':
+        DATABASES[alias]['NAME'] = replica.strip()
+    else:
+        DATABASES[alias]['HOST'] = replica.strip()
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['core.db.routers.ReplicaRouter']
+
+# Безопасные запросы к этим адресам читают с реплик.
+REPLICA_READ_PATHS = (
+    r'^/api/v1/titles/',
+    r'^/api/v1/genres/',
+    r'^/api/v1/categories/',
+)
+
+# Сколько секунд после записи клиент читает из основной БД.
+REPLICA_PIN_SECONDS = 10
+
+# Применяются к каждому новому соединению SQLite (core.db.sqlite).
+# busy_timeout идёт первым: переключение в WAL тоже ждёт блокировку.
+SQLITE_PRAGMAS = {
+    'busy_timeout': 20000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
 }
 
 
@@ -112,15 +186,144 @@ STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static/'),)
 
 AUTH_USER_MODEL = 'users.User'
 
+# Пользователь из утверждений токена без загрузки из БД
+# (users.authentication.StatelessJWTAuthentication).
+AUTH_STATELESS_TOKENS = os.getenv('AUTH_STATELESS_TOKENS', '0') == '1'
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.StatelessJWTAuthentication'
+        if AUTH_STATELESS_TOKENS
+        else 'users.authentication.CachedJWTAuthentication',
     ),
+    # Число доверенных прокси перед приложением: без них адрес клиента
+    # берётся из REMOTE_ADDR, а X-Forwarded-For не учитывается.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+}
+
+# Кодирование JSON в api.renderers.FastJSONRenderer и api.parsers:
+# 'auto' (orjson, если установлен), 'orjson' или 'stdlib'.
+API_JSON_BACKEND = os.getenv('API_JSON_BACKEND', 'auto')
+
+# Число рабочих процессов (как у gunicorn). При нескольких процессах
+# кеши пользователей, версий токенов и ответов должны быть общими
+# (см. core.caches): задайте CACHE_BACKEND и CACHE_LOCATION, например
+# django.core.cache.backends.memcached.MemcachedCache и 127.0.0.1:11211.
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', 1))
+
+CACHE_BACKEND = os.getenv(
+    'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+)
+
+CACHE_LOCATION = os.getenv('CACHE_LOCATION', '')
+
+# MAX_ENTRIES понимают встроенные кеши в памяти, в файлах и в БД;
+# клиенты memcached и другие сторонние кеши его не принимают.
+CACHE_OPTIONS = {} if CACHE_BACKEND not in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.filebased.FileBasedCache',
+    'django.core.cache.backends.db.DatabaseCache',
+) else {'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', 10000))}
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': CACHE_LOCATION,
+        'OPTIONS': CACHE_OPTIONS,
+    },
+    'api': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': CACHE_LOCATION or 'api-responses',
+        'KEY_PREFIX': 'api',
+        'OPTIONS': CACHE_OPTIONS,
+    },
+}
+
+# Кеш ответов каталога (api.cache.CachedResponseMixin).
+API_RESPONSE_CACHE = 'api'
+
+API_RESPONSE_CACHE_TIMEOUT = 60
+
+# Кеш пользователей для users.authentication.CachedJWTAuthentication.
+AUTH_USER_CACHE = 'default'
+
+AUTH_USER_CACHE_TIMEOUT = 300
+
+# Срок действия кода подтверждения (users.confirmation), секунды.
+CONFIRMATION_CODE_TTL = 24 * 60 * 60
+
+# Ограничение регистрации и выдачи токенов (users.throttling):
+# ведро на адрес клиента и на имя пользователя. С несколькими
+# процессами нужен общий кеш (Memcached, Redis).
+AUTH_THROTTLE_CACHE = 'default'
+
+AUTH_THROTTLE_RATES = {
+    'ip': '30/min',
+    'username': '5/min',
+}
+
+# Поисковый индекс reviews.search: 'auto' (FTS5, если SQLite собран с ним),
+# 'fts5' или 'tokens' (таблица токенов для любой СУБД).
+SEARCH_BACKEND = 'auto'
+
+SEARCH_RESULTS_LIMIT = 500
+
+# Максимум объектов в одном запросе пакетной загрузки.
+BULK_MAX_ITEMS = 1000
+
+# ASGI (core.asgi): потоки для горячих запросов на чтение
+# и для всех остальных запросов.
+ASGI_READ_PATHS = (r'^/api/v1/titles/',)
+
+ASGI_READ_WORKERS = int(os.getenv('ASGI_READ_WORKERS', 8))
+
+ASGI_WORKERS = int(os.getenv('ASGI_WORKERS', 4))
+
+# Профилирование запросов (core.middleware.ProfilingMiddleware):
+# по заголовку X-Profile и/или для доли PROFILING_SAMPLE_RATE запросов.
+# Заголовок действует при DEBUG, для сотрудников, вошедших через сессию,
+# или со значением PROFILING_SECRET.
+PROFILING_HEADER = 'X-Profile'
+
+PROFILING_SECRET = os.getenv('PROFILING_SECRET', '')
+
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', 0))
+
+PROFILING_SLOWEST_QUERIES = 5
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'profiling': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'core.profiling': {
+            'handlers': ['profiling'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
 }
 
 SIMPLE_JWT = {
@@ -1,5 +1,12 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from .caches import check_shared_caches
+        from .db.sqlite import apply_sqlite_pragmas
+        connection_created.connect(apply_sqlite_pragmas)
+        check_shared_caches()
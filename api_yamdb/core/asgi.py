@@ -0,0 +1,210 @@
+"""
+ASGI-приложение поверх WSGI-обработчика Django.
+
+В Django 2.2 нет асинхронных представлений, поэтому код Django
+выполняется в ограниченных пулах потоков, а чтение тела запроса
+и отправка ответа медленному клиенту идут в цикле событий и поток
+не занимают. Горячие запросы на чтение (ASGI_READ_PATHS) получают
+отдельный пул, чтобы их не вытесняли запись и выгрузки.
+"""
+import asyncio
+import logging
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+
+logger = logging.getLogger(__name__)
+
+READ_METHODS = ('GET', 'HEAD')
+
+# Сколько частей ответа поток может передать вперёд клиента.
+RESPONSE_BUFFER = 16
+
+_START, _BODY, _END = 'start', 'body', 'end'
+
+
+def _latin1(value):
+    return value.encode().decode('latin-1')
+
+
+def build_environ(scope, body):
+    """WSGI environ для HTTP-запроса ASGI (PEP 3333)."""
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': _latin1(scope.get('root_path', '')),
+        'PATH_INFO': _latin1(scope['path']),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': 'HTTP/' + scope.get('http_version', '1.1'),
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+    for name, value in scope.get('headers', ()):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+            continue
+        if name == 'CONTENT_LENGTH':
+            continue
+        key = 'HTTP_' + name
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+class ThreadPoolASGIHandler:
+    """
+    Выполняет WSGI-приложение Django в пулах потоков.
+
+    Запрос и ответ целиком проходят через один поток: соединения
+    с БД в Django привязаны к потоку и закрываются по окончании
+    ответа. Обычный ответ поток отдаёт сразу и освобождается;
+    потоковый (выгрузки) держит поток, пока клиент его читает.
+    """
+
+    def __init__(self, wsgi_application=None, read_workers=None,
+                 workers=None):
+        self.wsgi_application = wsgi_application or get_wsgi_application()
+        self.read_pool = ThreadPoolExecutor(
+            read_workers or getattr(settings, 'ASGI_READ_WORKERS', 8),
+            thread_name_prefix='asgi-read'
+        )
+        self.pool = ThreadPoolExecutor(
+            workers or getattr(settings, 'ASGI_WORKERS', 4),
+            thread_name_prefix='asgi'
+        )
+        self.read_paths = [
+            re.compile(pattern)
+            for pattern in getattr(settings, 'ASGI_READ_PATHS', ())
+        ]
+
+    def get_pool(self, scope):
+        if scope['method'] in READ_METHODS and any(
+            path.match(scope['path']) for path in self.read_paths
+        ):
+            return self.read_pool
+        return self.pool
+
+    def shutdown(self):
+        self.read_pool.shutdown()
+        self.pool.shutdown()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            raise ValueError(f'Неподдерживаемый тип запроса: {scope["type"]}')
+        body = await self.read_body(receive)
+        if body is None:
+            return
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(RESPONSE_BUFFER)
+        worker = loop.run_in_executor(
+            self.get_pool(scope), self.run_wsgi,
+            build_environ(scope, body), loop, queue
+        )
+        try:
+            await self.send_response(queue, send)
+        except BaseException:
+            # Клиент отключился: дочитываем ответ, чтобы освободить поток.
+            while not worker.done():
+                getter = asyncio.ensure_future(queue.get())
+                await asyncio.wait(
+                    {getter, worker}, return_when=asyncio.FIRST_COMPLETED
+                )
+                getter.cancel()
+            raise
+        finally:
+            await worker
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    @staticmethod
+    async def read_body(receive):
+        """Тело запроса или None, если клиент отключился."""
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                return b''.join(chunks)
+
+    def run_wsgi(self, environ, loop, queue):
+        """Выполняется в пуле: вызывает приложение и передаёт ответ."""
+        def put(item):
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        started = []
+
+        def start_response(status, headers, exc_info=None):
+            started[:] = [status, headers]
+
+        try:
+            result = self.wsgi_application(environ, start_response)
+            try:
+                put((_START, *started))
+                for chunk in result:
+                    if chunk:
+                        put((_BODY, chunk))
+            finally:
+                if hasattr(result, 'close'):
+                    result.close()
+        except Exception:
+            logger.exception('Ошибка обработки %s', environ['PATH_INFO'])
+            if not started:
+                put((_START, '500 Internal Server Error', []))
+        finally:
+            put((_END,))
+
+    @staticmethod
+    async def send_response(queue, send):
+        started = False
+        while True:
+            item = await queue.get()
+            if item[0] == _END:
+                break
+            if item[0] == _START:
+                if started:
+                    continue
+                started = True
+                status, headers = item[1], item[2]
+                await send({
+                    'type': 'http.response.start',
+                    'status': int(status.split(' ', 1)[0]),
+                    'headers': [
+                        (name.lower().encode('latin-1'),
+                         value.encode('latin-1'))
+                        for name, value in headers
+                    ],
+                })
+            else:
+                await send({
+                    'type': 'http.response.body',
+                    'body': item[1],
+                    'more_body': True,
+                })
+        await send({'type': 'http.response.body', 'body': b''})
@@ -0,0 +1,425 @@
+"""
+Замеры стоимости эндпоинтов API.
+
+Создаёт синтетические данные моделями проекта, прогоняет каждый
+маршрут api/urls.py через тестовый клиент Django и собирает
+количество запросов к БД, задержку (p50/p95) и пик выделенной памяти.
+"""
+import json
+import platform
+import time
+import tracemalloc
+from collections import namedtuple
+from datetime import timedelta
+from itertools import islice
+
+import django
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver
+from django.utils import timezone
+
+from api.urls import router_v1, urlpatterns
+from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+from reviews.facets import rebuild_facets
+from reviews.ratings import rebuild_title_ratings
+from reviews.search import rebuild_index
+from users.confirmation import create_code
+from users.models import User
+from users.tokens import RoleAccessToken
+
+from .csv_import import keep_auto_now_add
+
+DEFAULT_SIZES = {
+    'titles': 1000,
+    'reviews': 10000,
+    'comments': 10000,
+    'genres': 20,
+    'categories': 5,
+}
+
+SEED_BATCH_SIZE = 5000
+
+Endpoint = namedtuple('Endpoint', ('name', 'route', 'method', 'build'))
+
+
+def _batched(objects, size=SEED_BATCH_SIZE):
+    objects = iter(objects)
+    while True:
+        batch = list(islice(objects, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _bulk(model, objects):
+    with keep_auto_now_add(model):
+        for batch in _batched(objects):
+            model.objects.bulk_create(batch)
+
+
+def seed(titles, reviews, comments, genres, categories):
+    """
+    Заполняет БД синтетическими данными.
+
+    Отзывов на произведение не больше, чем пользователей, поэтому
+    пользователей создаётся столько, чтобы соблюдалось unique_review.
+    """
+    users = max(-(-reviews // max(titles, 1)), 1)
+    start = timezone.now() - timedelta(days=365)
+    with transaction.atomic():
+        _bulk(User, (
+            User(username=f'bench_user_{i}', email=f'bench_{i}@yamdb.fake')
+            for i in range(users)
+        ))
+        _bulk(Category, (
+            Category(name=f'Категория {i}', slug=f'bench-category-{i}')
+            for i in range(categories)
+        ))
+        _bulk(Genre, (
+            Genre(name=f'Жанр {i}', slug=f'bench-genre-{i}')
+            for i in range(genres)
+        ))
+        category_ids = list(
+            Category.objects.order_by('id').values_list('id', flat=True)
+        )
+        genre_ids = list(
+            Genre.objects.order_by('id').values_list('id', flat=True)
+        )
+        user_ids = list(
+            User.objects.order_by('id').values_list('id', flat=True)
+        )
+        _bulk(Title, (
+            Title(
+                name=f'Произведение {i}',
+                year=1900 + i % 120,
+                description=f'Описание произведения {i}',
+                category_id=category_ids[i % len(category_ids)]
+            )
+            for i in range(titles)
+        ))
+        title_ids = list(
+            Title.objects.order_by('id').values_list('id', flat=True)
+        )
+        _bulk(TitleGenre, (
+            TitleGenre(
+                title_id=title_id,
+                genre_id=genre_ids[(i + shift) % len(genre_ids)]
+            )
+            for i, title_id in enumerate(title_ids)
+            for shift in range(min(2, len(genre_ids)))
+        ))
+        _bulk(Review, (
+            Review(
+                title_id=title_ids[i % len(title_ids)],
+                author_id=user_ids[i // len(title_ids)],
+                text=f'Отзыв {i}',
+                score=1 + i % 10,
+                pub_date=start + timedelta(seconds=i)
+            )
+            for i in range(reviews)
+        ))
+        review_ids = list(
+            Review.objects.order_by('id').values_list('id', flat=True)
+        )
+        _bulk(Comment, (
+            Comment(
+                review_id=review_ids[i % len(review_ids)],
+                author_id=user_ids[i % len(user_ids)],
+                text=f'Комментарий {i}',
+                pub_date=start + timedelta(seconds=i)
+            )
+            for i in range(comments if review_ids else 0)
+        ))
+        rebuild_title_ratings()
+        rebuild_facets()
+        rebuild_index()
+
+
+class BenchmarkContext:
+    """Идентификаторы объектов и клиенты, которыми пользуются замеры."""
+
+    def __init__(self):
+        self.admin, _ = User.objects.get_or_create(
+            username='bench_admin',
+            defaults={'email': 'bench_admin@yamdb.fake', 'role': 'admin'}
+        )
+        self.anonymous = Client()
+        self.admin_client = Client(
+            HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(self.admin)}'
+        )
+        review = Review.objects.order_by('id').first()
+        self.title_id = review.title_id if review else (
+            Title.objects.values_list('id', flat=True).first()
+        )
+        self.review_id = review.pk if review else None
+        self.comment_id = Comment.objects.filter(
+            review_id=self.review_id
+        ).values_list('id', flat=True).first()
+        self.genre_slug = Genre.objects.values_list('slug', flat=True).first()
+        self.category_slug = Category.objects.values_list(
+            'slug', flat=True
+        ).first()
+        self.username = User.objects.exclude(
+            pk=self.admin.pk
+        ).values_list('username', flat=True).first()
+        page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+        self.last_page = max(-(-Title.objects.count() // page_size), 1)
+        self.counter = 0
+
+    def unique(self, prefix):
+        self.counter += 1
+        return f'{prefix}-{self.counter}'
+
+    def throwaway_genre(self):
+        slug = self.unique('bench-delete-genre')
+        Genre.objects.create(name=slug, slug=slug)
+        return slug
+
+    def throwaway_category(self):
+        slug = self.unique('bench-delete-category')
+        Category.objects.create(name=slug, slug=slug)
+        return slug
+
+    def bulk_reviews(self, size=10):
+        """Отзывы администратора на ещё не оценённые им произведения."""
+        title_ids = Title.objects.exclude(
+            reviews__author=self.admin
+        ).order_by('id').values_list('id', flat=True)[:size]
+        return [
+            {'title': title_id, 'text': 'Пакетный отзыв', 'score': 7}
+            for title_id in title_ids
+        ] or [{'title': 0, 'text': 'Нет произведений', 'score': 7}]
+
+    def bulk_comments(self, size=10):
+        return [
+            {'review': self.review_id, 'text': 'Пакетный комментарий'}
+        ] * size
+
+    def signup_user(self):
+        username = self.unique('bench-token')
+        user = User.objects.create(
+            username=username,
+            email=f'{username}@yamdb.fake'
+        )
+        return {'username': username, 'confirmation_code': create_code(user)}
+
+    def client_from_new_address(self):
+        """
+        Анонимный клиент с новым адресом: замеры регистрации
+        и выдачи токенов не должны упираться в users.throttling.
+        """
+        self.counter += 1
+        high, low = divmod(self.counter % 65536, 256)
+        return Client(REMOTE_ADDR=f'10.0.{high}.{low}')
+
+
+def _get(client_name, url):
+    return lambda ctx: (getattr(ctx, client_name), url.format(ctx=ctx), None)
+
+
+ENDPOINTS = (
+    Endpoint('api-root', 'api-root', 'get',
+             _get('admin_client', '/api/v1/')),
+    Endpoint('titles-list', 'titles-list', 'get',
+             _get('anonymous', '/api/v1/titles/')),
+    Endpoint('titles-list-filtered', 'titles-list', 'get',
+             _get('anonymous', '/api/v1/titles/'
+                  '?genre={ctx.genre_slug}&category={ctx.category_slug}'
+                  '&year=1950')),
+    Endpoint('titles-list-deep-page', 'titles-list', 'get',
+             _get('anonymous', '/api/v1/titles/?page={ctx.last_page}')),
+    Endpoint('titles-list-cursor', 'titles-list', 'get',
+             _get('anonymous', '/api/v1/titles/?pagination=cursor')),
+    Endpoint('titles-list-search', 'titles-list', 'get',
+             _get('anonymous', '/api/v1/titles/?q=произведение')),
+    Endpoint('titles-facets', 'titles-facets', 'get',
+             _get('anonymous', '/api/v1/titles/facets/')),
+    Endpoint('titles-facets-filtered', 'titles-facets', 'get',
+             _get('anonymous', '/api/v1/titles/facets/'
+                  '?genre={ctx.genre_slug}&year=1950')),
+    Endpoint('titles-detail', 'titles-detail', 'get',
+             _get('anonymous', '/api/v1/titles/{ctx.title_id}/')),
+    Endpoint('genres-list', 'genres-list', 'get',
+             _get('anonymous', '/api/v1/genres/')),
+    Endpoint('genres-list-search', 'genres-list', 'get',
+             _get('anonymous', '/api/v1/genres/?search=1')),
+    Endpoint('genres-detail-delete', 'genres-detail', 'delete',
+             lambda ctx: (ctx.admin_client,
+                          f'/api/v1/genres/{ctx.throwaway_genre()}/', None)),
+    Endpoint('categories-list', 'сategories-list', 'get',
+             _get('anonymous', '/api/v1/categories/')),
+    Endpoint('categories-detail-delete', 'сategories-detail', 'delete',
+             lambda ctx: (ctx.admin_client,
+                          f'/api/v1/categories/{ctx.throwaway_category()}/',
+                          None)),
+    Endpoint('reviews-list', 'reviews-list', 'get',
+             _get('anonymous', '/api/v1/titles/{ctx.title_id}/reviews/')),
+    Endpoint('reviews-detail', 'reviews-detail', 'get',
+             _get('anonymous', '/api/v1/titles/{ctx.title_id}/reviews/'
+                  '{ctx.review_id}/')),
+    Endpoint('comments-list', 'comments-list', 'get',
+             _get('anonymous', '/api/v1/titles/{ctx.title_id}/reviews/'
+                  '{ctx.review_id}/comments/')),
+    Endpoint('comments-detail', 'comments-detail', 'get',
+             _get('anonymous', '/api/v1/titles/{ctx.title_id}/reviews/'
+                  '{ctx.review_id}/comments/{ctx.comment_id}/')),
+    Endpoint('users-list', 'users-list', 'get',
+             _get('admin_client', '/api/v1/users/')),
+    Endpoint('users-detail', 'users-detail', 'get',
+             _get('admin_client', '/api/v1/users/{ctx.username}/')),
+    Endpoint('users-me', 'users-my-profile', 'get',
+             _get('admin_client', '/api/v1/users/me/')),
+    Endpoint('reviews-bulk', 'reviews-bulk-list', 'post',
+             lambda ctx: (ctx.admin_client, '/api/v1/reviews/bulk/',
+                          ctx.bulk_reviews())),
+    Endpoint('comments-bulk', 'comments-bulk-list', 'post',
+             lambda ctx: (ctx.admin_client, '/api/v1/comments/bulk/',
+                          ctx.bulk_comments())),
+    Endpoint('export-titles', 'export', 'get',
+             _get('anonymous', '/api/v1/export/titles.ndjson')),
+    Endpoint('export-reviews', 'export', 'get',
+             _get('anonymous', '/api/v1/export/review.csv')),
+    Endpoint('auth-signup', 'user-list', 'post',
+             lambda ctx: (ctx.client_from_new_address(),
+                          '/api/v1/auth/signup/', {
+                 'username': ctx.unique('bench-signup'),
+                 'email': f'{ctx.unique("bench-signup")}@yamdb.fake',
+             })),
+    Endpoint('auth-token', 'token', 'post',
+             lambda ctx: (ctx.client_from_new_address(),
+                          '/api/v1/auth/token/', ctx.signup_user())),
+)
+
+
+def uncovered_routes():
+    """Имена маршрутов api/urls.py, для которых нет замера."""
+    names = {url.name for url in router_v1.urls}
+    names.update(
+        url.name for url in urlpatterns if not isinstance(url, URLResolver)
+    )
+    return sorted(names - {endpoint.route for endpoint in ENDPOINTS})
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = max(0, -(-len(ordered) * percent // 100) - 1)
+    return ordered[int(index)]
+
+
+def send_request(client, method, url, data):
+    if data is None:
+        response = getattr(client, method)(url)
+    else:
+        response = getattr(client, method)(
+            url, json.dumps(data), content_type='application/json'
+        )
+    if response.streaming:
+        # Потоковый ответ формируется только при чтении.
+        b''.join(response.streaming_content)
+    return response
+
+
+def clear_response_cache():
+    caches[getattr(settings, 'API_RESPONSE_CACHE', 'default')].clear()
+
+
+def measure(endpoint, ctx, iterations, warm_cache=False):
+    timings = []
+    queries = []
+    status = None
+    for _ in range(iterations):
+        client, url, data = endpoint.build(ctx)
+        if not warm_cache:
+            clear_response_cache()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = send_request(client, endpoint.method, url, data)
+            timings.append(time.perf_counter() - started)
+        queries.append(len(captured))
+        status = response.status_code
+
+    # Память замеряется отдельным запросом: tracemalloc
+    # заметно замедляет выполнение и исказил бы задержку.
+    client, url, data = endpoint.build(ctx)
+    if not warm_cache:
+        clear_response_cache()
+    tracemalloc.start()
+    try:
+        send_request(client, endpoint.method, url, data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'route': endpoint.route,
+        'method': endpoint.method.upper(),
+        'status': status,
+        'queries': max(queries),
+        'p50_ms': round(percentile(timings, 50) * 1000, 3),
+        'p95_ms': round(percentile(timings, 95) * 1000, 3),
+        'mean_ms': round(sum(timings) / len(timings) * 1000, 3),
+        'alloc_peak_kb': round(peak / 1024, 1),
+    }
+
+
+def run(iterations=20, warm_cache=False, only=None):
+    ctx = BenchmarkContext()
+    results = {}
+    for endpoint in ENDPOINTS:
+        if only and endpoint.name not in only:
+            continue
+        results[endpoint.name] = measure(
+            endpoint, ctx, iterations, warm_cache
+        )
+    return results
+
+
+def build_report(results, sizes, iterations, warm_cache):
+    return {
+        'meta': {
+            'sizes': sizes,
+            'iterations': iterations,
+            'warm_cache': warm_cache,
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+        },
+        'endpoints': results,
+    }
+
+
+def compare(report, baseline, latency_tolerance=0.2):
+    """
+    Сравнивает отчёт с эталонным.
+
+    Регрессией считается рост числа запросов к БД или рост p95
+    больше чем на latency_tolerance (доля от эталона).
+    """
+    regressions = []
+    for name, old in baseline['endpoints'].items():
+        new = report['endpoints'].get(name)
+        if new is None:
+            continue
+        if new['queries'] > old['queries']:
+            regressions.append(
+                f'{name}: запросов к БД {old["queries"]} -> {new["queries"]}'
+            )
+        if new['p95_ms'] > old['p95_ms'] * (1 + latency_tolerance):
+            regressions.append(
+                f'{name}: p95 {old["p95_ms"]} мс -> {new["p95_ms"]} мс'
+            )
+    return regressions
+
+
+def load_report(path):
+    with open(path, encoding='utf8') as report_file:
+        return json.load(report_file)
+
+
+def save_report(report, path):
+    with open(path, 'w', encoding='utf8') as report_file:
+        json.dump(report, report_file, ensure_ascii=False, indent=2)
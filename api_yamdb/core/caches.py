@@ -0,0 +1,42 @@
+"""
+Проверка кешей, которые должны быть общими для всех процессов.
+
+Сброс закешированного пользователя и смена поколений кеша ответов
+(api.cache) выполняются в одном процессе; с кешем в памяти процесса
+(LocMemCache) остальные процессы продолжат видеть старую роль
+до истечения записи и отдавать устаревшие ответы и 304. Поэтому
+при нескольких процессах (WEB_CONCURRENCY > 1) такие кеши должны
+быть общими (Memcached, Redis, FileBasedCache), иначе приложение
+не запускается.
+"""
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+# Настройки с алиасами общих кешей и значения по умолчанию.
+SHARED_CACHE_SETTINGS = {
+    'AUTH_USER_CACHE': 'default',
+    'API_RESPONSE_CACHE': 'default',
+}
+
+
+def is_process_local(alias):
+    return settings.CACHES[alias]['BACKEND'] in PROCESS_LOCAL_BACKENDS
+
+
+def check_shared_caches():
+    if getattr(settings, 'WEB_CONCURRENCY', 1) <= 1:
+        return
+    local = sorted(
+        name for name, default in SHARED_CACHE_SETTINGS.items()
+        if is_process_local(getattr(settings, name, default))
+    )
+    if local:
+        raise ImproperlyConfigured(
+            f'При WEB_CONCURRENCY > 1 кеши {", ".join(local)} должны быть '
+            f'общими для процессов: задайте CACHE_BACKEND и CACHE_LOCATION.'
+        )
@@ -0,0 +1,195 @@
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+from reviews.facets import rebuild_facets
+from reviews.ratings import rebuild_title_ratings
+from reviews.search import rebuild_index
+from users.models import User
+
+from .csv_rows import (ImportDataError, build_category, build_comment,
+                       build_genre, build_review, build_title,
+                       build_title_genre, build_user, parse_file,
+                       read_chunks)
+
+DEFAULT_BATCH_SIZE = 1000
+
+Table = namedtuple('Table', ('filename', 'model', 'build', 'references'))
+
+
+# Таблицы перечислены в порядке, при котором внешние ключи
+# ссылаются только на уже загруженные строки. Граф зависимостей
+# для параллельной загрузки строится по полю references.
+TABLES = (
+    Table('users.csv', User, build_user, {}),
+    Table('category.csv', Category, build_category, {}),
+    Table('genre.csv', Genre, build_genre, {}),
+    Table('titles.csv', Title, build_title, {'category_id': Category}),
+    Table('genre_title.csv', TitleGenre, build_title_genre,
+          {'title_id': Title, 'genre_id': Genre}),
+    Table('review.csv', Review, build_review,
+          {'title_id': Title, 'author_id': User}),
+    Table('comments.csv', Comment, build_comment,
+          {'review_id': Review, 'author_id': User}),
+)
+
+
+def dependencies(table):
+    """Модели, строки которых должны быть загружены раньше таблицы."""
+    return {
+        model for model in table.references.values()
+        if model is not table.model
+    }
+
+
+@contextmanager
+def keep_auto_now_add(model):
+    """Сохраняет даты из файла вместо подстановки текущего времени."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class CsvImporter:
+    """Пакетная загрузка csv-файлов в БД."""
+
+    def __init__(self, data_dir, batch_size=DEFAULT_BATCH_SIZE, workers=1,
+                 stdout=None):
+        self.data_dir = data_dir
+        self.batch_size = batch_size
+        self.workers = workers
+        self.stdout = stdout
+        self.known_ids = {}
+
+    def log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def ids_of(self, model):
+        """Множество первичных ключей модели, которые уже есть в БД."""
+        if model not in self.known_ids:
+            self.known_ids[model] = set(
+                model.objects.values_list('pk', flat=True)
+            )
+        return self.known_ids[model]
+
+    def check_references(self, table, rows):
+        for column, model in table.references.items():
+            ids = self.ids_of(model)
+            for row in rows:
+                value = row[column]
+                if value is not None and value not in ids:
+                    raise ImportDataError(
+                        f'{table.filename}: строка {row["id"]} ссылается '
+                        f'на несуществующий {model.__name__} {value}.'
+                    )
+
+    def path(self, table):
+        return os.path.join(self.data_dir, table.filename)
+
+    def chunks(self, table):
+        return read_chunks(self.path(table), table.build, self.batch_size)
+
+    def write_table(self, table, chunks):
+        """Записывает строки таблицы одной транзакцией."""
+        model = table.model
+        loaded = 0
+        started = time.monotonic()
+        with transaction.atomic(), keep_auto_now_add(model):
+            for rows in chunks:
+                self.check_references(table, rows)
+                model.objects.bulk_create(
+                    [model(**row) for row in rows],
+                    batch_size=self.batch_size
+                )
+                self.ids_of(model).update(row['id'] for row in rows)
+                loaded += len(rows)
+        elapsed = time.monotonic() - started
+        rate = loaded / elapsed if elapsed else loaded
+        self.log(
+            f'{table.filename}: {loaded} строк за {elapsed:.2f} с '
+            f'({rate:.0f} строк/с).'
+        )
+        return loaded
+
+    def reset_sequences(self):
+        models = [table.model for table in TABLES]
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    def run_sequential(self):
+        for table in TABLES:
+            self.write_table(table, self.chunks(table))
+
+    def run_parallel(self):
+        """
+        Разбирает файлы параллельно в пуле процессов.
+
+        Запись в БД остаётся последовательной: таблица пишется, как только
+        разобран её файл и записаны все таблицы, на которые она ссылается.
+        Файлы целиком держатся в памяти до записи.
+        """
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            parsed = {
+                table.filename: pool.submit(
+                    parse_file,
+                    self.path(table),
+                    table.build,
+                    self.batch_size
+                )
+                for table in TABLES
+            }
+            try:
+                self.write_parsed(parsed)
+            except BaseException:
+                # Остальные файлы уже не нужны: не ждём их разбора.
+                for future in parsed.values():
+                    future.cancel()
+                raise
+
+    def write_parsed(self, parsed):
+        """Пишет таблицы из разобранных в пуле файлов (см. run_parallel)."""
+        pending = list(TABLES)
+        written = set()
+        while pending:
+            ready = [
+                table for table in pending
+                if written.issuperset(dependencies(table))
+            ]
+            done, _ = wait(
+                [parsed[table.filename] for table in ready],
+                return_when=FIRST_COMPLETED
+            )
+            for table in ready:
+                future = parsed[table.filename]
+                if future in done:
+                    self.write_table(table, future.result())
+                    written.add(table.model)
+                    pending.remove(table)
+
+    def run(self):
+        if self.workers > 1:
+            self.run_parallel()
+        else:
+            self.run_sequential()
+        self.reset_sequences()
+        rebuild_title_ratings()
+        rebuild_facets()
+        rebuild_index()
@@ -0,0 +1,117 @@
+"""
+Разбор строк csv.
+
+Модуль не импортирует модели, чтобы его функции можно было
+выполнять в дочерних процессах без настройки Django.
+"""
+import csv
+import os
+from itertools import islice
+
+
+class ImportDataError(Exception):
+    """Ошибка в загружаемых данных."""
+
+
+def _nullable_id(value):
+    return int(value) if value else None
+
+
+def build_user(row):
+    return {
+        'id': int(row['id']),
+        'username': row['username'],
+        'email': row['email'],
+        'role': row['role'],
+        'bio': row['bio'],
+        'first_name': row['first_name'],
+        'last_name': row['last_name'],
+    }
+
+
+def build_category(row):
+    return {'id': int(row['id']), 'name': row['name'], 'slug': row['slug']}
+
+
+def build_genre(row):
+    return {'id': int(row['id']), 'name': row['name'], 'slug': row['slug']}
+
+
+def build_title(row):
+    return {
+        'id': int(row['id']),
+        'name': row['name'],
+        'year': int(row['year']),
+        'description': row.get('description', ''),
+        'category_id': _nullable_id(row['category']),
+    }
+
+
+def build_title_genre(row):
+    return {
+        'id': int(row['id']),
+        'title_id': int(row['title_id']),
+        'genre_id': int(row['genre_id']),
+    }
+
+
+def build_review(row):
+    return {
+        'id': int(row['id']),
+        'title_id': int(row['title_id']),
+        'text': row['text'],
+        'author_id': int(row['author']),
+        'score': int(row['score']),
+        'pub_date': row['pub_date'],
+    }
+
+
+def build_comment(row):
+    return {
+        'id': int(row['id']),
+        'review_id': int(row['review_id']),
+        'text': row['text'],
+        'author_id': int(row['author']),
+        'pub_date': row['pub_date'],
+    }
+
+
+def _build_rows(reader, build, batch_size, filename):
+    rows = []
+    try:
+        for row in islice(reader, batch_size):
+            rows.append(build(row))
+    except UnicodeDecodeError:
+        raise ImportDataError(f'{filename}: файл не в кодировке UTF-8.')
+    except csv.Error as error:
+        raise ImportDataError(
+            f'{filename}, строка {reader.line_num}: {error}.'
+        )
+    except KeyError as error:
+        raise ImportDataError(
+            f'{filename}, строка {reader.line_num}: нет столбца {error}.'
+        )
+    except (TypeError, ValueError) as error:
+        # TypeError - в строке меньше значений, чем столбцов.
+        raise ImportDataError(
+            f'{filename}, строка {reader.line_num}: '
+            f'неверное значение ({error}).'
+        )
+    return rows
+
+
+def read_chunks(path, build, batch_size):
+    """Построчно читает csv и отдаёт списки подготовленных строк."""
+    filename = os.path.basename(path)
+    with open(path, encoding='utf8', newline='') as csv_file:
+        reader = csv.DictReader(csv_file)
+        while True:
+            rows = _build_rows(reader, build, batch_size, filename)
+            if not rows:
+                return
+            yield rows
+
+
+def parse_file(path, build, batch_size):
+    """Разбирает файл целиком и возвращает список пачек строк."""
+    return list(read_chunks(path, build, batch_size))
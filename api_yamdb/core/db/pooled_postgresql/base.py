@@ -0,0 +1,61 @@
+"""
+PostgreSQL с пулом соединений внутри процесса.
+
+Соединения берутся из psycopg2.pool.ThreadedConnectionPool и при закрытии
+возвращаются в пул, а не разрывают соединение с сервером. Размер пула
+и время ожидания свободного соединения (секунды) задаются ключом POOL
+в настройках БД:
+
+    'POOL': {'MIN_SIZE': 1, 'MAX_SIZE': 20, 'TIMEOUT': 30}
+
+Используется с CONN_MAX_AGE = 0: тогда соединение возвращается в пул
+в конце каждого запроса.
+"""
+import threading
+
+from django.db.backends.postgresql import base
+from psycopg2 import pool
+
+from .pool import BlockingPool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_pool(self, conn_params):
+        with _pools_lock:
+            if self.alias not in _pools:
+                options = self.settings_dict.get('POOL', {})
+                max_size = options.get('MAX_SIZE', 20)
+                _pools[self.alias] = BlockingPool(
+                    pool.ThreadedConnectionPool(
+                        options.get('MIN_SIZE', 1), max_size, **conn_params
+                    ),
+                    max_size,
+                    options.get('TIMEOUT', 30)
+                )
+            return _pools[self.alias]
+
+    def get_new_connection(self, conn_params):
+        connection = self.get_pool(conn_params).getconn()
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            # Пул сам откатывает незавершённую транзакцию
+            # и закрывает соединения в неизвестном состоянии.
+            _pools[self.alias].putconn(
+                self.connection, close=bool(self.connection.closed)
+            )
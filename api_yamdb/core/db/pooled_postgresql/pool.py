@@ -0,0 +1,44 @@
+import threading
+
+from django.db.utils import OperationalError
+
+
+class PoolTimeout(OperationalError):
+    """За отведённое время в пуле не освободилось соединение."""
+
+
+class BlockingPool:
+    """
+    Пул, который ждёт свободное соединение.
+
+    ThreadedConnectionPool из psycopg2 сразу бросает PoolError, когда
+    все соединения заняты, и всплеск нагрузки превращается в ошибки 500.
+    Здесь число выданных соединений ограничено семафором: запрос ждёт
+    освобождения не дольше timeout секунд и только потом получает
+    PoolTimeout.
+    """
+
+    def __init__(self, pool, max_size, timeout):
+        self.pool = pool
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    def getconn(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(
+                f'Нет свободного соединения с БД за {self.timeout} с'
+            )
+        try:
+            return self.pool.getconn()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def putconn(self, connection, close=False):
+        try:
+            self.pool.putconn(connection, close=close)
+        finally:
+            self._slots.release()
+
+    def closeall(self):
+        self.pool.closeall()
@@ -0,0 +1,44 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+_use_replica = ContextVar('use_replica', default=False)
+
+
+@contextmanager
+def read_from_replica(enabled=True):
+    """Внутри блока чтение идёт с реплик (если они настроены)."""
+    token = _use_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Отправляет чтение на реплики, а запись - в основную БД.
+
+    Реплики используются только внутри read_from_replica: его включает
+    core.middleware.ReplicaRoutingMiddleware для безопасных запросов
+    к каталогу, отзывам и комментариям. Во всех остальных случаях
+    (запись, команды, фоновые задачи) чтение идёт из default.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, 'REPLICA_DATABASES', ())
+        if replicas and _use_replica.get():
+            return random.choice(replicas)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная БД.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
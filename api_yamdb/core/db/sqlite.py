@@ -0,0 +1,16 @@
+from django.conf import settings
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """
+    Настраивает новое соединение SQLite по settings.SQLITE_PRAGMAS.
+
+    WAL позволяет читать во время записи, synchronous=NORMAL в режиме WAL
+    не теряет согласованность, а busy_timeout заставляет писателей ждать
+    блокировку вместо немедленной ошибки database is locked.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {name} = {value}')
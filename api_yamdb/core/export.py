@@ -0,0 +1,137 @@
+"""
+Потоковая выгрузка данных в csv и NDJSON.
+
+Строки читаются через QuerySet.iterator(chunk_size=...), поэтому
+расход памяти не зависит от размера таблиц. Формат csv совпадает
+с файлами static/data, которые читает loadyamdbdata.
+"""
+import csv
+import json
+from collections import namedtuple
+from datetime import datetime, timezone
+from itertools import islice
+
+from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+from users.models import User
+
+DEFAULT_CHUNK_SIZE = 2000
+
+FORMATS = ('csv', 'ndjson')
+
+Export = namedtuple('Export', ('model', 'columns', 'private'))
+
+# Колонки: (заголовок csv, поле модели).
+EXPORTS = {
+    'users': Export(User, (
+        ('id', 'id'), ('username', 'username'), ('email', 'email'),
+        ('role', 'role'), ('bio', 'bio'), ('first_name', 'first_name'),
+        ('last_name', 'last_name'),
+    ), True),
+    'category': Export(Category, (
+        ('id', 'id'), ('name', 'name'), ('slug', 'slug'),
+    ), False),
+    'genre': Export(Genre, (
+        ('id', 'id'), ('name', 'name'), ('slug', 'slug'),
+    ), False),
+    'titles': Export(Title, (
+        ('id', 'id'), ('name', 'name'), ('year', 'year'),
+        ('category', 'category_id'), ('description', 'description'),
+    ), False),
+    'genre_title': Export(TitleGenre, (
+        ('id', 'id'), ('title_id', 'title_id'), ('genre_id', 'genre_id'),
+    ), False),
+    'review': Export(Review, (
+        ('id', 'id'), ('title_id', 'title_id'), ('text', 'text'),
+        ('author', 'author_id'), ('score', 'score'),
+        ('pub_date', 'pub_date'),
+    ), False),
+    'comments': Export(Comment, (
+        ('id', 'id'), ('review_id', 'review_id'), ('text', 'text'),
+        ('author', 'author_id'), ('pub_date', 'pub_date'),
+    ), False),
+}
+
+
+class Echo:
+    """Буфер для csv.writer, который сразу возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def format_value(value):
+    if isinstance(value, datetime):
+        value = value.astimezone(timezone.utc).isoformat(
+            timespec='milliseconds'
+        )
+        return value.replace('+00:00', 'Z')
+    return '' if value is None else value
+
+
+def iter_rows(name, chunk_size=DEFAULT_CHUNK_SIZE):
+    export = EXPORTS[name]
+    fields = [field for _, field in export.columns]
+    queryset = export.model.objects.order_by('pk').values_list(*fields)
+    for row in queryset.iterator(chunk_size=chunk_size):
+        yield [format_value(value) for value in row]
+
+
+def iter_title_documents(chunk_size=DEFAULT_CHUNK_SIZE):
+    """Произведения в том же виде, что и в API, с жанрами и рейтингом."""
+    titles = Title.objects.order_by('pk').select_related(
+        'category'
+    ).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(titles, chunk_size))
+        if not chunk:
+            return
+        genres = {}
+        links = TitleGenre.objects.filter(
+            title_id__in=[title.pk for title in chunk]
+        ).order_by('-genre_id').values_list(
+            'title_id', 'genre__name', 'genre__slug'
+        )
+        for title_id, genre_name, genre_slug in links:
+            genres.setdefault(title_id, []).append(
+                {'name': genre_name, 'slug': genre_slug}
+            )
+        for title in chunk:
+            category = title.category
+            yield {
+                'id': title.pk,
+                'name': title.name,
+                'year': title.year,
+                'rating': (
+                    int(title.rating) if title.rating is not None else None
+                ),
+                'description': title.description,
+                'genre': genres.get(title.pk, []),
+                'category': {
+                    'name': category.name, 'slug': category.slug
+                } if category else None,
+            }
+
+
+def iter_csv(name, chunk_size=DEFAULT_CHUNK_SIZE):
+    writer = csv.writer(Echo(), lineterminator='\n')
+    yield writer.writerow([header for header, _ in EXPORTS[name].columns])
+    for row in iter_rows(name, chunk_size):
+        yield writer.writerow(row)
+
+
+def iter_ndjson(name, chunk_size=DEFAULT_CHUNK_SIZE):
+    if name == 'titles':
+        documents = iter_title_documents(chunk_size)
+    else:
+        headers = [header for header, _ in EXPORTS[name].columns]
+        documents = (
+            dict(zip(headers, row)) for row in iter_rows(name, chunk_size)
+        )
+    for document in documents:
+        yield json.dumps(document, ensure_ascii=False) + '\n'
+
+
+def iter_export(name, output_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    if output_format == 'csv':
+        return iter_csv(name, chunk_size)
+    return iter_ndjson(name, chunk_size)
@@ -0,0 +1,92 @@
+"""
+Проверка планов запросов, которые выполняют эндпоинты API.
+
+Запросы берутся не из шаблонов, а перехватываются при выполнении
+замеров core.benchmark, поэтому проверяются ровно те формы запросов,
+которые строят вьюсеты.
+"""
+import re
+from collections import namedtuple
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .benchmark import ENDPOINTS, BenchmarkContext, send_request
+
+Issue = namedtuple('Issue', ('endpoint', 'problem', 'detail', 'sql'))
+
+# Таблицы, полный просмотр которых ожидаем и не считаем проблемой:
+# служебные таблицы Django и небольшие справочники.
+IGNORED_TABLES = (
+    'django_', 'auth_', 'reviews_genre', 'reviews_category',
+)
+
+SQLITE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(.*)$')
+SQLITE_TEMP = re.compile(r'USE TEMP B-TREE FOR (.+)$')
+POSTGRES_SCAN = re.compile(r'Seq Scan on (\w+)')
+POSTGRES_SORT = re.compile(r'^\s*(?:->\s*)?Sort\b')
+
+
+def explain(sql):
+    """Строки плана запроса для текущей СУБД."""
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else (
+        'EXPLAIN '
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql)
+        rows = cursor.fetchall()
+    if connection.vendor == 'sqlite':
+        return [row[-1] for row in rows]
+    return [row[0] for row in rows]
+
+
+def _ignored(table):
+    return table.startswith(IGNORED_TABLES)
+
+
+def find_problems(plan):
+    """Полные просмотры таблиц и временные B-деревья в плане."""
+    problems = []
+    for line in plan:
+        line = line.strip()
+        scan = SQLITE_SCAN.match(line)
+        if scan and 'USING' not in scan.group(2) and not _ignored(
+            scan.group(1)
+        ):
+            problems.append(('full scan', line))
+        temp = SQLITE_TEMP.search(line)
+        if temp:
+            problems.append(('temp b-tree', line))
+        seq_scan = POSTGRES_SCAN.search(line)
+        if seq_scan and not _ignored(seq_scan.group(1)):
+            problems.append(('full scan', line))
+        if POSTGRES_SORT.match(line):
+            problems.append(('sort', line))
+    return problems
+
+
+def capture_queries(endpoint, ctx):
+    client, url, data = endpoint.build(ctx)
+    with CaptureQueriesContext(connection) as captured:
+        send_request(client, endpoint.method, url, data)
+    return [
+        query['sql'] for query in captured.captured_queries
+        if query['sql'].lstrip().upper().startswith('SELECT')
+    ]
+
+
+def advise(only=None):
+    """Возвращает список найденных проблем по всем эндпоинтам."""
+    ctx = BenchmarkContext()
+    issues = []
+    seen = set()
+    for endpoint in ENDPOINTS:
+        if only and endpoint.name not in only:
+            continue
+        for sql in capture_queries(endpoint, ctx):
+            if (endpoint.name, sql) in seen:
+                continue
+            seen.add((endpoint.name, sql))
+            for problem, detail in find_problems(explain(sql)):
+                issues.append(Issue(endpoint.name, problem, detail, sql))
+    return issues
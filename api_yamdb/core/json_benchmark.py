@@ -0,0 +1,68 @@
+"""
+Микробенчмарк кодирования JSON ответов API.
+
+Берёт данные настоящих ответов горячих запросов на чтение и сравнивает
+JSONRenderer/JSONParser DRF с api.renderers.FastJSONRenderer
+и api.parsers.FastJSONParser, проверяя, что результат совпадает.
+"""
+import time
+from io import BytesIO
+
+from django.test import Client
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer, use_orjson
+
+from .benchmark import BenchmarkContext
+from .loadtest import read_paths
+
+
+def payloads(ctx):
+    """Данные ответов (response.data) по адресам горячих запросов."""
+    client = Client()
+    return {path: client.get(path).data for path in read_paths(ctx)}
+
+
+def _timed(function, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return (time.perf_counter() - started) / iterations
+
+
+def measure(data, iterations):
+    renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+    parser, fast_parser = JSONParser(), FastJSONParser()
+    rendered = renderer.render(data)
+    fast_rendered = fast_renderer.render(data)
+    render = _timed(lambda: renderer.render(data), iterations)
+    fast_render = _timed(lambda: fast_renderer.render(data), iterations)
+    parse = _timed(lambda: parser.parse(BytesIO(rendered)), iterations)
+    fast_parse = _timed(
+        lambda: fast_parser.parse(BytesIO(rendered)), iterations
+    )
+    return {
+        'bytes': len(rendered),
+        'identical': (
+            rendered == fast_rendered
+            and parser.parse(BytesIO(rendered))
+            == fast_parser.parse(BytesIO(rendered))
+        ),
+        'render_us': round(render * 10 ** 6, 2),
+        'fast_render_us': round(fast_render * 10 ** 6, 2),
+        'parse_us': round(parse * 10 ** 6, 2),
+        'fast_parse_us': round(fast_parse * 10 ** 6, 2),
+    }
+
+
+def run(iterations=1000):
+    return {
+        'backend': 'orjson' if use_orjson() else 'stdlib',
+        'iterations': iterations,
+        'payloads': {
+            path: measure(data, iterations)
+            for path, data in payloads(BenchmarkContext()).items()
+        },
+    }
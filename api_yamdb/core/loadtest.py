@@ -0,0 +1,157 @@
+"""
+Нагрузочное сравнение ASGI (core.asgi) и WSGI при медленных клиентах.
+
+Все соединения открываются одновременно. Медленный клиент отправляет
+запрос и читает каждую часть ответа с задержкой client_delay.
+В режиме WSGI поток синхронного воркера занят всё это время,
+в режиме ASGI задержки ждёт цикл событий, а потоки заняты только
+работой Django. Оба режима получают одинаковое число потоков.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+
+from django.core.wsgi import get_wsgi_application
+
+from .asgi import ThreadPoolASGIHandler, build_environ
+from .benchmark import BenchmarkContext, clear_response_cache, percentile
+
+SERVER = ('testserver', 80)
+
+
+def read_paths(ctx):
+    """Горячие запросы на чтение: произведения, отзывы, комментарии."""
+    title = f'/api/v1/titles/{ctx.title_id}/'
+    return (
+        '/api/v1/titles/',
+        title,
+        f'{title}reviews/',
+        f'{title}reviews/{ctx.review_id}/comments/',
+    )
+
+
+def _scope(path):
+    return {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'root_path': '',
+        'query_string': b'',
+        'headers': [(b'host', SERVER[0].encode())],
+        'server': SERVER,
+        'client': ('127.0.0.1', 0),
+    }
+
+
+def wsgi_request(application, path, client_delay):
+    """Запрос медленного клиента к синхронному воркеру."""
+    time.sleep(client_delay)
+    status = []
+    result = application(
+        build_environ(_scope(path), b''),
+        lambda line, headers, exc_info=None: status.append(line)
+    )
+    try:
+        for _ in result:
+            time.sleep(client_delay)
+    finally:
+        result.close()
+    return int(status[0].split(' ', 1)[0])
+
+
+async def asgi_request(application, path, client_delay):
+    """Запрос медленного клиента к ASGI-приложению."""
+    received = False
+    status = []
+
+    async def receive():
+        nonlocal received
+        if received:
+            await asyncio.Event().wait()
+        received = True
+        await asyncio.sleep(client_delay)
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+        elif message.get('body'):
+            await asyncio.sleep(client_delay)
+
+    await application(_scope(path), receive, send)
+    return status[0]
+
+
+def _result(mode, started, finished, statuses, threads):
+    latencies = [moment - started for moment in finished]
+    wall_time = max(finished) - started
+    return {
+        'mode': mode,
+        'connections': len(finished),
+        'threads': threads,
+        'errors': sum(status >= 400 for status in statuses),
+        'wall_time_s': round(wall_time, 3),
+        'requests_per_s': round(len(finished) / wall_time, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+    }
+
+
+def run_wsgi(paths, threads, client_delay):
+    application = get_wsgi_application()
+
+    def serve(path):
+        status = wsgi_request(application, path, client_delay)
+        return status, time.perf_counter()
+
+    clear_response_cache()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        results = list(pool.map(serve, paths))
+    return _result(
+        'wsgi', started,
+        [moment for _, moment in results],
+        [status for status, _ in results],
+        threads
+    )
+
+
+def run_asgi(paths, threads, client_delay):
+    application = ThreadPoolASGIHandler(
+        get_wsgi_application(), read_workers=threads, workers=threads
+    )
+
+    async def serve(path):
+        status = await asgi_request(application, path, client_delay)
+        return status, time.perf_counter()
+
+    async def serve_all():
+        return await asyncio.gather(*(serve(path) for path in paths))
+
+    clear_response_cache()
+    started = time.perf_counter()
+    try:
+        results = asyncio.run(serve_all())
+    finally:
+        application.shutdown()
+    return _result(
+        'asgi', started,
+        [moment for _, moment in results],
+        [status for status, _ in results],
+        threads
+    )
+
+
+def run(connections=200, threads=8, client_delay=0.05):
+    """Прогоняет одинаковую нагрузку через оба режима."""
+    paths = list(islice(cycle(read_paths(BenchmarkContext())), connections))
+    return {
+        'client_delay_ms': round(client_delay * 1000, 3),
+        'results': [
+            run_wsgi(paths, threads, client_delay),
+            run_asgi(paths, threads, client_delay),
+        ],
+    }
@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+
+from core import benchmark, index_advisor
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет запросы эндпоинтов API через EXPLAIN и сообщает '
+        'о полных просмотрах таблиц и временных B-деревьях.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--endpoint',
+            action='append',
+            dest='endpoints',
+            help='Проверить только указанный эндпоинт (можно повторять).'
+        )
+        parser.add_argument(
+            '--current-db',
+            action='store_true',
+            help=(
+                'Проверять планы на текущей БД с её статистикой вместо '
+                'временной тестовой БД с синтетическими данными.'
+            )
+        )
+        parser.add_argument(
+            '--fail-on-issues',
+            action='store_true',
+            help='Завершиться ошибкой, если найдены проблемы.'
+        )
+        parser.add_argument(
+            '--show-sql',
+            action='store_true',
+            help='Выводить текст проблемных запросов.'
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = None
+        if not options['current_db']:
+            old_name = connection.settings_dict['NAME']
+            connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            if old_name is not None:
+                benchmark.seed(
+                    titles=200, reviews=2000, comments=2000,
+                    genres=10, categories=3
+                )
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+            issues = index_advisor.advise(options['endpoints'])
+        finally:
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        for issue in issues:
+            self.stdout.write(
+                f'{issue.endpoint}: {issue.problem}: {issue.detail}'
+            )
+            if options['show_sql']:
+                self.stdout.write(f'    {issue.sql}')
+        self.stdout.write(f'Найдено проблем: {len(issues)}.')
+        if issues and options['fail_on_issues']:
+            raise CommandError('Есть запросы без подходящих индексов.')
@@ -0,0 +1,109 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+
+from core import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет количество запросов к БД, задержку и память '
+        'для каждого эндпоинта API на синтетических данных.'
+    )
+
+    def add_arguments(self, parser):
+        for name, default in benchmark.DEFAULT_SIZES.items():
+            parser.add_argument(
+                f'--{name}',
+                type=int,
+                default=default,
+                help=f'Сколько создать объектов: {name}.'
+            )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20,
+            help='Сколько раз выполнить запрос к каждому эндпоинту.'
+        )
+        parser.add_argument(
+            '--warm-cache',
+            action='store_true',
+            help='Не сбрасывать кеш ответов API между запросами.'
+        )
+        parser.add_argument(
+            '--endpoint',
+            action='append',
+            dest='endpoints',
+            help='Замерить только указанный эндпоинт (можно повторять).'
+        )
+        parser.add_argument(
+            '--output',
+            help='Файл, в который записать отчёт в формате JSON.'
+        )
+        parser.add_argument(
+            '--compare',
+            help='Эталонный отчёт; при регрессии команда завершится ошибкой.'
+        )
+        parser.add_argument(
+            '--latency-tolerance',
+            type=float,
+            default=0.2,
+            help='Допустимый рост p95 относительно эталона (0.2 = 20%%).'
+        )
+        parser.add_argument(
+            '--current-db',
+            action='store_true',
+            help=(
+                'Использовать текущую БД вместо временной тестовой. '
+                'Синтетические данные останутся в ней.'
+            )
+        )
+
+    def handle(self, *args, **options):
+        missing = benchmark.uncovered_routes()
+        if missing:
+            self.stderr.write(
+                'Нет замеров для маршрутов: ' + ', '.join(missing)
+            )
+
+        sizes = {name: options[name] for name in benchmark.DEFAULT_SIZES}
+        setup_test_environment()
+        old_name = None
+        if not options['current_db']:
+            old_name = connection.settings_dict['NAME']
+            connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            benchmark.seed(**sizes)
+            results = benchmark.run(
+                options['iterations'],
+                options['warm_cache'],
+                options['endpoints']
+            )
+        finally:
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = benchmark.build_report(
+            results, sizes, options['iterations'], options['warm_cache']
+        )
+        if options['output']:
+            benchmark.save_report(report, options['output'])
+        else:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+
+        if options['compare']:
+            regressions = benchmark.compare(
+                report,
+                benchmark.load_report(options['compare']),
+                options['latency_tolerance']
+            )
+            if regressions:
+                raise CommandError(
+                    'Регрессия относительно эталона:\n'
+                    + '\n'.join(regressions)
+                )
+            self.stdout.write('Регрессий относительно эталона нет.')
@@ -0,0 +1,43 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+
+from core import benchmark, json_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает скорость JSONRenderer/JSONParser DRF и быстрых '
+        'api.renderers.FastJSONRenderer/api.parsers.FastJSONParser '
+        'на данных настоящих ответов API.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=1000,
+            help='Сколько раз закодировать и разобрать каждый ответ.'
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            benchmark.seed(
+                titles=100, reviews=100, comments=100,
+                genres=20, categories=5
+            )
+            report = json_benchmark.run(options['iterations'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+        if not all(
+            result['identical'] for result in report['payloads'].values()
+        ):
+            raise CommandError('Результаты кодирования JSON различаются.')
@@ -0,0 +1,53 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.export import DEFAULT_CHUNK_SIZE, EXPORTS, FORMATS, iter_export
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает таблицы в csv (формат loadyamdbdata) или NDJSON, '
+        'не загружая таблицы в память целиком.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output_dir',
+            help='Папка, в которую записать файлы.'
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            default='csv',
+            dest='output_format',
+            help='Формат выгрузки.'
+        )
+        parser.add_argument(
+            '--table',
+            action='append',
+            dest='tables',
+            choices=list(EXPORTS),
+            help='Выгрузить только указанную таблицу (можно повторять).'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Сколько строк читать из БД за один раз.'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть больше нуля.')
+        os.makedirs(options['output_dir'], exist_ok=True)
+        for name in options['tables'] or EXPORTS:
+            path = os.path.join(
+                options['output_dir'], f'{name}.{options["output_format"]}'
+            )
+            with open(path, 'w', encoding='utf8', newline='') as output:
+                for chunk in iter_export(
+                    name, options['output_format'], options['chunk_size']
+                ):
+                    output.write(chunk)
+            self.stdout.write(f'{name}: {path}')
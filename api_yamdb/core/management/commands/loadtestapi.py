@@ -0,0 +1,60 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+
+from core import benchmark, loadtest
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает обслуживание медленных клиентов через ASGI '
+        '(core.asgi) и WSGI на горячих запросах на чтение.'
+    )
+
+    def add_arguments(self, parser):
+        for name, default in benchmark.DEFAULT_SIZES.items():
+            parser.add_argument(
+                f'--{name}',
+                type=int,
+                default=default,
+                help=f'Сколько создать объектов: {name}.'
+            )
+        parser.add_argument(
+            '--connections',
+            type=int,
+            default=200,
+            help='Сколько одновременных соединений открыть.'
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=8,
+            help='Сколько потоков у каждого режима.'
+        )
+        parser.add_argument(
+            '--client-delay',
+            type=float,
+            default=0.05,
+            help='Задержка медленного клиента на отправку и чтение, с.'
+        )
+
+    def handle(self, *args, **options):
+        sizes = {name: options[name] for name in benchmark.DEFAULT_SIZES}
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            benchmark.seed(**sizes)
+            report = loadtest.run(
+                options['connections'],
+                options['threads'],
+                options['client_delay']
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        report['sizes'] = sizes
+        self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
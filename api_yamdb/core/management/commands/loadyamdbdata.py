@@ -1,85 +1,48 @@
-from django.core.management.base import BaseCommand
-from csv import DictReader
+import os
 
-from reviews.models import Category, Comment, Genre, TitleGenre, Title, Review
-from users.models import User
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.csv_import import DEFAULT_BATCH_SIZE, CsvImporter, ImportDataError
 
 
 class Command(BaseCommand):
     help = 'Загружает объекты и таблиц csv в БД.'
 
-    def handle(self, *args, **kwargs):
-
-        for row in DictReader(open('static/data/users.csv', encoding="utf8")):
-            user = User(
-                id=row['id'],
-                username=row['username'],
-                email=row['email'],
-                role=row['role'],
-                bio=row['bio'],
-                first_name=row['first_name'],
-                last_name=row['last_name']
-            )
-            user.save()
-
-        for row in DictReader(
-            open('static/data/category.csv', encoding="utf8")
-        ):
-            category = Category(
-                id=row['id'],
-                name=row['name'],
-                slug=row['slug']
-            )
-            category.save()
-
-        for row in DictReader(open('static/data/genre.csv', encoding="utf8")):
-            genre = Genre(
-                id=row['id'],
-                name=row['name'],
-                slug=row['slug']
-            )
-            genre.save()
-
-        for row in DictReader(open('static/data/titles.csv', encoding="utf8")):
-            title = Title(
-                id=row['id'],
-                name=row['name'],
-                year=row['year'],
-                category=Category.objects.get(id=row['category'])
-            )
-            title.save()
-
-        for row in DictReader(
-            open('static/data/genre_title.csv', encoding="utf8")
-        ):
-            genre_title = TitleGenre(
-                id=row['id'],
-                title=Title.objects.get(id=row['title_id']),
-                genre=Genre.objects.get(id=row['genre_id'])
-            )
-            genre_title.save()
-
-        for row in DictReader(open('static/data/review.csv', encoding="utf8")):
-            review = Review(
-                id=row['id'],
-                title=Title.objects.get(id=row['title_id']),
-                text=row['text'],
-                author=User.objects.get(id=row['author']),
-                score=row['score'],
-                pub_date=row['pub_date'],
-            )
-            review.save()
-
-        for row in DictReader(
-            open('static/data/comments.csv', encoding="utf8")
-        ):
-            comment = Comment(
-                id=row['id'],
-                review=Review.objects.get(id=row['review_id']),
-                text=row['text'],
-                author=User.objects.get(id=row['author']),
-                pub_date=row['pub_date'],
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--data-dir',
+            default=os.path.join(settings.BASE_DIR, 'static', 'data'),
+            help='Папка с csv-файлами.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одной пачке bulk_create.'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help=(
+                'Количество процессов для разбора csv. При значении больше '
+                'единицы независимые файлы разбираются параллельно.'
             )
-            comment.save()
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        importer = CsvImporter(
+            options['data_dir'],
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+            stdout=self.stdout
+        )
+        try:
+            importer.run()
+        except (ImportDataError, OSError) as error:
+            raise CommandError(error)
 
         self.stdout.write('Объекты загруженны в базу данных.')
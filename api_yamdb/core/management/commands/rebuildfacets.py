@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from reviews.facets import rebuild_facets
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики фасетов каталога произведений.'
+
+    def handle(self, *args, **kwargs):
+        rows = rebuild_facets()
+        self.stdout.write(f'Строк фасетов: {rows}.')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from reviews.search import get_backend, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает поисковый индекс произведений, жанров и категорий.'
+
+    def handle(self, *args, **kwargs):
+        indexed = rebuild_index()
+        self.stdout.write(
+            f'Проиндексировано объектов: {indexed} '
+            f'({type(get_backend()).__name__}).'
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from reviews.ratings import rebuild_title_ratings
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённые рейтинги произведений.'
+
+    def handle(self, *args, **kwargs):
+        updated = rebuild_title_ratings()
+        self.stdout.write(f'Рейтинг пересчитан для {updated} произведений.')
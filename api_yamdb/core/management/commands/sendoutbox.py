@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.outbox import DEFAULT_BATCH_SIZE, DEFAULT_MAX_ATTEMPTS, send_batch
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди исходящих.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество писем, отправляемых через одно соединение.'
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=DEFAULT_MAX_ATTEMPTS,
+            help='Сколько раз пытаться отправить письмо.'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Работать постоянно, проверяя очередь с паузой.'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза между проверками очереди в секундах.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            total_sent = total_failed = 0
+            while True:
+                sent, failed = send_batch(
+                    options['batch_size'], options['max_attempts']
+                )
+                total_sent += sent
+                total_failed += failed
+                if sent + failed < options['batch_size'] or not sent:
+                    break
+            if total_sent or total_failed or not options['loop']:
+                self.stdout.write(
+                    f'Отправлено писем: {total_sent}, '
+                    f'с ошибкой: {total_failed}.'
+                )
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,92 @@
+import hashlib
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import profiling
+from .db.routers import read_from_replica
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+PIN_COOKIE = 'yamdb_primary'
+
+
+def _pin_key(request):
+    authorization = request.META.get('HTTP_AUTHORIZATION')
+    if not authorization:
+        return None
+    digest = hashlib.sha1(authorization.encode()).hexdigest()
+    return f'replica-pin:{digest}'
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Направляет безопасные запросы к REPLICA_READ_PATHS на реплики.
+
+    После успешной записи клиент на REPLICA_PIN_SECONDS закрепляется
+    за основной БД, чтобы сразу видеть свои изменения: по токену
+    из заголовка Authorization и по cookie.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.paths = [
+            re.compile(pattern)
+            for pattern in getattr(settings, 'REPLICA_READ_PATHS', ())
+        ]
+
+    def is_pinned(self, request):
+        if PIN_COOKIE in request.COOKIES:
+            return True
+        key = _pin_key(request)
+        return key is not None and cache.get(key) is not None
+
+    def use_replica(self, request):
+        return (
+            request.method in SAFE_METHODS
+            and any(path.match(request.path) for path in self.paths)
+            and not self.is_pinned(request)
+        )
+
+    def pin(self, request, response):
+        seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 10)
+        key = _pin_key(request)
+        if key is not None:
+            cache.set(key, True, seconds)
+        response.set_cookie(PIN_COOKIE, '1', max_age=seconds)
+
+    def __call__(self, request):
+        if not getattr(settings, 'REPLICA_DATABASES', ()):
+            return self.get_response(request)
+        with read_from_replica(self.use_replica(request)):
+            response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            self.pin(request, response)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Профилирует выбранные запросы (см. core.profiling).
+
+    Запрос профилируется, если в нём есть разрешённый заголовок
+    PROFILING_HEADER (см. profiling.header_allowed) или он попал
+    в выборку с долей PROFILING_SAMPLE_RATE. Итоги отдаются в заголовке
+    Server-Timing и пишутся строкой JSON в журнал core.profiling.
+    Должен стоять последним в MIDDLEWARE, чтобы время отрисовки
+    ответа считалось от конца представления. Запросы потоковых
+    ответов выполняются после него и не учитываются.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not profiling.should_profile(request):
+            return self.get_response(request)
+        with profiling.profile_request() as profile:
+            response = self.get_response(request)
+        response['Server-Timing'] = profile.server_timing()
+        profiling.log_profile(profile, request, response)
+        return response
@@ -0,0 +1,45 @@
+from django.db import models
+
+
+class OutboxEmail(models.Model):
+    """Письмо, ожидающее отправки фоновым обработчиком."""
+
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    body = models.TextField(verbose_name='Текст')
+    from_email = models.CharField(max_length=254, verbose_name='Отправитель')
+    recipient = models.EmailField(max_length=254, verbose_name='Получатель')
+    created = models.DateTimeField(auto_now_add=True, verbose_name='Создано')
+    send_after = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Отправить не раньше'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток отправки'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Отправлено'
+    )
+    claim = models.CharField(
+        max_length=32,
+        blank=True,
+        verbose_name='Захвачено обработчиком'
+    )
+    claimed_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Захвачено до'
+    )
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Исходящее письмо'
+        indexes = [
+            models.Index(
+                fields=['sent_at', 'send_after'],
+                name='outbox_pending_idx'
+            ),
+        ]
@@ -0,0 +1,132 @@
+import logging
+import uuid
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+DEFAULT_BATCH_SIZE = 100
+
+DEFAULT_MAX_ATTEMPTS = 5
+
+# Пауза перед повторной отправкой растёт вдвое после каждой ошибки.
+RETRY_DELAY = timedelta(seconds=30)
+
+# Сколько письма захвачены обработчиком: если он упал, не успев
+# их отправить, по истечении срока их заберёт другой.
+CLAIM_LEASE = timedelta(minutes=5)
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(subject, body, from_email, recipient):
+    """Кладёт письмо в очередь; отправит его команда sendoutbox."""
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email,
+        recipient=recipient,
+    )
+
+
+def pending_emails(max_attempts=DEFAULT_MAX_ATTEMPTS):
+    now = timezone.now()
+    return OutboxEmail.objects.filter(
+        Q(claimed_until__isnull=True) | Q(claimed_until__lte=now),
+        sent_at__isnull=True,
+        send_after__lte=now,
+        attempts__lt=max_attempts,
+    )
+
+
+def claim_emails(batch_size=DEFAULT_BATCH_SIZE,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Захватывает пачку писем для отправки этим обработчиком.
+
+    Строки помечаются одним условным UPDATE: письмо, которое уже
+    захватил другой обработчик, под условие не попадёт, поэтому
+    одновременно запущенные sendoutbox не отправят его дважды.
+    """
+    pks = list(
+        pending_emails(max_attempts).values_list('pk', flat=True)[:batch_size]
+    )
+    if not pks:
+        return []
+    claim = uuid.uuid4().hex
+    pending_emails(max_attempts).filter(pk__in=pks).update(
+        claim=claim, claimed_until=timezone.now() + CLAIM_LEASE
+    )
+    return list(OutboxEmail.objects.filter(claim=claim))
+
+
+def _deliver(emails, connection):
+    """Отправляет письма; возвращает отправленные id и неотправленные."""
+    sent = []
+    failed = []
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            email.last_error = str(error)
+        return sent, list(emails)
+    try:
+        for email in emails:
+            message = EmailMessage(
+                email.subject,
+                email.body,
+                email.from_email,
+                [email.recipient],
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as error:
+                email.last_error = str(error)
+                failed.append(email)
+            else:
+                sent.append(email.pk)
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            logger.exception('Ошибка закрытия соединения с почтовым сервером')
+    return sent, failed
+
+
+def send_batch(batch_size=DEFAULT_BATCH_SIZE,
+               max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Отправляет пачку писем через одно соединение с почтовым сервером.
+
+    Ошибки почтового сервера, в том числе при подключении, учитываются
+    как неудачные попытки отправки. У отправленных писем стирается
+    текст. Возвращает количество отправленных и неотправленных писем.
+    """
+    emails = claim_emails(batch_size, max_attempts)
+    if not emails:
+        return 0, 0
+
+    sent, failed = _deliver(
+        emails, get_connection(fail_silently=False)
+    )
+
+    now = timezone.now()
+    # Текст отправленного письма не хранится: в нём бывают секреты,
+    # например код подтверждения, который в users хранится лишь хешем.
+    OutboxEmail.objects.filter(pk__in=sent).update(
+        sent_at=now, body='', claim='', claimed_until=None
+    )
+    for email in failed:
+        email.attempts += 1
+        email.send_after = now + RETRY_DELAY * 2 ** (email.attempts - 1)
+        email.claim = ''
+        email.claimed_until = None
+    OutboxEmail.objects.bulk_update(
+        failed,
+        ['attempts', 'send_after', 'last_error', 'claim', 'claimed_until']
+    )
+    return len(sent), len(failed)
@@ -0,0 +1,173 @@
+import hmac
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_profile', default=None)
+
+# Порядок отрезков в заголовке Server-Timing.
+TIMINGS = ('auth', 'permissions', 'serializer', 'render')
+
+SQL_PREVIEW_LENGTH = 500
+
+
+class RequestProfile:
+    """Замеры одного запроса: SQL, отрезки timed() и отрисовка ответа."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished = None
+        self.view_finished = None
+        self.timings = dict.fromkeys(TIMINGS, 0.0)
+        self.queries = []
+        self._running = set()
+
+    def execute(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((time.perf_counter() - started, sql))
+
+    def finish(self):
+        self.finished = time.perf_counter()
+        if self.view_finished is not None:
+            self.timings['render'] = self.finished - self.view_finished
+
+    @property
+    def total(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def sql_time(self):
+        return sum(duration for duration, _ in self.queries)
+
+    def slowest_queries(self, limit):
+        return sorted(self.queries, key=lambda query: -query[0])[:limit]
+
+    def server_timing(self):
+        """Значение заголовка Server-Timing (длительности в мс)."""
+        metrics = [
+            f'sql;dur={self.sql_time * 1000:.2f};'
+            f'desc="{len(self.queries)} queries"'
+        ]
+        metrics.extend(
+            f'{name};dur={self.timings[name] * 1000:.2f}'
+            for name in TIMINGS
+        )
+        metrics.append(f'total;dur={self.total * 1000:.2f}')
+        return ', '.join(metrics)
+
+    def as_record(self, request, response):
+        """Запись для журнала: по одной строке JSON на запрос."""
+        limit = getattr(settings, 'PROFILING_SLOWEST_QUERIES', 5)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(self.total * 1000, 3),
+            'queries': len(self.queries),
+            'sql_ms': round(self.sql_time * 1000, 3),
+        }
+        record.update(
+            (f'{name}_ms', round(self.timings[name] * 1000, 3))
+            for name in TIMINGS
+        )
+        record['slowest'] = [
+            {'ms': round(duration * 1000, 3),
+             'sql': sql[:SQL_PREVIEW_LENGTH]}
+            for duration, sql in self.slowest_queries(limit)
+        ]
+        return record
+
+
+def current_profile():
+    return _current.get()
+
+
+@contextmanager
+def timed(name):
+    """
+    Добавляет время выполнения блока к отрезку name профиля запроса.
+
+    Вне профилируемого запроса ничего не делает. Вложенные блоки
+    с тем же именем (например, вложенные сериализаторы) не суммируются.
+    """
+    profile = _current.get()
+    if profile is None or name in profile._running:
+        yield
+        return
+    profile._running.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.timings[name] += time.perf_counter() - started
+        profile._running.discard(name)
+
+
+def mark_view_finished():
+    """Отмечает окончание работы представления: дальше идёт отрисовка."""
+    profile = _current.get()
+    if profile is not None:
+        profile.view_finished = time.perf_counter()
+
+
+def header_allowed(request, value):
+    """
+    Можно ли включить профилирование заголовком.
+
+    Профилирование по требованию нагружает сервер и раскрывает
+    внутренности в Server-Timing, поэтому заголовок учитывается только
+    при DEBUG, с секретом PROFILING_SECRET в качестве значения или для
+    сотрудника, вошедшего через сессию (JWT проверяется позже,
+    в представлении).
+    """
+    if settings.DEBUG:
+        return True
+    secret = getattr(settings, 'PROFILING_SECRET', '')
+    if secret and hmac.compare_digest(value.encode(), secret.encode()):
+        return True
+    user = getattr(request, 'user', None)
+    return bool(user and user.is_authenticated and user.is_staff)
+
+
+def should_profile(request):
+    header = getattr(settings, 'PROFILING_HEADER', None)
+    value = request.headers.get(header) if header else None
+    if value and header_allowed(request, value):
+        return True
+    rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0)
+    return rate > 0 and random.random() < rate
+
+
+@contextmanager
+def profile_request():
+    """Собирает профиль запросов к БД и отрезков timed() внутри блока."""
+    profile = RequestProfile()
+    token = _current.set(profile)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(profile.execute)
+                )
+            yield profile
+    finally:
+        profile.finish()
+        _current.reset(token)
+
+
+def log_profile(profile, request, response):
+    record = profile.as_record(request, response)
+    logger.info(json.dumps(record, ensure_ascii=False), extra={
+        'profile': record
+    })
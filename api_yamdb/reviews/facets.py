@@ -0,0 +1,188 @@
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from .models import Title, TitleFacet, TitleGenre
+
+
+def facet_keys(category_id, year, genre_ids=()):
+    """Строки TitleFacet, в которых учитывается произведение."""
+    keys = [(category_id, year, None)]
+    keys.extend((category_id, year, genre_id) for genre_id in genre_ids)
+    return keys
+
+
+def _facet_rows(category_id, year, genre_id):
+    return TitleFacet.objects.filter(
+        category_id=category_id, year=year, genre_id=genre_id
+    )
+
+
+def change_facets(keys, delta):
+    """Прибавляет delta к счётчикам строк keys (повторы складываются)."""
+    for key, times in Counter(keys).items():
+        rows = _facet_rows(*key)
+        change = delta * times
+        if rows.update(count=F('count') + change):
+            if change < 0:
+                rows.filter(count=0).delete()
+        elif change > 0:
+            category_id, year, genre_id = key
+            try:
+                with transaction.atomic():
+                    TitleFacet.objects.create(
+                        category_id=category_id,
+                        year=year,
+                        genre_id=genre_id,
+                        count=change
+                    )
+            except IntegrityError:
+                # Строку успела создать одновременная запись.
+                rows.update(count=F('count') + change)
+
+
+def title_genre_ids(title_id):
+    return list(
+        TitleGenre.objects.filter(
+            title_id=title_id
+        ).values_list('genre_id', flat=True)
+    )
+
+
+def move_title(title_id, old, new):
+    """Переносит произведение из (категория, год) old в new."""
+    if old == new:
+        return
+    genre_ids = title_genre_ids(title_id)
+    change_facets(facet_keys(*old, genre_ids), -1)
+    change_facets(facet_keys(*new, genre_ids), 1)
+
+
+def change_title_genres(title_ids, genre_ids, delta):
+    """Учитывает добавление (delta = 1) жанров произведениям."""
+    keys = [
+        (category_id, year, genre_id)
+        for category_id, year in Title.objects.filter(
+            pk__in=title_ids
+        ).values_list('category_id', 'year')
+        for genre_id in genre_ids
+    ]
+    change_facets(keys, delta)
+
+
+@transaction.atomic
+def rebuild_facets():
+    """Пересчитывает таблицу фасетов по произведениям и их жанрам."""
+    TitleFacet.objects.all().delete()
+    rows = [
+        TitleFacet(category_id=category_id, year=year, count=count)
+        for category_id, year, count in Title.objects.order_by().values_list(
+            'category_id', 'year'
+        ).annotate(total=Count('pk'))
+    ]
+    rows.extend(
+        TitleFacet(
+            category_id=category_id, year=year, genre_id=genre_id, count=count
+        )
+        for category_id, year, genre_id, count
+        in TitleGenre.objects.order_by().values_list(
+            'title__category_id', 'title__year', 'genre_id'
+        ).annotate(total=Count('pk'))
+    )
+    TitleFacet.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def _counts(rows, *fields):
+    return list(
+        rows.order_by().values(*fields).annotate(
+            count=Sum('count')
+        ).order_by(*fields)
+    )
+
+
+def _facet_block(genres, categories, years):
+    return {
+        'genre': [
+            {'slug': row['genre__slug'], 'name': row['genre__name'],
+             'count': row['count']}
+            for row in genres
+        ],
+        'category': [
+            {'slug': row['category__slug'], 'name': row['category__name'],
+             'count': row['count']}
+            for row in categories
+        ],
+        'year': years,
+    }
+
+
+def facet_counts(category=None, genre=None, year=None):
+    """
+    Количество произведений по жанрам, категориям и годам.
+
+    Каждый фасет учитывает фильтры по остальным измерениям (слаги
+    category и genre, year), но не по своему, чтобы показать,
+    сколько произведений будет при выборе другого значения.
+    """
+    rows = TitleFacet.objects.all()
+    by_genre = rows.filter(genre__isnull=False)
+    by_title = rows.filter(genre__slug=genre) if genre else rows.filter(
+        genre__isnull=True
+    )
+    if category:
+        by_genre = by_genre.filter(category__slug=category)
+    if year:
+        by_genre = by_genre.filter(year=year)
+    by_category = by_title.filter(category__isnull=False)
+    if year:
+        by_category = by_category.filter(year=year)
+    by_year = by_title.filter(category__slug=category) if category else (
+        by_title
+    )
+    return _facet_block(
+        _counts(by_genre, 'genre__slug', 'genre__name'),
+        _counts(by_category, 'category__slug', 'category__name'),
+        _counts(by_year, 'year'),
+    )
+
+
+def _title_counts(rows, *fields):
+    return list(
+        rows.order_by().values(*fields).annotate(
+            count=Count('pk', distinct=True)
+        ).order_by(*fields)
+    )
+
+
+def count_title_facets(titles, category=None, genre=None, year=None):
+    """
+    То же, что facet_counts, для произвольной выборки произведений.
+
+    Считается группировкой по самим произведениям; используется
+    для фильтров, по которым счётчики не хранятся.
+    """
+    titles = titles.order_by()
+    by_genre = TitleGenre.objects.filter(title__in=titles.values('pk'))
+    if category:
+        by_genre = by_genre.filter(title__category__slug=category)
+    if year:
+        by_genre = by_genre.filter(title__year=year)
+    by_title = titles.filter(genre__slug=genre) if genre else titles
+    by_category = by_title.filter(category__isnull=False)
+    if year:
+        by_category = by_category.filter(year=year)
+    by_year = by_title.filter(category__slug=category) if category else (
+        by_title
+    )
+    genres = by_genre.order_by().values(
+        'genre__slug', 'genre__name'
+    ).annotate(
+        count=Count('title_id', distinct=True)
+    ).order_by('genre__slug', 'genre__name')
+    return _facet_block(
+        genres,
+        _title_counts(by_category, 'category__slug', 'category__name'),
+        _title_counts(by_year, 'year'),
+    )
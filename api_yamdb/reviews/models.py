@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 from users.models import User
@@ -24,10 +25,7 @@ class Genre(models.Model):
 
 class Title(models.Model):
     name = models.CharField(max_length=250, verbose_name='Название')
-    year = models.PositiveSmallIntegerField(
-        db_index=True,
-        verbose_name='Год создания'
-    )
+    year = models.PositiveSmallIntegerField(verbose_name='Год создания')
     description = models.TextField(blank=True, verbose_name='Описание')
     genre = models.ManyToManyField(
         Genre,
@@ -43,10 +41,50 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Категория'
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок'
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество оценок'
+    )
 
     class Meta:
         ordering = ['-id']
         verbose_name = 'Произведение'
+        # Сортировка списка по name, id; фильтры TitleFilter
+        # по категории и году с той же сортировкой.
+        indexes = [
+            models.Index(fields=['name', 'id'], name='title_name_id_idx'),
+            models.Index(
+                fields=['category', 'name', 'id'],
+                name='title_category_name_idx'
+            ),
+            models.Index(
+                fields=['year', 'name', 'id'],
+                name='title_year_name_idx'
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Для переноса счётчиков фасетов при смене категории или года.
+        instance._loaded_facet = (
+            instance.__dict__.get('category_id'),
+            instance.__dict__.get('year'),
+        )
+        return instance
+
+    @property
+    def rating(self):
+        """Средняя оценка или None, если отзывов нет."""
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
 
 
 class TitleGenre(models.Model):
@@ -61,6 +99,71 @@ class TitleGenre(models.Model):
         related_name='genres'
     )
 
+    class Meta:
+        # Фильтр произведений по жанру идёт от жанра к произведению.
+        indexes = [
+            models.Index(
+                fields=['genre', 'title'],
+                name='titlegenre_genre_title_idx'
+            ),
+        ]
+
+
+class TitleFacet(models.Model):
+    """
+    Количество произведений с данными категорией, годом и жанром.
+
+    Строки с genre = None считают произведения без учёта жанров.
+    Поддерживается сигналами (см. reviews.facets).
+    """
+
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name='+'
+    )
+    year = models.PositiveSmallIntegerField()
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name='+'
+    )
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['category', 'year', 'genre'],
+                name='title_facet_idx'
+            ),
+        ]
+        # NULL не равен NULL, поэтому уникальность каждого сочетания
+        # пустых категории и жанра задаётся своим частичным индексом.
+        constraints = [
+            models.UniqueConstraint(
+                fields=['category', 'year', 'genre'],
+                condition=Q(category__isnull=False, genre__isnull=False),
+                name='unique_title_facet'
+            ),
+            models.UniqueConstraint(
+                fields=['category', 'year'],
+                condition=Q(category__isnull=False, genre__isnull=True),
+                name='unique_title_facet_no_genre'
+            ),
+            models.UniqueConstraint(
+                fields=['year', 'genre'],
+                condition=Q(category__isnull=True, genre__isnull=False),
+                name='unique_title_facet_no_category'
+            ),
+            models.UniqueConstraint(
+                fields=['year'],
+                condition=Q(category__isnull=True, genre__isnull=True),
+                name='unique_title_facet_year'
+            ),
+        ]
+
 
 class Review(models.Model):
     author = models.ForeignKey(
@@ -88,6 +191,12 @@ class Review(models.Model):
     class Meta:
         ordering = ['-pub_date']
         verbose_name = 'Отзыв'
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', '-id'],
+                name='review_title_pub_date_idx'
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['author', 'title'],
@@ -95,6 +204,17 @@ class Review(models.Model):
              )
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем загруженную оценку, чтобы при сохранении
+        # изменить рейтинг произведения на разницу, а не пересчитывать его.
+        instance._loaded_rating = (
+            instance.__dict__.get('title_id'),
+            instance.__dict__.get('score'),
+        )
+        return instance
+
 
 class Comment(models.Model):
     author = models.ForeignKey(
@@ -115,3 +235,27 @@ class Comment(models.Model):
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'Комментарий'
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date', '-id'],
+                name='comment_review_pub_date_idx'
+            ),
+        ]
+
+
+class SearchToken(models.Model):
+    """Запись токенного поискового индекса (если нет FTS5)."""
+
+    kind = models.CharField(max_length=16)
+    object_id = models.PositiveIntegerField()
+    token = models.CharField(max_length=64)
+    weight = models.PositiveSmallIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['kind', 'token'], name='search_token_idx'),
+            models.Index(
+                fields=['kind', 'object_id'],
+                name='search_object_idx'
+            ),
+        ]
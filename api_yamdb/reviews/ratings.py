@@ -0,0 +1,31 @@
+from django.db.models import F, OuterRef, Subquery, Sum, Count, Value
+from django.db.models.functions import Coalesce
+
+from .models import Review, Title
+
+
+def change_title_rating(title_id, score_delta, count_delta):
+    """Изменяет сохранённые сумму и количество оценок произведения."""
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=F('rating_sum') + score_delta,
+        rating_count=F('rating_count') + count_delta,
+    )
+
+
+def rebuild_title_ratings(titles=None):
+    """Пересчитывает рейтинги произведений по таблице отзывов."""
+    if titles is None:
+        titles = Title.objects.all()
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    return titles.update(
+        rating_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')),
+            Value(0)
+        ),
+        rating_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('pk')).values('total')),
+            Value(0)
+        ),
+    )
@@ -0,0 +1,244 @@
+"""
+Полнотекстовый поиск по произведениям, жанрам и категориям.
+
+На SQLite со сборкой FTS5 индекс хранится в виртуальных таблицах FTS5,
+в остальных случаях - в таблице токенов SearchToken. Индекс обновляется
+обработчиками сигналов (reviews.signals) и пересобирается командой
+rebuildsearchindex.
+"""
+import re
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+
+from .models import Category, Genre, SearchToken, Title
+
+TITLE = 'title'
+GENRE = 'genre'
+CATEGORY = 'category'
+
+# Веса полей: совпадение в названии важнее, чем в описании.
+FIELD_WEIGHTS = {
+    TITLE: (('name', 10), ('description', 1), ('genres', 3), ('category', 3)),
+    GENRE: (('name', 1),),
+    CATEGORY: (('name', 1),),
+}
+
+MODELS = {TITLE: Title, GENRE: Genre, CATEGORY: Category}
+
+DEFAULT_RESULTS_LIMIT = 500
+
+TOKEN_MAX_LENGTH = SearchToken._meta.get_field('token').max_length
+
+
+def tokenize(text):
+    return [
+        token[:TOKEN_MAX_LENGTH]
+        for token in re.findall(r'\w+', text.lower())
+    ]
+
+
+def title_document(title):
+    return {
+        'name': title.name,
+        'description': title.description,
+        'genres': ' '.join(genre.name for genre in title.genre.all()),
+        'category': title.category.name if title.category else '',
+    }
+
+
+def name_document(obj):
+    return {'name': obj.name}
+
+
+DOCUMENTS = {
+    TITLE: title_document,
+    GENRE: name_document,
+    CATEGORY: name_document,
+}
+
+
+def indexed_queryset(kind):
+    queryset = MODELS[kind].objects.order_by()
+    if kind == TITLE:
+        queryset = queryset.select_related(
+            'category'
+        ).prefetch_related('genre')
+    return queryset
+
+
+class Fts5Backend:
+    """Индекс в виртуальных таблицах SQLite FTS5 (rowid = id объекта)."""
+
+    @staticmethod
+    def table(kind):
+        return f'reviews_search_{kind}'
+
+    def create_tables(self):
+        with connection.cursor() as cursor:
+            for kind, fields in FIELD_WEIGHTS.items():
+                columns = ', '.join(field for field, _ in fields)
+                cursor.execute(
+                    f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.table(kind)} '
+                    f'USING fts5({columns}, '
+                    "tokenize = 'unicode61 remove_diacritics 2')"
+                )
+
+    def clear(self, kind):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table(kind)}')
+
+    def remove(self, kind, object_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table(kind)} WHERE rowid = %s',
+                [object_id]
+            )
+
+    def index(self, kind, objects):
+        fields = [field for field, _ in FIELD_WEIGHTS[kind]]
+        rows = []
+        for obj in objects:
+            document = DOCUMENTS[kind](obj)
+            rows.append([obj.pk] + [document[field] for field in fields])
+        if not rows:
+            return
+        placeholders = ', '.join(['%s'] * (len(fields) + 1))
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT OR REPLACE INTO {self.table(kind)} '
+                f'(rowid, {", ".join(fields)}) VALUES ({placeholders})',
+                rows
+            )
+
+    def search(self, kind, query, limit):
+        terms = tokenize(query)
+        if not terms:
+            return []
+        match = ' AND '.join(f'"{term}"*' for term in terms)
+        weights = ', '.join(str(weight) for _, weight in FIELD_WEIGHTS[kind])
+        table = self.table(kind)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {table} WHERE {table} MATCH %s '
+                f'ORDER BY bm25({table}, {weights}) LIMIT %s',
+                [match, limit]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class TokenBackend:
+    """Инвертированный индекс в таблице SearchToken."""
+
+    def create_tables(self):
+        pass
+
+    def clear(self, kind):
+        SearchToken.objects.filter(kind=kind).delete()
+
+    def remove(self, kind, object_id):
+        SearchToken.objects.filter(kind=kind, object_id=object_id).delete()
+
+    def index(self, kind, objects):
+        tokens = []
+        ids = []
+        for obj in objects:
+            ids.append(obj.pk)
+            document = DOCUMENTS[kind](obj)
+            weights = defaultdict(int)
+            for field, weight in FIELD_WEIGHTS[kind]:
+                for token in tokenize(document[field]):
+                    weights[token] += weight
+            tokens.extend(
+                SearchToken(
+                    kind=kind, object_id=obj.pk, token=token, weight=weight
+                )
+                for token, weight in weights.items()
+            )
+        SearchToken.objects.filter(kind=kind, object_id__in=ids).delete()
+        SearchToken.objects.bulk_create(tokens, batch_size=1000)
+
+    def search(self, kind, query, limit):
+        scores = None
+        for term in set(tokenize(query)):
+            # Поиск по префиксу диапазоном, чтобы использовался индекс.
+            matches = SearchToken.objects.filter(
+                kind=kind, token__gte=term, token__lt=term + '\uffff'
+            ).values_list('object_id', 'weight')
+            term_scores = defaultdict(int)
+            for object_id, weight in matches:
+                term_scores[object_id] = max(term_scores[object_id], weight)
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {
+                    object_id: score + term_scores[object_id]
+                    for object_id, score in scores.items()
+                    if object_id in term_scores
+                }
+        if not scores:
+            return []
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [object_id for object_id, _ in ranked[:limit]]
+
+
+@lru_cache(maxsize=None)
+def fts5_available():
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return 'ENABLE_FTS5' in {row[0] for row in cursor.fetchall()}
+
+
+def get_backend():
+    name = getattr(settings, 'SEARCH_BACKEND', 'auto')
+    if name == 'fts5' or (name == 'auto' and fts5_available()):
+        return Fts5Backend()
+    return TokenBackend()
+
+
+def update_index(kind, object_ids):
+    """Переиндексирует объекты; удалённые из БД убирает из индекса."""
+    backend = get_backend()
+    objects = list(indexed_queryset(kind).filter(pk__in=object_ids))
+    for object_id in set(object_ids) - {obj.pk for obj in objects}:
+        backend.remove(kind, object_id)
+    backend.index(kind, objects)
+
+
+def remove_from_index(kind, object_id):
+    get_backend().remove(kind, object_id)
+
+
+def rebuild_index(batch_size=1000):
+    backend = get_backend()
+    backend.create_tables()
+    total = 0
+    for kind in MODELS:
+        backend.clear(kind)
+        queryset = indexed_queryset(kind).order_by('pk')
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            backend.index(kind, batch)
+            last_pk = batch[-1].pk
+            total += len(batch)
+    return total
+
+
+def search(kind, query, limit=None):
+    """Id объектов, подходящих под запрос, в порядке релевантности."""
+    if limit is None:
+        limit = getattr(
+            settings, 'SEARCH_RESULTS_LIMIT', DEFAULT_RESULTS_LIMIT
+        )
+    return get_backend().search(kind, query, limit)
+
+
+def create_search_tables(**kwargs):
+    get_backend().create_tables()
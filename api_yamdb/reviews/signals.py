@@ -0,0 +1,177 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+
+from . import facets, search
+from .models import Category, Genre, Review, Title, TitleGenre
+from .ratings import change_title_rating
+
+
+@receiver(pre_save, sender=Review)
+def review_saving(sender, instance, raw=False, **kwargs):
+    # Отзыв собран вручную с pk или загружен без оценки (например,
+    # через only()): прежняя оценка берётся из БД.
+    if raw or instance.pk is None:
+        return
+    if None in getattr(instance, '_loaded_rating', (None, None)):
+        instance._loaded_rating = Review.objects.filter(
+            pk=instance.pk
+        ).values_list('title_id', 'score').first()
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    """Учитывает новую или изменённую оценку в рейтинге произведения."""
+    if raw:
+        return
+    old = getattr(instance, '_loaded_rating', None)
+    if created or old is None:
+        change_title_rating(instance.title_id, instance.score, 1)
+    elif old[0] != instance.title_id:
+        change_title_rating(old[0], -old[1], -1)
+        change_title_rating(instance.title_id, instance.score, 1)
+    elif old[1] != instance.score:
+        change_title_rating(instance.title_id, instance.score - old[1], 0)
+    instance._loaded_rating = (instance.title_id, instance.score)
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    """Убирает оценку удалённого отзыва (в том числе каскадно)."""
+    change_title_rating(instance.title_id, -instance.score, -1)
+
+
+@receiver(pre_save, sender=Title)
+def title_saving(sender, instance, raw=False, **kwargs):
+    # Произведение загружено без категории или года (например,
+    # через only()): прежние значения для фасетов берутся из БД.
+    if raw or instance.pk is None:
+        return
+    if getattr(instance, '_loaded_facet', (None, None))[1] is None:
+        instance._loaded_facet = Title.objects.filter(
+            pk=instance.pk
+        ).values_list('category_id', 'year').first()
+
+
+@receiver(post_save, sender=Title)
+def title_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    search.update_index(search.TITLE, [instance.pk])
+    current = (instance.category_id, instance.year)
+    old = getattr(instance, '_loaded_facet', None)
+    if created or old is None:
+        facets.change_facets(facets.facet_keys(*current), 1)
+    else:
+        facets.move_title(instance.pk, old, current)
+    instance._loaded_facet = current
+
+
+@receiver(post_delete, sender=Title)
+def title_deleted(sender, instance, **kwargs):
+    # Строки по жанрам уменьшаются при каскадном удалении TitleGenre.
+    search.remove_from_index(search.TITLE, instance.pk)
+    facets.change_facets(
+        facets.facet_keys(instance.category_id, instance.year), -1
+    )
+
+
+@receiver(post_save, sender=TitleGenre)
+def title_genre_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    search.update_index(search.TITLE, [instance.title_id])
+    if created:
+        facets.change_title_genres(
+            [instance.title_id], [instance.genre_id], 1
+        )
+
+
+@receiver(post_delete, sender=TitleGenre)
+def title_genre_deleted(sender, instance, **kwargs):
+    search.update_index(search.TITLE, [instance.title_id])
+    facets.change_title_genres([instance.title_id], [instance.genre_id], -1)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_set(sender, instance, action, reverse, pk_set, **kwargs):
+    """Переиндексирует произведения после изменения их жанров."""
+    if action.startswith('pre_'):
+        if reverse and action == 'pre_clear':
+            instance._search_title_ids = list(
+                instance.title_set.values_list('pk', flat=True)
+            )
+        return
+    if not reverse:
+        title_ids = [instance.pk]
+    elif action == 'post_clear':
+        title_ids = getattr(instance, '_search_title_ids', [])
+    else:
+        title_ids = pk_set or []
+    search.update_index(search.TITLE, title_ids)
+    # add() создаёт строки TitleGenre через bulk_create, без сигналов;
+    # remove() и clear() удаляют их с сигналами post_delete.
+    if action == 'post_add' and pk_set:
+        if reverse:
+            facets.change_title_genres(pk_set, [instance.pk], 1)
+        else:
+            facets.change_title_genres([instance.pk], pk_set, 1)
+
+
+@receiver(post_save, sender=Genre)
+def genre_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search.update_index(search.GENRE, [instance.pk])
+    search.update_index(
+        search.TITLE,
+        TitleGenre.objects.filter(
+            genre_id=instance.pk
+        ).values_list('title_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Genre)
+def genre_deleted(sender, instance, **kwargs):
+    # Произведения переиндексируются при каскадном удалении TitleGenre.
+    search.remove_from_index(search.GENRE, instance.pk)
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search.update_index(search.CATEGORY, [instance.pk])
+    search.update_index(
+        search.TITLE,
+        Title.objects.filter(
+            category_id=instance.pk
+        ).values_list('pk', flat=True)
+    )
+
+
+@receiver(pre_delete, sender=Category)
+def category_deleting(sender, instance, **kwargs):
+    # После удаления категория у произведений обнуляется через UPDATE,
+    # без сигналов, поэтому их id запоминаются заранее.
+    instance._search_title_ids = list(
+        instance.titles.values_list('pk', flat=True)
+    )
+    # Строки фасетов категории удаляются каскадно,
+    # произведения переходят в строки без категории.
+    instance._facet_keys = [
+        key
+        for title_id, year in instance.titles.values_list('pk', 'year')
+        for key in facets.facet_keys(
+            None, year, facets.title_genre_ids(title_id)
+        )
+    ]
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    search.remove_from_index(search.CATEGORY, instance.pk)
+    search.update_index(
+        search.TITLE, getattr(instance, '_search_title_ids', [])
+    )
+    facets.change_facets(getattr(instance, '_facet_keys', []), 1)
@@ -1,5 +1,7 @@
 from django.contrib import admin
 
-from .models import User
+from .models import ConfirmationCode, TokenVersion, User
 
 admin.site.register(User)
+admin.site.register(ConfirmationCode)
+admin.site.register(TokenVersion)
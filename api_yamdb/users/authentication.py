@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import VERSION_CLAIM, get_token_version, token_user
+
+
+def get_user_cache():
+    return caches[getattr(settings, 'AUTH_USER_CACHE', 'default')]
+
+
+def user_cache_key(user_id):
+    return f'auth-user:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    get_user_cache().delete(user_cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация с кешированием пользователя.
+
+    Пользователь берётся из кеша по id из токена и загружается из БД
+    только при промахе. Запись удаляется из кеша при изменении
+    или удалении пользователя (см. users.signals).
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                'Token contained no recognizable user identification'
+            )
+
+        cache = get_user_cache()
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(
+                key,
+                user,
+                getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 300)
+            )
+        return user
+
+
+class StatelessJWTAuthentication(CachedJWTAuthentication):
+    """
+    JWT-аутентификация по утверждениям токена (users.tokens).
+
+    Пользователь строится из роли и прав, записанных в токене;
+    из кеша читается только версия токенов пользователя, чтобы
+    отозванные токены не принимались. Токены без этих утверждений
+    обрабатываются как в CachedJWTAuthentication.
+    """
+
+    def get_user(self, validated_token):
+        if VERSION_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                'Token contained no recognizable user identification'
+            )
+        if validated_token[VERSION_CLAIM] != get_token_version(user_id):
+            raise AuthenticationFailed(
+                'Token has been revoked', code='token_revoked'
+            )
+        return token_user(validated_token)
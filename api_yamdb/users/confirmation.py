@@ -0,0 +1,55 @@
+import hashlib
+import hmac
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from .models import ConfirmationCode
+
+CODE_LENGTH = 32
+
+
+def hash_code(code):
+    """
+    HMAC-SHA256 кода на SECRET_KEY.
+
+    Коды случайные и длинные, поэтому медленный хеш паролей
+    не нужен: перебор по утёкшей таблице и так невозможен.
+    """
+    return hmac.new(
+        settings.SECRET_KEY.encode(), str(code).encode(), hashlib.sha256
+    ).hexdigest()
+
+
+def create_code(user):
+    """Создаёт или заменяет код пользователя; возвращает сам код."""
+    code = get_random_string(CODE_LENGTH)
+    ConfirmationCode.objects.update_or_create(user=user, defaults={
+        'code_hash': hash_code(code),
+        'expires_at': timezone.now() + timedelta(
+            seconds=getattr(settings, 'CONFIRMATION_CODE_TTL', 86400)
+        ),
+    })
+    return code
+
+
+def check_code(confirmation, code):
+    """Совпадает ли code с сохранённым и не истёк ли он."""
+    if confirmation is None or confirmation.expires_at <= timezone.now():
+        return False
+    return hmac.compare_digest(confirmation.code_hash, hash_code(code))
+
+
+def consume_code(confirmation):
+    """
+    Погашает код после выдачи токена; код действует один раз.
+
+    Удаляется только запись с тем же хешем: из двух одновременных
+    запросов с одним кодом токен получит лишь один.
+    """
+    deleted, _ = ConfirmationCode.objects.filter(
+        pk=confirmation.pk, code_hash=confirmation.code_hash
+    ).delete()
+    return deleted > 0
@@ -21,7 +21,31 @@ class User(AbstractUser):
         verbose_name='О себе',
     )
     role = models.CharField(max_length=16, choices=CHOICES, default='user')
-    confirmation_code = models.CharField(max_length=50, blank=True)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Поля, которые попадают в токен: при их изменении
+        # выданные токены отзываются (см. users.signals).
+        instance._loaded_claims = instance.claim_values()
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Обработчики post_save видят значения до сохранения.
+        self._loaded_claims = self.claim_values()
+
+    def username_changed(self):
+        """Изменилось ли имя с загрузки (для обработчиков post_save)."""
+        loaded = getattr(self, '_loaded_claims', None)
+        return loaded is None or loaded[0] != self.username
+
+    def claim_values(self):
+        deferred = self.get_deferred_fields()
+        return tuple(
+            getattr(self, name) if name not in deferred else None
+            for name in ('username', 'role', 'is_superuser', 'is_active')
+        )
 
     @property
     def is_admin(self):
@@ -34,3 +58,42 @@ class User(AbstractUser):
     class Meta:
         ordering = ['id']
         verbose_name = 'Пользователь'
+
+
+class ConfirmationCode(models.Model):
+    """
+    Код подтверждения для получения токена (см. users.confirmation).
+
+    Хранится только HMAC кода; одна запись на пользователя.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='confirmation'
+    )
+    code_hash = models.CharField(max_length=64)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Код подтверждения'
+
+
+class TokenVersion(models.Model):
+    """
+    Версия токенов пользователя (см. users.tokens).
+
+    Увеличение версии отзывает все выданные пользователю токены.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='token_version'
+    )
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Версия токенов'
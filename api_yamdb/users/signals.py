@@ -0,0 +1,26 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_cached_user
+from .models import User
+from .tokens import forget_token_version, revoke_tokens
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    """Сбрасывает закешированного для аутентификации пользователя."""
+    invalidate_cached_user(instance.pk)
+    forget_token_version(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def user_claims_changed(sender, instance, created, **kwargs):
+    """Отзывает токены, если изменились записанные в них поля."""
+    current = instance.claim_values()
+    # Без загруженных значений (объект создан не из БД) изменение
+    # проверить нельзя: токены отзываются на всякий случай.
+    if not created and current != getattr(instance, '_loaded_claims', None):
+        revoke_tokens(instance.pk)
+        if User.token_version.is_cached(instance):
+            User.token_version.related.delete_cached_value(instance)
@@ -0,0 +1,85 @@
+import time
+from collections.abc import Mapping
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Ограничение частоты запросов «ведром токенов».
+
+    В ведре помещается N запросов из ставки 'N/период' (формат
+    DEFAULT_THROTTLE_RATES DRF), запас пополняется равномерно.
+    Состояние хранится в кеше AUTH_THROTTLE_CACHE, поэтому
+    с общим кешем (Memcached, Redis) лимит действует на все
+    процессы. Чтение и запись состояния не атомарны: при гонке
+    лимит может быть превышен на несколько запросов.
+    """
+
+    scope = None
+    periods = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+    def __init__(self):
+        rate = getattr(settings, 'AUTH_THROTTLE_RATES', {}).get(self.scope)
+        self.capacity, self.refill = self.parse_rate(rate)
+
+    def parse_rate(self, rate):
+        """Ёмкость ведра и пополнение в секунду из ставки 'N/период'."""
+        if rate is None:
+            return None, None
+        number, period = rate.split('/')
+        capacity = int(number)
+        return capacity, capacity / self.periods[period[0]]
+
+    def get_cache(self):
+        return caches[getattr(settings, 'AUTH_THROTTLE_CACHE', 'default')]
+
+    def get_key(self, request):
+        """Ключ ведра для запроса; None - запрос не ограничивается."""
+        return None
+
+    def allow_request(self, request, view):
+        self.wait_time = 0
+        key = self.capacity and self.get_key(request)
+        if not key:
+            return True
+        cache = self.get_cache()
+        key = f'throttle:{self.scope}:{key}'
+        now = time.time()
+        tokens, updated = cache.get(key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated) * self.refill)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        else:
+            self.wait_time = (1 - tokens) / self.refill
+        cache.set(key, (tokens, now), int(self.capacity / self.refill) + 1)
+        return allowed
+
+    def wait(self):
+        return self.wait_time
+
+
+class IPThrottle(TokenBucketThrottle):
+    """Запросы с одного адреса."""
+
+    scope = 'ip'
+
+    def get_key(self, request):
+        # Адрес из X-Forwarded-For учитывается только за доверенными
+        # прокси (NUM_PROXIES в REST_FRAMEWORK), иначе - REMOTE_ADDR.
+        return self.get_ident(request)
+
+
+class UsernameThrottle(TokenBucketThrottle):
+    """Попытки получить токен для одного имени пользователя."""
+
+    scope = 'username'
+
+    def get_key(self, request):
+        if not isinstance(request.data, Mapping):
+            return None
+        username = request.data.get('username')
+        return str(username).lower() if username else None
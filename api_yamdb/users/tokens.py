@@ -0,0 +1,115 @@
+"""
+Токены с ролью пользователя и версией для отзыва.
+
+Кроме id в токен записываются username, role, is_superuser
+и версия токенов пользователя (TokenVersion). С такими токенами
+users.authentication.StatelessJWTAuthentication не загружает
+пользователя из БД: проверяется только версия, которая хранится
+в кеше. Увеличение версии (revoke_tokens) отзывает все токены
+пользователя; так же отзываются токены при смене роли, имени,
+прав суперпользователя, блокировке и удалении (см. users.signals).
+
+Версии хранятся в кеше AUTH_USER_CACHE. При нескольких процессах
+он должен быть общим (см. core.caches), иначе отзыв дойдёт только
+до процесса, который его выполнил.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import F
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import TokenVersion, User
+
+CLAIMS = ('username', 'role', 'is_superuser')
+VERSION_CLAIM = 'ver'
+
+# Версия для удалённого или заблокированного пользователя.
+REVOKED = -1
+
+
+def _cache():
+    return caches[getattr(settings, 'AUTH_USER_CACHE', 'default')]
+
+
+def version_cache_key(user_id):
+    return f'token-version:{user_id}'
+
+
+def get_token_version(user_id):
+    """Текущая версия токенов пользователя; читается через кеш."""
+    cache = _cache()
+    key = version_cache_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        rows = list(User.objects.filter(
+            pk=user_id, is_active=True
+        ).values_list('token_version__version', flat=True))
+        version = REVOKED if not rows else rows[0] or 0
+        cache.set(
+            key, version, getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 300)
+        )
+    return version
+
+
+def forget_token_version(user_id):
+    _cache().delete(version_cache_key(user_id))
+
+
+def revoke_tokens(user_id):
+    """Отзывает все выданные пользователю токены."""
+    # Строка создаётся отдельно от увеличения версии: при одновременном
+    # отзыве get_or_create не упадёт на дубликате, а F() не потеряет
+    # ни одного увеличения.
+    TokenVersion.objects.get_or_create(user_id=user_id)
+    TokenVersion.objects.filter(user_id=user_id).update(
+        version=F('version') + 1
+    )
+    forget_token_version(user_id)
+
+
+def user_token_version(user):
+    """Версия из select_related('token_version'), иначе через кеш."""
+    if not User.token_version.is_cached(user):
+        return get_token_version(user.pk)
+    try:
+        return user.token_version.version
+    except TokenVersion.DoesNotExist:
+        return 0
+
+
+class RoleAccessToken(AccessToken):
+    """AccessToken с ролью пользователя и версией токенов."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in CLAIMS:
+            token[claim] = getattr(user, claim)
+        token[VERSION_CLAIM] = user_token_version(user)
+        return token
+
+
+def token_user(validated_token):
+    """
+    Пользователь из утверждений токена без запроса к БД.
+
+    Остальные поля отложены и загружаются при обращении,
+    как у выборки через only().
+    """
+    values = {
+        api_settings.USER_ID_FIELD: validated_token[
+            api_settings.USER_ID_CLAIM
+        ],
+        'is_active': True,
+    }
+    values.update((claim, validated_token[claim]) for claim in CLAIMS)
+    # from_db ожидает значения в порядке полей модели.
+    names = [
+        field.attname for field in User._meta.concrete_fields
+        if field.attname in values
+    ]
+    return User.from_db(
+        DEFAULT_DB_ALIAS, names, [values[name] for name in names]
+    )
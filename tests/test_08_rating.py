@@ -0,0 +1,77 @@
+import pytest
+from django.core.management import call_command
+
+from .common import auth_client, create_reviews
+
+
+class Test08TitleRating:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_rating_follows_review_changes(self, admin_client, admin):
+        from reviews.models import Title
+
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        title = Title.objects.get(id=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (12, 3), (
+            'Проверьте, что при создании отзыва обновляются сумма и количество оценок произведения'
+        )
+
+        auth_client(user).patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/',
+            data={'score': 9}
+        )
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (18, 3), (
+            'Проверьте, что при изменении оценки рейтинг произведения пересчитывается'
+        )
+
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/')
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (13, 2), (
+            'Проверьте, что при удалении отзыва оценка убирается из рейтинга'
+        )
+
+        moderator.delete()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (9, 1), (
+            'Проверьте, что при каскадном удалении отзывов рейтинг пересчитывается'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_recalculate_command(self, admin_client, admin):
+        from reviews.models import Title
+
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        Title.objects.update(rating_sum=0, rating_count=0)
+        call_command('recalculaterating')
+        title = Title.objects.get(id=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (12, 3), (
+            'Проверьте, что команда `recalculaterating` пересчитывает рейтинг'
+        )
+        title = Title.objects.get(id=titles[1]['id'])
+        assert title.rating is None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_update_without_loaded_score(self, admin_client, admin):
+        from reviews.models import Review, Title
+
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        review = Review.objects.get(pk=reviews[1]['id'])
+        Review(
+            pk=review.pk, author_id=review.author_id, title_id=review.title_id,
+            text=review.text, score=9, pub_date=review.pub_date
+        ).save()
+        title = Title.objects.get(id=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (18, 3), (
+            'Проверьте, что сохранение существующего отзыва, собранного '
+            'вручную, меняет рейтинг на разницу оценок, а не добавляет оценку'
+        )
+
+        review = Review.objects.only('text').get(pk=reviews[1]['id'])
+        review.score = 3
+        review.save()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (12, 3), (
+            'Проверьте, что отзыв, загруженный без оценки, '
+            'меняет рейтинг на разницу оценок'
+        )
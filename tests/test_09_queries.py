@@ -0,0 +1,106 @@
+import pytest
+
+from .common import create_comments, create_reviews, create_titles
+
+
+class Test09QueryCount:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_list_queries(self, client, admin_client, django_assert_num_queries):
+        create_titles(admin_client)
+        extra_titles = [
+            {'name': f'Произведение {i}', 'year': 2000 + i, 'genre': ['horror', 'drama'],
+             'category': 'films'}
+            for i in range(8)
+        ]
+        for data in extra_titles:
+            admin_client.post('/api/v1/titles/', data=data)
+
+        # count + произведения с категориями + жанры
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert len(response.json()['results']) == 10
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_title_detail_queries(self, client, admin_client, django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+
+        # произведение с категорией + жанры
+        with django_assert_num_queries(2):
+            response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.status_code == 200
+        assert len(response.json()['genre']) == 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_authenticated_user_cached(self, user, user_client, django_assert_num_queries):
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == 200
+
+        with django_assert_num_queries(0):
+            response = user_client.get('/api/v1/users/me/')
+        assert response.json()['username'] == user.username, (
+            'Проверьте, что пользователь из токена берётся из кеша без запросов к БД'
+        )
+
+        user_client.patch('/api/v1/users/me/', data={'bio': 'new bio'})
+        response = user_client.get('/api/v1/users/me/')
+        assert response.json()['bio'] == 'new bio', (
+            'Проверьте, что кеш пользователя сбрасывается при изменении профиля'
+        )
+
+    def test_04_shared_user_cache_required(self, settings):
+        from django.core.exceptions import ImproperlyConfigured
+
+        from core.caches import check_shared_caches
+
+        settings.WEB_CONCURRENCY = 1
+        check_shared_caches()
+        settings.WEB_CONCURRENCY = 4
+        with pytest.raises(ImproperlyConfigured):
+            check_shared_caches()
+        settings.CACHES = {
+            **settings.CACHES,
+            'shared': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': '/tmp/yamdb-cache',
+            },
+        }
+        settings.AUTH_USER_CACHE = 'shared'
+        settings.API_RESPONSE_CACHE = 'shared'
+        settings.AUTH_THROTTLE_CACHE = 'shared'
+        check_shared_caches()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_comments_list_queries(self, client, admin_client, admin, django_assert_num_queries):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/'
+
+        # отзыв вместе с проверкой произведения + count + комментарии с авторами
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        results = response.json()['results']
+        assert len(results) == len(comments)
+        assert {comment['author'] for comment in results} == {comment['author'] for comment in comments}
+        assert {comment['review'] for comment in results} == {'qwerty'}
+
+        response = client.get(f'/api/v1/titles/{titles[1]["id"]}/reviews/{reviews[0]["id"]}/comments/')
+        assert response.status_code == 404, (
+            'Проверьте, что комментарии отзыва из другого произведения не отдаются'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_reviews_list_queries(self, client, admin_client, admin, django_assert_num_queries):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+        # произведение + count + отзывы с авторами
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        results = response.json()['results']
+        assert {review['author'] for review in results} == {review['author'] for review in reviews}
+
+        # произведение + отзыв с автором
+        with django_assert_num_queries(2):
+            response = client.get(f'{url}{reviews[0]["id"]}/')
+        assert response.json()['author'] == reviews[0]['author']
@@ -0,0 +1,99 @@
+import csv
+import os
+import shutil
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from .conftest import MANAGE_PATH
+
+DATA_DIR = os.path.join(MANAGE_PATH, 'static', 'data')
+
+
+def count_rows(filename):
+    with open(os.path.join(DATA_DIR, filename), encoding='utf8', newline='') as f:
+        return sum(1 for _ in csv.DictReader(f))
+
+
+def malformed_data_dir(tmp_path):
+    """Копия данных, где у второго произведения год записан словами."""
+    data_dir = tmp_path / 'data'
+    shutil.copytree(DATA_DIR, data_dir)
+    titles = data_dir / 'titles.csv'
+    lines = titles.read_text(encoding='utf8').splitlines(keepends=True)
+    lines[2] = lines[2].replace(',1972,', ',семьдесят второй,')
+    titles.write_text(''.join(lines), encoding='utf8')
+    return str(data_dir)
+
+
+class Test10ImportData:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_load_csv(self):
+        from reviews.models import Comment, Review, Title, TitleGenre
+        from users.models import User
+
+        call_command('loadyamdbdata', data_dir=DATA_DIR, batch_size=7)
+
+        for model, filename in (
+            (User, 'users.csv'),
+            (Title, 'titles.csv'),
+            (TitleGenre, 'genre_title.csv'),
+            (Review, 'review.csv'),
+            (Comment, 'comments.csv'),
+        ):
+            assert model.objects.count() == count_rows(filename), (
+                f'Проверьте, что команда `loadyamdbdata` загружает все строки из `{filename}`'
+            )
+
+        review = Review.objects.get(id=1)
+        assert review.pub_date.isoformat().startswith('2019-09-24T21:08:21'), (
+            'Проверьте, что при загрузке сохраняется дата публикации из файла'
+        )
+        title = Title.objects.get(id=review.title_id)
+        assert title.rating_count == title.reviews.count(), (
+            'Проверьте, что после загрузки пересчитывается рейтинг произведений'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_load_csv_parallel(self):
+        from reviews.models import Comment, Genre, Review
+
+        call_command('loadyamdbdata', data_dir=DATA_DIR, workers=3)
+
+        for model, filename in (
+            (Genre, 'genre.csv'),
+            (Review, 'review.csv'),
+            (Comment, 'comments.csv'),
+        ):
+            assert model.objects.count() == count_rows(filename), (
+                'Проверьте, что при параллельной загрузке `loadyamdbdata --workers` '
+                f'загружаются все строки из `{filename}`'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_malformed_value(self, tmp_path):
+        with pytest.raises(CommandError, match=r'titles\.csv, строка 3'):
+            call_command('loadyamdbdata', data_dir=malformed_data_dir(tmp_path))
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_malformed_value_parallel(self, tmp_path):
+        from reviews.models import Title
+
+        with pytest.raises(CommandError, match=r'titles\.csv, строка 3'):
+            call_command(
+                'loadyamdbdata', data_dir=malformed_data_dir(tmp_path), workers=3
+            )
+        assert not Title.objects.exists(), (
+            'Проверьте, что при ошибке в файле его строки не записываются'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_broken_file_parallel(self, tmp_path):
+        data_dir = tmp_path / 'data'
+        shutil.copytree(DATA_DIR, data_dir)
+        (data_dir / 'genre.csv').write_bytes(
+            'id,name,slug\n1,Драма,drama\n'.encode('cp1251')
+        )
+        with pytest.raises(CommandError, match=r'genre\.csv: файл не в кодировке UTF-8'):
+            call_command('loadyamdbdata', data_dir=str(data_dir), workers=3)
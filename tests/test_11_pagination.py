@@ -0,0 +1,96 @@
+import pytest
+
+
+class Test11CursorPagination:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_cursor(self, client, django_assert_max_num_queries):
+        from reviews.models import Title
+
+        for i in range(25):
+            Title.objects.create(name=f'Произведение {i % 5}', year=2000)
+
+        response = client.get('/api/v1/titles/?pagination=cursor')
+        assert response.status_code == 200
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что при `?pagination=cursor` не выполняется подсчёт всех объектов'
+        )
+        received = [title['id'] for title in data['results']]
+        while data['next']:
+            with django_assert_max_num_queries(2):
+                response = client.get(data['next'])
+            data = response.json()
+            received.extend(title['id'] for title in data['results'])
+
+        expected = list(
+            Title.objects.order_by('name', 'id').values_list('id', flat=True)
+        )
+        assert received == expected, (
+            'Проверьте, что пагинация по курсору обходит все произведения без повторов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_default_pagination_kept(self, client):
+        response = client.get('/api/v1/titles/')
+        assert 'count' in response.json(), (
+            'Проверьте, что по умолчанию используется постраничная пагинация'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_keyset_with_duplicate_names(self, client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.models import Title
+
+        Title.objects.bulk_create(
+            Title(name='Одно название', year=2000) for _ in range(35)
+        )
+        pages = [client.get('/api/v1/titles/?pagination=cursor').json()]
+        while pages[-1]['next']:
+            with CaptureQueriesContext(connection) as queries:
+                pages.append(client.get(pages[-1]['next']).json())
+            assert not any('OFFSET' in query['sql'] for query in queries.captured_queries), (
+                'Проверьте, что страница по курсору выбирается без OFFSET '
+                'даже при повторяющихся названиях'
+            )
+        received = [title['id'] for page in pages for title in page['results']]
+        assert received == sorted(received) and len(received) == 35
+
+        previous = client.get(pages[-1]['previous']).json()
+        assert previous['results'] == pages[-2]['results'], (
+            'Проверьте, что ссылка previous ведёт на предыдущую страницу'
+        )
+        assert client.get(pages[1]['previous']).json()['previous'] is None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_invalid_cursor(self, client):
+        response = client.get('/api/v1/titles/?cursor=not-a-cursor')
+        assert response.status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_reviews_cursor_by_date(self, client, admin):
+        from django.utils import timezone
+
+        from reviews.models import Review, Title
+        from users.models import User
+
+        title = Title.objects.create(name='С отзывами', year=2000)
+        moment = timezone.now().replace(microsecond=123456)
+        for index in range(15):
+            author = User.objects.create(username=f'reviewer{index}', email=f'r{index}@yamdb.fake')
+            review = Review.objects.create(title=title, author=author, text='Текст', score=5)
+            # Половина отзывов с одинаковой датой: порядок задаёт id.
+            Review.objects.filter(pk=review.pk).update(pub_date=moment if index % 2 else timezone.now())
+
+        url = f'/api/v1/titles/{title.pk}/reviews/?pagination=cursor'
+        data = client.get(url).json()
+        received = [review['id'] for review in data['results']]
+        while data['next']:
+            data = client.get(data['next']).json()
+            received.extend(review['id'] for review in data['results'])
+        expected = list(
+            Review.objects.order_by('-pub_date', '-id').values_list('id', flat=True)
+        )
+        assert received == expected
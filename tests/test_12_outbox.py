@@ -0,0 +1,103 @@
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+
+class Test12EmailOutbox:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_queues_email(self, client):
+        from core.models import OutboxEmail
+
+        outbox_before_count = len(mail.outbox)
+        response = client.post(
+            '/api/v1/auth/signup/',
+            data={'email': 'queued@yamdb.fake', 'username': 'queued'}
+        )
+        assert response.status_code == 200
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что при регистрации письмо не отправляется во время запроса'
+        )
+        email = OutboxEmail.objects.get()
+        assert email.recipient == 'queued@yamdb.fake' and email.sent_at is None, (
+            'Проверьте, что при регистрации письмо кладётся в очередь исходящих'
+        )
+
+        call_command('sendoutbox')
+        assert len(mail.outbox) == outbox_before_count + 1
+        email.refresh_from_db()
+        assert email.sent_at is not None, (
+            'Проверьте, что команда `sendoutbox` отмечает отправленные письма'
+        )
+
+        code = mail.outbox[-1].body.split()[-1]
+        assert not OutboxEmail.objects.filter(body__contains=code).exists(), (
+            'Проверьте, что после отправки код подтверждения '
+            'не остаётся в таблице исходящих писем'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_failed_email_retried(self):
+        from core.models import OutboxEmail
+        from core.outbox import enqueue_email, send_batch
+
+        enqueue_email('Тема', 'Текст', 'auth@yamdb.ru', 'retry@yamdb.fake')
+        with mock.patch(
+            'django.core.mail.EmailMessage.send',
+            side_effect=ConnectionError('mail server is down')
+        ):
+            assert send_batch() == (0, 1)
+
+        email = OutboxEmail.objects.get()
+        assert email.attempts == 1 and email.sent_at is None
+        assert 'mail server is down' in email.last_error
+        assert send_batch() == (0, 0), (
+            'Проверьте, что повторная отправка откладывается'
+        )
+
+        OutboxEmail.objects.update(send_after=email.created)
+        assert send_batch() == (1, 0)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_connection_error_counts_as_attempt(self):
+        from core.models import OutboxEmail
+        from core.outbox import enqueue_email, send_batch
+
+        enqueue_email('Тема', 'Текст', 'auth@yamdb.ru', 'down@yamdb.fake')
+        with mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.open',
+            side_effect=ConnectionRefusedError('connection refused')
+        ):
+            assert send_batch() == (0, 1), (
+                'Проверьте, что ошибка подключения к почтовому серверу '
+                'не прерывает обработку очереди'
+            )
+        email = OutboxEmail.objects.get()
+        assert email.attempts == 1 and 'connection refused' in email.last_error
+        assert not email.claim and email.claimed_until is None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_claimed_emails_not_sent_twice(self):
+        from core.models import OutboxEmail
+        from core.outbox import claim_emails, enqueue_email, send_batch
+
+        for index in range(3):
+            enqueue_email('Тема', 'Текст', 'auth@yamdb.ru', f'{index}@yamdb.fake')
+        claimed = claim_emails(batch_size=2)
+        assert len(claimed) == 2
+        outbox_before_count = len(mail.outbox)
+        assert send_batch() == (1, 0), (
+            'Проверьте, что письма, захваченные другим обработчиком, '
+            'не отправляются повторно'
+        )
+        assert len(mail.outbox) == outbox_before_count + 1
+
+        OutboxEmail.objects.filter(
+            pk__in=[email.pk for email in claimed]
+        ).update(claimed_until=OutboxEmail.objects.get(pk=claimed[0].pk).created)
+        assert send_batch() == (2, 0), (
+            'Проверьте, что письма упавшего обработчика отправляются '
+            'по истечении захвата'
+        )
@@ -0,0 +1,187 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test13ResponseCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_cached_and_invalidated(self, client, admin_client, django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/?genre=horror'
+        client.get(url)
+        with django_assert_num_queries(0):
+            response = client.get(url)
+        assert response.json()['count'] == 1, (
+            'Проверьте, что повторный GET запрос списка произведений берётся из кеша'
+        )
+        response = client.get('/api/v1/titles/?genre=drama')
+        assert response.json()['count'] == 1, (
+            'Проверьте, что ключ кеша учитывает параметры фильтрации'
+        )
+
+        admin_client.post(f'/api/v1/titles/{titles[0]["id"]}/reviews/', data={'text': 'Отзыв', 'score': 8})
+        response = client.get(url)
+        assert response.json()['results'][0]['rating'] == 8, (
+            'Проверьте, что отзыв сбрасывает закешированный список произведений'
+        )
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json()['rating'] == 8
+
+        admin_client.patch(f'/api/v1/titles/{titles[0]["id"]}/', data={'name': 'Новое название'})
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json()['name'] == 'Новое название', (
+            'Проверьте, что изменение произведения сбрасывает закешированный ответ'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_genres_invalidated(self, client, admin_client):
+        admin_client.post('/api/v1/genres/', data={'name': 'Ужасы', 'slug': 'horror'})
+        assert client.get('/api/v1/genres/').json()['count'] == 1
+        admin_client.post('/api/v1/genres/', data={'name': 'Драма', 'slug': 'drama'})
+        assert client.get('/api/v1/genres/').json()['count'] == 2, (
+            'Проверьте, что создание жанра сбрасывает закешированный список'
+        )
+        admin_client.delete('/api/v1/genres/drama/')
+        assert client.get('/api/v1/genres/').json()['count'] == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_conditional_get(self, client, admin_client, django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        admin_client.post(url, data={'text': 'Отзыв', 'score': 8})
+
+        response = client.get(url)
+        etag = response['ETag']
+        assert etag and response.has_header('Last-Modified'), (
+            'Проверьте, что список отзывов отдаётся с заголовками `ETag` и `Last-Modified`'
+        )
+        with django_assert_num_queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что при совпадении `If-None-Match` возвращается статус 304'
+        )
+
+        review_id = client.get(url).json()['results'][0]['id']
+        comments_url = f'{url}{review_id}/comments/'
+        comments_etag = client.get(comments_url)['ETag']
+        admin_client.post(comments_url, data={'text': 'Комментарий'})
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=comments_etag)
+        assert response.status_code == 200 and response.json()['count'] == 1, (
+            'Проверьте, что новый комментарий меняет `ETag` списка комментариев'
+        )
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        admin_client.patch(f'{url}{review_id}/', data={'score': 2})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что изменение отзыва меняет `ETag` списка отзывов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_author_changes(self, client, admin_client, admin):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        admin_client.post(url, data={'text': 'Отзыв', 'score': 8})
+        etag = client.get(url)['ETag']
+
+        admin.bio = 'Другое описание'
+        admin.save()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304, (
+            'Проверьте, что изменение полей автора, которые не выводятся '
+            'в отзывах, не сбрасывает кеш'
+        )
+        admin.username = 'RenamedAdmin'
+        admin.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что смена имени автора сбрасывает кеш отзывов'
+        )
+        assert response.json()['results'][0]['author'] == 'RenamedAdmin'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_invalidated_after_commit(self, client, admin_client):
+        from django.db import transaction
+
+        from api import cache
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        etag = client.get(url)['ETag']
+        namespaces = [cache.TITLES_LIST, cache.title_namespace(titles[0]['id'])]
+        before = cache.get_generations(namespaces)
+        with transaction.atomic():
+            Title.objects.get(pk=titles[0]['id']).delete()
+            assert cache.get_generations(namespaces) == before, (
+                'Проверьте, что кеш сбрасывается только после фиксации транзакции'
+            )
+            assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 404, (
+            'Проверьте, что после фиксации транзакции кеш сброшен'
+        )
+
+    def test_06_shared_response_cache_required(self, settings):
+        from django.core.exceptions import ImproperlyConfigured
+
+        from core.caches import check_shared_caches
+
+        settings.WEB_CONCURRENCY = 2
+        settings.CACHES = {
+            **settings.CACHES,
+            'shared': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': '/tmp/yamdb-cache',
+            },
+        }
+        settings.AUTH_USER_CACHE = 'shared'
+        settings.AUTH_THROTTLE_CACHE = 'shared'
+        with pytest.raises(ImproperlyConfigured, match='API_RESPONSE_CACHE'):
+            check_shared_caches()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_validators_depend_on_format(self, client, admin_client):
+        create_titles(admin_client)
+        url = '/api/v1/genres/'
+        response = client.get(url)
+        assert {'Accept', 'Authorization'} <= {
+            header.strip() for header in response['Vary'].split(',')
+        }, 'Проверьте, что закешированный ответ помечен `Vary: Accept, Authorization`'
+        etag = response['ETag']
+
+        response = client.get(url, HTTP_ACCEPT='text/html')
+        assert response['ETag'] != etag, (
+            'Проверьте, что у HTML и JSON ответов по одному адресу разные ETag'
+        )
+        assert response['Content-Type'].startswith('text/html')
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304 and 'Accept' in response['Vary']
+        response = client.get(url)
+        assert response['Content-Type'] == 'application/json', (
+            'Проверьте, что HTML-ответ не попадает в кеш JSON-ответов'
+        )
+
+    def test_08_max_entries_from_environment(self, monkeypatch):
+        import importlib
+
+        from api_yamdb import settings
+
+        try:
+            monkeypatch.setenv(
+                'CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'
+            )
+            monkeypatch.setenv('CACHE_LOCATION', '/tmp/yamdb-cache')
+            reloaded = importlib.reload(settings)
+            assert reloaded.CACHES['default']['OPTIONS'] == {'MAX_ENTRIES': 10000}, (
+                'Проверьте, что файловый кеш с CACHE_LOCATION получает MAX_ENTRIES'
+            )
+            monkeypatch.setenv(
+                'CACHE_BACKEND', 'django.core.cache.backends.memcached.MemcachedCache'
+            )
+            reloaded = importlib.reload(settings)
+            assert reloaded.CACHES['api']['OPTIONS'] == {}, (
+                'Проверьте, что memcached не получает неизвестный ему MAX_ENTRIES'
+            )
+        finally:
+            monkeypatch.undo()
+            importlib.reload(settings)
@@ -0,0 +1,57 @@
+import pytest
+
+
+class Test14Benchmark:
+
+    def test_01_all_routes_covered(self):
+        from core import benchmark
+
+        assert benchmark.uncovered_routes() == [], (
+            'Проверьте, что в `core.benchmark.ENDPOINTS` есть замер для каждого маршрута `api/urls.py`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_run_and_compare(self):
+        from core import benchmark
+
+        from reviews import search
+
+        benchmark.seed(titles=5, reviews=12, comments=6, genres=2, categories=1)
+        assert len(search.search(search.TITLE, 'произведение')) == 5, (
+            'Проверьте, что `benchmark.seed` строит поисковый индекс'
+        )
+        results = benchmark.run(iterations=2)
+        assert set(results) == {endpoint.name for endpoint in benchmark.ENDPOINTS}
+        for name, result in results.items():
+            assert result['status'] < 400, f'Эндпоинт `{name}` вернул {result["status"]}'
+            assert result['p95_ms'] >= result['p50_ms']
+
+        report = benchmark.build_report(results, {}, 2, False)
+        assert benchmark.compare(report, report) == []
+        worse = benchmark.build_report(
+            {**results, 'titles-list': {**results['titles-list'], 'queries': 100}}, {}, 2, False
+        )
+        assert benchmark.compare(worse, report) == [
+            f'titles-list: запросов к БД {results["titles-list"]["queries"]} -> 100'
+        ]
+
+    def test_03_index_advisor_plan_rules(self):
+        from core.index_advisor import find_problems
+
+        assert find_problems(['SEARCH reviews_review USING INDEX review_title_pub_date_idx (title_id=?)']) == []
+        assert find_problems(['SCAN reviews_genre']) == []
+        assert find_problems(['SCAN reviews_comment']) == [('full scan', 'SCAN reviews_comment')]
+        assert find_problems(['USE TEMP B-TREE FOR ORDER BY']) == [('temp b-tree', 'USE TEMP B-TREE FOR ORDER BY')]
+        assert find_problems(['Seq Scan on reviews_title  (cost=0.00..1.00 rows=1 width=4)']) != []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_hot_paths_use_indexes(self):
+        from core import benchmark, index_advisor
+
+        benchmark.seed(titles=20, reviews=60, comments=60, genres=3, categories=2)
+        issues = index_advisor.advise(
+            ['titles-list-filtered', 'reviews-list', 'comments-list']
+        )
+        assert [issue for issue in issues if issue.problem == 'full scan'] == [], (
+            'Проверьте, что для фильтров произведений, отзывов и комментариев есть индексы'
+        )
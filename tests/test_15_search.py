@@ -0,0 +1,95 @@
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from reviews.search import fts5_available
+
+from .common import create_titles
+
+
+@pytest.fixture(params=['fts5', 'tokens'])
+def search_backend(request):
+    if request.param == 'fts5' and not fts5_available():
+        pytest.skip('FTS5 есть только в SQLite, собранном с этим модулем')
+    with override_settings(SEARCH_BACKEND=request.param):
+        call_command('rebuildsearchindex')
+        yield request.param
+
+
+class Test15FullTextSearch:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_search(self, client, admin_client, search_backend):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Драма в двух частях', 'year': 2001, 'genre': ['comedy'],
+            'category': 'films', 'description': 'Поворот'
+        })
+
+        response = client.get('/api/v1/titles/?q=драм')
+        names = [title['name'] for title in response.json()['results']]
+        assert names == ['Драма в двух частях', 'Проект'], (
+            'Проверьте, что `?q=` ищет по префиксу в названии и жанрах '
+            'и совпадения в названии идут первыми'
+        )
+
+        response = client.get('/api/v1/titles/?q=поворот')
+        names = [title['name'] for title in response.json()['results']]
+        assert names == ['Поворот туда', 'Драма в двух частях'], (
+            'Проверьте, что совпадение в названии ранжируется выше совпадения в описании'
+        )
+
+        response = client.get('/api/v1/titles/?q=поворот пике')
+        assert [title['id'] for title in response.json()['results']] == [titles[0]['id']], (
+            'Проверьте, что все слова запроса должны совпасть'
+        )
+
+        response = client.get('/api/v1/titles/?q=ужасы')
+        assert [title['id'] for title in response.json()['results']] == [titles[0]['id']]
+        admin_client.delete('/api/v1/genres/horror/')
+        response = client.get('/api/v1/titles/?q=ужасы')
+        assert response.json()['results'] == [], (
+            'Проверьте, что индекс обновляется при удалении жанра'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_genres_search(self, client, admin_client, search_backend):
+        admin_client.post('/api/v1/genres/', data={'name': 'Научная фантастика', 'slug': 'sci-fi'})
+        admin_client.post('/api/v1/genres/', data={'name': 'Фэнтези', 'slug': 'fantasy'})
+        response = client.get('/api/v1/genres/?q=фант')
+        assert [genre['slug'] for genre in response.json()['results']] == ['sci-fi']
+        response = client.get('/api/v1/categories/?q=фант')
+        assert response.json()['results'] == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_search_with_cursor_pagination(self, client, search_backend):
+        from reviews.models import Title
+
+        Title.objects.bulk_create(
+            Title(name=f'Яблоко {index}', year=2000, description='')
+            for index in range(6)
+        )
+        Title.objects.bulk_create(
+            Title(name=f'Груша {index}', year=2000, description='про яблоко')
+            for index in range(6)
+        )
+        call_command('rebuildsearchindex')
+
+        expected = [
+            title['name']
+            for title in client.get(
+                '/api/v1/titles/', {'q': 'яблоко'}
+            ).json()['results']
+        ]
+        data = client.get(
+            '/api/v1/titles/', {'q': 'яблоко', 'pagination': 'cursor'}
+        ).json()
+        received = [title['name'] for title in data['results']]
+        while data['next']:
+            data = client.get(data['next']).json()
+            received.extend(title['name'] for title in data['results'])
+        assert len(received) == 12
+        assert received[:len(expected)] == expected, (
+            'Проверьте, что с пагинацией по курсору результаты поиска '
+            'сохраняют порядок по релевантности'
+        )
+        assert all(name.startswith('Яблоко') for name in received[:6])
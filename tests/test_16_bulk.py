@@ -0,0 +1,97 @@
+import pytest
+
+from .common import auth_client, create_reviews, create_titles
+
+
+class Test16BulkCreate:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_bulk_reviews(self, admin_client, admin, user, django_assert_max_num_queries):
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        admin_client.post(f'/api/v1/titles/{titles[1]["id"]}/reviews/', data={'text': 'Был', 'score': 1})
+        items = [
+            {'title': titles[0]['id'], 'text': 'Первый', 'score': 6},
+            {'title': titles[0]['id'], 'text': 'От пользователя', 'score': 10, 'author': user.username},
+            {'title': titles[1]['id'], 'text': 'Повтор', 'score': 5},
+            {'title': titles[0]['id'], 'text': 'Повтор в пачке', 'score': 5},
+            {'title': 0, 'text': 'Нет произведения', 'score': 5},
+            {'title': titles[1]['id'], 'text': 'Плохая оценка', 'score': 11},
+            {'title': titles[1]['id'], 'text': 'Нет автора', 'score': 3, 'author': 'nobody'},
+        ]
+        with django_assert_max_num_queries(12):
+            response = admin_client.post('/api/v1/reviews/bulk/', data=items, format='json')
+        assert response.status_code == 207, (
+            'Проверьте, что при частично успешной пакетной загрузке возвращается статус 207'
+        )
+        results = response.json()['results']
+        assert [result['status'] for result in results] == [201, 201, 400, 400, 400, 400, 400]
+        assert Review.objects.get(id=results[1]['id']).author == user
+        assert Review.objects.get(id=results[0]['id']).text == 'Первый', (
+            'Проверьте, что в ответе возвращаются id созданных отзывов'
+        )
+        title = Title.objects.get(id=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (16, 2), (
+            'Проверьте, что пакетная загрузка обновляет рейтинг произведения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_bulk_author_requires_admin(self, admin_client, user):
+        titles, _, _ = create_titles(admin_client)
+        client = auth_client(user)
+        response = client.post(
+            '/api/v1/reviews/bulk/',
+            data=[{'title': titles[0]['id'], 'text': 'Чужой', 'score': 5, 'author': 'TestAdmin'}],
+            format='json'
+        )
+        assert response.status_code == 207
+        assert 'author' in response.json()['results'][0]['errors']
+
+        assert client.post('/api/v1/reviews/bulk/', data={}, format='json').status_code == 400
+        assert auth_client(user).post('/api/v1/reviews/bulk/', data=[], format='json').status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_bulk_comments(self, client, admin_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        items = [{'review': review['id'], 'text': f'Комментарий {i}'} for i, review in enumerate(reviews)]
+        response = admin_client.post('/api/v1/comments/bulk/', data=items, format='json')
+        assert response.status_code == 201
+        ids = [result['id'] for result in response.json()['results']]
+        for review, comment_id in zip(reviews, ids):
+            response = client.get(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}/comments/{comment_id}/'
+            )
+            assert response.status_code == 200
+            assert response.json()['review'] == review['text']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_bulk_reviews_race(self, admin_client, admin, user):
+        from unittest import mock
+
+        from api import bulk
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        check_reviews = bulk._check_reviews
+
+        def check_then_race(valid, errors):
+            check_reviews(valid, errors)
+            # Такой же отзыв успевает сохранить другой запрос.
+            Review.objects.create(title_id=titles[0]['id'], author=admin, text='Гонка', score=1)
+
+        items = [
+            {'title': titles[0]['id'], 'text': 'Опоздал', 'score': 6},
+            {'title': titles[0]['id'], 'text': 'От пользователя', 'score': 10, 'author': user.username},
+        ]
+        with mock.patch.object(bulk, '_check_reviews', check_then_race):
+            response = admin_client.post('/api/v1/reviews/bulk/', data=items, format='json')
+        assert response.status_code == 207, (
+            'Проверьте, что одновременно сохранённый дубликат отзыва '
+            'возвращается ошибкой элемента, а не ошибкой сервера'
+        )
+        results = response.json()['results']
+        assert [result['status'] for result in results] == [400, 201]
+        assert Review.objects.get(id=results[1]['id']).author == user
+        title = Title.objects.get(id=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (11, 2)
@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+import os
+
+import pytest
+from django.core.management import call_command
+
+from .common import create_comments
+from .conftest import MANAGE_PATH
+
+DATA_DIR = os.path.join(MANAGE_PATH, 'static', 'data')
+
+
+def read_csv(path):
+    with open(path, encoding='utf8', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+class Test17Export:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_stream_titles_ndjson(self, client, admin_client, admin):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        response = client.get('/api/v1/export/titles.ndjson', HTTP_ACCEPT='application/x-ndjson')
+        assert response.status_code == 200 and response.streaming, (
+            'Проверьте, что выгрузка `/api/v1/export/titles.ndjson` отдаётся потоком'
+        )
+        documents = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).decode().splitlines()
+        ]
+        api_title = client.get(f'/api/v1/titles/{titles[0]["id"]}/').json()
+        exported = next(doc for doc in documents if doc['id'] == titles[0]['id'])
+        assert exported == api_title, (
+            'Проверьте, что произведение в NDJSON совпадает с ответом API'
+        )
+
+        response = client.get('/api/v1/export/comments.csv')
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        assert len(rows) == 3 and rows[0]['review_id'] == str(reviews[0]['id'])
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_users_export_admin_only(self, client, admin_client):
+        assert client.get('/api/v1/export/users.csv').status_code in (401, 403)
+        assert admin_client.get('/api/v1/export/users.csv').status_code == 200
+        assert client.get('/api/v1/export/secrets.csv').status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_csv_round_trip(self, tmpdir):
+        call_command('loadyamdbdata', data_dir=DATA_DIR)
+        call_command('exportyamdbdata', str(tmpdir))
+        for name in ('users', 'category', 'genre', 'titles', 'genre_title', 'review', 'comments'):
+            original = read_csv(os.path.join(DATA_DIR, f'{name}.csv'))
+            exported = read_csv(os.path.join(str(tmpdir), f'{name}.csv'))
+            key = lambda row: int(row['id'])  # noqa: E731
+            for source, result in zip(sorted(original, key=key), sorted(exported, key=key)):
+                assert {column: result[column] for column in source} == source, (
+                    f'Проверьте, что `exportyamdbdata` выгружает `{name}.csv` в формате loadyamdbdata'
+                )
+            assert len(original) == len(exported)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_error_bodies(self, client, user_client):
+        for response, status_code in (
+            (client.get('/api/v1/export/users.csv', HTTP_ACCEPT='text/csv'), 401),
+            (client.get('/api/v1/export/users.csv', HTTP_AUTHORIZATION='Bearer broken'), 401),
+            (user_client.get('/api/v1/export/users.csv'), 403),
+            (client.get('/api/v1/export/secrets.csv'), 404),
+        ):
+            assert response.status_code == status_code
+            assert response['Content-Type'] == 'application/json', (
+                'Проверьте, что ошибки выгрузки отдаются в JSON'
+            )
+            assert 'detail' in response.json(), (
+                'Проверьте, что в ответе с ошибкой выгрузки есть поле `detail`'
+            )
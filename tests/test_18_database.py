@@ -0,0 +1,93 @@
+import pytest
+
+
+class Test18Database:
+
+    @pytest.mark.django_db
+    def test_01_sqlite_pragmas(self):
+        from django.db import connection
+
+        if connection.vendor != 'sqlite':
+            pytest.skip('Проверка только для SQLite')
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            assert cursor.fetchone()[0] == 20000, (
+                'Проверьте, что для соединений SQLite задаётся `busy_timeout`'
+            )
+            cursor.execute('PRAGMA synchronous')
+            assert cursor.fetchone()[0] == 1, (
+                'Проверьте, что для соединений SQLite задаётся `synchronous = NORMAL`'
+            )
+
+    def test_02_settings_from_environment(self, monkeypatch):
+        import importlib
+
+        from api_yamdb import settings
+
+        monkeypatch.setenv('DB_ENGINE', 'core.db.pooled_postgresql')
+        monkeypatch.setenv('DB_NAME', 'yamdb')
+        monkeypatch.setenv('DB_POOL_MAX_SIZE', '5')
+        try:
+            reloaded = importlib.reload(settings)
+            database = reloaded.DATABASES['default']
+            assert database['ENGINE'] == 'core.db.pooled_postgresql'
+            assert database['NAME'] == 'yamdb'
+            assert database['POOL']['MAX_SIZE'] == 5
+            assert database['CONN_MAX_AGE'] == 0, (
+                'Проверьте, что с пулом соединений CONN_MAX_AGE равен 0'
+            )
+        finally:
+            monkeypatch.undo()
+            importlib.reload(settings)
+
+    def test_03_pool_waits_for_free_connection(self):
+        import threading
+        import time
+
+        from core.db.pooled_postgresql.pool import BlockingPool, PoolTimeout
+
+        class Connections:
+            """Пул с поведением ThreadedConnectionPool при исчерпании."""
+
+            def __init__(self, size):
+                self.free = list(range(size))
+
+            def getconn(self):
+                if not self.free:
+                    raise RuntimeError('connection pool exhausted')
+                return self.free.pop()
+
+            def putconn(self, connection, close=False):
+                self.free.append(connection)
+
+        pool = BlockingPool(Connections(1), max_size=1, timeout=2)
+        first = pool.getconn()
+        threading.Timer(0.1, pool.putconn, (first,)).start()
+        started = time.monotonic()
+        assert pool.getconn() == first, (
+            'Проверьте, что при исчерпании пула соединение ожидается, а не выдаётся ошибка'
+        )
+        assert time.monotonic() - started >= 0.05
+
+        pool.timeout = 0.05
+        with pytest.raises(PoolTimeout):
+            pool.getconn()
+
+    def test_04_pooled_backend_settings(self):
+        pytest.importorskip('psycopg2')
+        from core.db.pooled_postgresql.base import DatabaseWrapper, _pools
+        from core.db.pooled_postgresql.pool import BlockingPool
+
+        wrapper = DatabaseWrapper({
+            'ENGINE': 'core.db.pooled_postgresql', 'NAME': 'yamdb',
+            'USER': '', 'PASSWORD': '', 'HOST': '', 'PORT': '',
+            'OPTIONS': {}, 'TIME_ZONE': None, 'CONN_MAX_AGE': 0,
+            'AUTOCOMMIT': True, 'ATOMIC_REQUESTS': False,
+            'POOL': {'MIN_SIZE': 0, 'MAX_SIZE': 3, 'TIMEOUT': 1},
+        }, alias='pool-test')
+        try:
+            pool = wrapper.get_pool({'dbname': 'yamdb'})
+            assert isinstance(pool, BlockingPool) and pool.timeout == 1
+            assert wrapper.get_pool({'dbname': 'yamdb'}) is pool
+        finally:
+            _pools.pop('pool-test', None)
@@ -0,0 +1,183 @@
+import pytest
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from reviews.models import Title
+
+REPLICAS = ['replica_0', 'replica_1']
+
+
+def route(method, path, **extra):
+    from core.middleware import ReplicaRoutingMiddleware
+
+    used = []
+
+    def get_response(request):
+        used.append(router.db_for_read(Title))
+        return HttpResponse(status=201 if method == 'post' else 200)
+
+    request = getattr(RequestFactory(), method)(path, **extra)
+    response = ReplicaRoutingMiddleware(get_response)(request)
+    return used[0], response
+
+
+class Test19Replicas:
+
+    @pytest.fixture(autouse=True)
+    def replicas(self, settings):
+        settings.REPLICA_DATABASES = REPLICAS
+
+    def test_01_safe_requests_use_replicas(self):
+        database, _ = route('get', '/api/v1/titles/')
+        assert database in REPLICAS, (
+            'Проверьте, что GET-запросы к каталогу читают с реплик'
+        )
+        database, _ = route('get', '/api/v1/titles/1/reviews/2/comments/')
+        assert database in REPLICAS
+        database, _ = route('get', '/api/v1/users/me/')
+        assert database == 'default', (
+            'Проверьте, что остальные запросы читают из основной БД'
+        )
+        assert router.db_for_read(Title) == 'default', (
+            'Проверьте, что вне запроса чтение идёт из основной БД'
+        )
+        assert router.db_for_write(Title) == 'default'
+
+    def test_02_writer_is_pinned_to_primary(self):
+        headers = {'HTTP_AUTHORIZATION': 'Bearer token'}
+        database, response = route('post', '/api/v1/titles/', **headers)
+        assert database == 'default'
+        assert 'yamdb_primary' in response.cookies
+
+        database, _ = route('get', '/api/v1/titles/', **headers)
+        assert database == 'default', (
+            'Проверьте, что после записи клиент читает из основной БД'
+        )
+        database, _ = route(
+            'get', '/api/v1/titles/', HTTP_AUTHORIZATION='Bearer other'
+        )
+        assert database in REPLICAS
+
+    def test_03_replicas_from_environment(self, monkeypatch, tmp_path):
+        import importlib
+
+        from api_yamdb import settings
+
+        first, second = tmp_path / 'first.sqlite3', tmp_path / 'second.sqlite3'
+        monkeypatch.setenv('DB_REPLICAS', f'{first},{second}')
+        try:
+            reloaded = importlib.reload(settings)
+            assert reloaded.REPLICA_DATABASES == REPLICAS
+            assert reloaded.DATABASES['replica_1']['NAME'] == str(second)
+            assert reloaded.DATABASES['replica_0']['TEST'] == {
+                'MIRROR': 'default'
+            }
+        finally:
+            monkeypatch.undo()
+            importlib.reload(settings)
+
+
+@pytest.mark.django_db
+def test_replica_disabled_by_default(client):
+    response = client.get('/api/v1/titles/')
+    assert response.status_code == 200
+    assert 'yamdb_primary' not in response.cookies
+
+
+# Запускается в отдельном процессе: настройки читают основную БД
+# и реплики из окружения при старте, как в рабочем развёртывании.
+TWO_FILES_SCRIPT = '''
+import json
+import os
+import sqlite3
+
+import django
+from django.core.management import call_command
+from django.db import connections
+from django.test import Client
+from django.test.utils import setup_test_environment
+
+django.setup()
+setup_test_environment()
+
+from rest_framework_simplejwt.tokens import AccessToken  # noqa: E402
+
+from reviews.models import Title  # noqa: E402
+from users.models import User  # noqa: E402
+
+call_command('migrate', run_syncdb=True, verbosity=0)
+connections.close_all()
+with sqlite3.connect(os.environ['DB_NAME']) as primary:
+    with sqlite3.connect(os.environ['DB_REPLICAS']) as replica:
+        primary.backup(replica)
+
+admin = User.objects.create_user(username='admin', role='admin')
+Title.objects.create(name='primary', year=2000)
+Title.objects.using('replica_0').create(name='replica', year=2000)
+
+
+def names(client, path):
+    return sorted(row['name'] for row in client.get(path).json()['results'])
+
+
+def rows(path):
+    with sqlite3.connect(path) as database:
+        return sorted(row[0] for row in database.execute(
+            'SELECT slug FROM reviews_category'
+        ))
+
+
+reader, writer = Client(), Client()
+result = {'anonymous': names(reader, '/api/v1/titles/')}
+writer.post(
+    '/api/v1/categories/', {'name': 'Фильм', 'slug': 'films'},
+    HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(admin)}'
+)
+result['writer'] = names(writer, '/api/v1/categories/')
+result['reader'] = names(reader, '/api/v1/categories/')
+connections.close_all()
+result['primary_rows'] = rows(os.environ['DB_NAME'])
+result['replica_rows'] = rows(os.environ['DB_REPLICAS'])
+print(json.dumps(result))
+'''
+
+
+def test_reads_and_writes_hit_their_files(tmp_path):
+    import json
+    import os
+    import subprocess
+    import sys
+
+    primary, replica = tmp_path / 'primary.sqlite3', tmp_path / 'replica.sqlite3'
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': 'api_yamdb.settings',
+        'DB_NAME': str(primary),
+        'DB_REPLICAS': str(replica),
+        # Без общего кэша ответов: каждое чтение идёт в БД.
+        'CACHE_BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    }
+    project = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'api_yamdb')
+    completed = subprocess.run(
+        [sys.executable, '-c', TWO_FILES_SCRIPT],
+        cwd=project, env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert completed.returncode == 0, completed.stderr
+    result = json.loads(completed.stdout.splitlines()[-1])
+
+    assert result['anonymous'] == ['replica'], (
+        'Проверьте, что GET-запросы к каталогу читают файл реплики'
+    )
+    assert result['primary_rows'] == ['films'], (
+        'Проверьте, что запись идёт в файл основной БД'
+    )
+    assert result['replica_rows'] == [], (
+        'Проверьте, что запись не попадает в файл реплики'
+    )
+    assert result['writer'] == ['Фильм'], (
+        'Проверьте, что после записи клиент читает файл основной БД'
+    )
+    assert result['reader'] == [], (
+        'Проверьте, что остальные клиенты по-прежнему читают реплику'
+    )
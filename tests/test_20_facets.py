@@ -0,0 +1,121 @@
+import json
+
+import pytest
+
+from .common import create_titles
+
+
+def counts(response, facet, key='slug'):
+    assert response.status_code == 200
+    return {row[key]: row['count'] for row in response.json()[facet]}
+
+
+def stored_facets():
+    from reviews.models import TitleFacet
+
+    return sorted(TitleFacet.objects.values_list(
+        'category_id', 'year', 'genre_id', 'count'
+    ), key=repr)
+
+
+class Test20Facets:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_facet_counts(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+
+        response = client.get('/api/v1/titles/facets/')
+        assert counts(response, 'genre') == {
+            'comedy': 1, 'drama': 1, 'horror': 1
+        }
+        assert counts(response, 'category') == {'books': 1, 'films': 1}
+        assert counts(response, 'year', 'year') == {2000: 1, 2020: 1}
+
+        response = client.get('/api/v1/titles/facets/?genre=horror')
+        assert counts(response, 'category') == {'films': 1}, (
+            'Проверьте, что фасеты учитывают текущие фильтры'
+        )
+        assert counts(response, 'year', 'year') == {2000: 1}
+        assert counts(response, 'genre') == {
+            'comedy': 1, 'drama': 1, 'horror': 1
+        }, 'Проверьте, что фасет не учитывает фильтр по своему измерению'
+
+        response = client.get('/api/v1/titles/facets/?category=books')
+        assert counts(response, 'genre') == {'drama': 1}
+
+        response = client.get('/api/v1/titles/facets/?name=Пов')
+        assert counts(response, 'genre') == {'comedy': 1, 'horror': 1}, (
+            'Проверьте, что фасеты учитывают фильтр по названию'
+        )
+
+        response = client.get('/api/v1/titles/facets/?year=abc')
+        assert response.status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_counts_follow_writes(self, client, admin_client):
+        from django.core.management import call_command
+
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(f'/api/v1/titles/{titles[0]["id"]}/', data=json.dumps({
+            'category': 'books', 'year': 2020, 'genre': ['comedy', 'drama']
+        }), content_type='application/json')
+        response = client.get('/api/v1/titles/facets/?category=books')
+        assert counts(response, 'genre') == {'comedy': 1, 'drama': 2}, (
+            'Проверьте, что счётчики обновляются при изменении произведения'
+        )
+        assert counts(response, 'year', 'year') == {2020: 2}
+
+        admin_client.delete('/api/v1/genres/drama/')
+        admin_client.delete('/api/v1/categories/books/')
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Новое', 'year': 1999, 'genre': ['horror'],
+            'category': 'films'
+        })
+        admin_client.delete(f'/api/v1/titles/{titles[1]["id"]}/')
+
+        maintained = stored_facets()
+        call_command('rebuildfacets')
+        assert maintained == stored_facets(), (
+            'Проверьте, что сохранённые счётчики совпадают с пересчитанными'
+        )
+        response = client.get('/api/v1/titles/facets/')
+        assert counts(response, 'genre') == {'comedy': 1, 'horror': 1}
+        assert counts(response, 'category') == {'films': 1}
+
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_facet_rows_are_unique(self):
+        from unittest import mock
+
+        from django.db import IntegrityError, transaction
+        from django.db.models import QuerySet
+
+        from reviews.facets import change_facets
+        from reviews.models import Category, Genre, TitleFacet
+
+        category = Category.objects.create(name='Уникальная', slug='unique-cat')
+        genre = Genre.objects.create(name='Уникальный', slug='unique-genre')
+        for category_id in (category.pk, None):
+            for genre_id in (genre.pk, None):
+                TitleFacet.objects.create(
+                    category_id=category_id, year=1900, genre_id=genre_id, count=1
+                )
+                with pytest.raises(IntegrityError), transaction.atomic():
+                    TitleFacet.objects.create(
+                        category_id=category_id, year=1900, genre_id=genre_id, count=1
+                    )
+
+        # Строку вставил одновременный запрос после неудачного UPDATE:
+        # счётчик добавляется к ней, а не к новой строке.
+        original_update = QuerySet.update
+        calls = []
+
+        def update_missing_once(queryset, **kwargs):
+            calls.append(kwargs)
+            return 0 if len(calls) == 1 else original_update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, 'update', update_missing_once):
+            change_facets([(category.pk, 1900, None)], 2)
+        assert TitleFacet.objects.get(
+            category=category, year=1900, genre=None
+        ).count == 3
@@ -0,0 +1,76 @@
+import json
+import logging
+
+import pytest
+
+from .common import create_titles
+
+
+class RecordsHandler(logging.Handler):
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def profile_log():
+    logger = logging.getLogger('core.profiling')
+    handler = RecordsHandler()
+    logger.addHandler(handler)
+    yield handler.records
+    logger.removeHandler(handler)
+
+
+def timings(response):
+    return {
+        metric.split(';')[0]: metric
+        for metric in response['Server-Timing'].split(', ')
+    }
+
+
+class Test21Profiling:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_profile_by_header(self, client, admin_client, profile_log, settings):
+        settings.PROFILING_SECRET = 'profiling-secret'
+        create_titles(admin_client)
+        response = client.get('/api/v1/titles/')
+        assert not response.has_header('Server-Timing'), (
+            'Проверьте, что без заголовка X-Profile запрос не профилируется'
+        )
+        response = client.get('/api/v1/titles/?year=1999', HTTP_X_PROFILE='1')
+        assert not response.has_header('Server-Timing'), (
+            'Проверьте, что анонимный клиент без секрета не включает профилирование'
+        )
+        assert profile_log == []
+
+        response = client.get(
+            '/api/v1/titles/?year=2000', HTTP_X_PROFILE='profiling-secret'
+        )
+        assert response.status_code == 200
+        metrics = timings(response)
+        assert set(metrics) == {
+            'sql', 'auth', 'permissions', 'serializer', 'render', 'total'
+        }, 'Проверьте, что заголовок Server-Timing содержит все отрезки'
+        assert 'queries' in metrics['sql']
+
+        record = json.loads(profile_log[-1].getMessage())
+        assert record['path'] == '/api/v1/titles/'
+        assert record['status'] == 200
+        assert record['queries'] > 0
+        assert record['serializer_ms'] > 0
+        assert 0 < len(record['slowest']) <= 5
+        assert record['slowest'][0]['ms'] == max(
+            query['ms'] for query in record['slowest']
+        ), 'Проверьте, что самые медленные запросы идут первыми'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_sampling(self, client, settings, profile_log):
+        settings.PROFILING_SAMPLE_RATE = 1
+        response = client.get('/api/v1/genres/')
+        assert response.has_header('Server-Timing')
+        assert len(profile_log) == 1
@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import pytest
+
+from .common import create_titles
+
+
+def call_asgi(application, method, path, body=b'', headers=()):
+    scope = {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'root_path': '',
+        'query_string': b'',
+        'headers': [(b'host', b'testserver'), *headers],
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 0),
+    }
+    messages = [{'type': 'http.request', 'body': body}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(application(scope, receive, send))
+    status = sent[0]['status']
+    return status, b''.join(message.get('body', b'') for message in sent[1:])
+
+
+@pytest.fixture
+def application():
+    from django.core.wsgi import get_wsgi_application
+
+    from core.asgi import ThreadPoolASGIHandler
+
+    handler = ThreadPoolASGIHandler(
+        get_wsgi_application(), read_workers=2, workers=1
+    )
+    yield handler
+    handler.shutdown()
+
+
+class Test22Asgi:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_read_path(self, client, admin_client, application):
+        titles, _, _ = create_titles(admin_client)
+        for path in ('/api/v1/titles/', f'/api/v1/titles/{titles[0]["id"]}/'):
+            status, body = call_asgi(application, 'GET', path)
+            assert status == 200
+            assert json.loads(body) == client.get(path).json(), (
+                'Проверьте, что ответ через ASGI совпадает с ответом WSGI'
+            )
+        assert application.get_pool({
+            'method': 'GET', 'path': '/api/v1/titles/'
+        }) is application.read_pool
+        assert application.get_pool({
+            'method': 'POST', 'path': '/api/v1/titles/'
+        }) is application.pool
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_request_body(self, application):
+        from django.core import mail
+        from django.core.management import call_command
+
+        status, _ = call_asgi(
+            application, 'POST', '/api/v1/auth/signup/',
+            json.dumps({'username': 'asgi', 'email': 'asgi@yamdb.fake'}).encode(),
+            [(b'content-type', b'application/json')]
+        )
+        assert status == 200
+        call_command('sendoutbox')
+        assert mail.outbox[-1].to == ['asgi@yamdb.fake']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_load_test(self):
+        from core import benchmark, loadtest
+
+        benchmark.seed(titles=20, reviews=20, comments=20, genres=2, categories=2)
+        report = loadtest.run(connections=12, threads=2, client_delay=0.01)
+        assert [result['mode'] for result in report['results']] == ['wsgi', 'asgi']
+        for result in report['results']:
+            assert result['connections'] == 12
+            assert result['errors'] == 0, (
+                'Проверьте, что горячие запросы на чтение выполняются без ошибок'
+            )
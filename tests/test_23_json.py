@@ -0,0 +1,86 @@
+import datetime
+import decimal
+from io import BytesIO
+
+import pytest
+
+from .common import create_titles
+
+PAYLOADS = [
+    {'text': 'строка   с   разделителями', 'none': None},
+    {'floats': [0.1, 1e16, 1e-05, 2.0, -0.0, 123456789.123]},
+    {'when': datetime.datetime(
+        2021, 5, 1, 10, 20, 30, 123456, tzinfo=datetime.timezone.utc
+    ), 'day': datetime.date(2021, 5, 1), 'time': datetime.time(1, 2, 3, 4000)},
+    {'decimal': decimal.Decimal('1.50'), 'big': 2 ** 70, 'tuple': (1, 2)},
+    {1: 'не строковый ключ'},
+    [],
+]
+
+
+class Test23Json:
+
+    @pytest.mark.parametrize('data', PAYLOADS)
+    def test_01_renderer_output_identical(self, data):
+        from rest_framework.renderers import JSONRenderer
+
+        from api.renderers import FastJSONRenderer
+
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data), (
+            'Проверьте, что FastJSONRenderer побайтно совпадает с JSONRenderer'
+        )
+        assert FastJSONRenderer().render(
+            data, 'application/json; indent=4'
+        ) == JSONRenderer().render(data, 'application/json; indent=4')
+
+    @pytest.mark.parametrize('body', [
+        b'{"a": [1, 2.5, "\\u00e9"], "b": null}',
+        b'{"big": 123456789012345678901234567890}',
+        b'"\\ud800"',
+    ])
+    def test_02_parser_result_identical(self, body):
+        from rest_framework.parsers import JSONParser
+
+        from api.parsers import FastJSONParser
+
+        assert FastJSONParser().parse(BytesIO(body)) == JSONParser().parse(
+            BytesIO(body)
+        )
+
+    def test_03_parser_errors(self):
+        from rest_framework.exceptions import ParseError
+        from rest_framework.parsers import JSONParser
+
+        from api.parsers import FastJSONParser
+
+        with pytest.raises(ParseError) as fast_error:
+            FastJSONParser().parse(BytesIO(b'{"a": NaN}'))
+        with pytest.raises(ParseError) as error:
+            JSONParser().parse(BytesIO(b'{"a": NaN}'))
+        assert str(fast_error.value) == str(error.value)
+
+    @pytest.mark.parametrize('backend', ['auto', 'stdlib'])
+    @pytest.mark.django_db(transaction=True)
+    def test_04_api_responses(self, client, admin_client, settings, backend):
+        from rest_framework.renderers import JSONRenderer
+
+        from api.renderers import FastJSONRenderer
+
+        settings.API_JSON_BACKEND = backend
+        titles, _, _ = create_titles(admin_client)
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert isinstance(response.accepted_renderer, FastJSONRenderer), (
+            'Проверьте, что API по умолчанию отдаёт JSON через FastJSONRenderer'
+        )
+        assert response.content == JSONRenderer().render(response.data)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_micro_benchmark(self):
+        from core import benchmark, json_benchmark
+
+        benchmark.seed(titles=20, reviews=20, comments=20, genres=2, categories=2)
+        report = json_benchmark.run(iterations=2)
+        assert len(report['payloads']) == 4
+        assert all(
+            result['identical'] for result in report['payloads'].values()
+        ), 'Проверьте, что быстрые рендерер и парсер дают тот же результат'
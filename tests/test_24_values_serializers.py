@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from .common import create_comments
+
+
+def rendered(data):
+    from rest_framework.renderers import JSONRenderer
+
+    return json.loads(JSONRenderer().render(data))
+
+
+class Test24ValuesSerializers:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_same_output_as_model_serializers(self, client, admin_client, admin):
+        from api.serializers import (CommentSerializer, ReviewSerializer,
+                                     TitleReadSerializer)
+        from reviews.models import Comment, Review, Title
+
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Без категории', 'year': 1990, 'genre': ['drama'], 'category': 'books'
+        })
+        admin_client.delete('/api/v1/categories/books/')
+
+        response = client.get('/api/v1/titles/')
+        expected = TitleReadSerializer(
+            Title.objects.prefetch_related('genre').order_by('name', 'id'), many=True
+        ).data
+        assert response.json()['results'] == rendered(expected), (
+            'Проверьте, что список произведений выводится как TitleReadSerializer'
+        )
+        assert any(title['category'] is None for title in response.json()['results'])
+        assert response.json()['results'][1]['rating'] == 4
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        response = client.get(f'/api/v1/titles/{title.pk}/')
+        assert response.json() == rendered(TitleReadSerializer(title).data)
+
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        expected = ReviewSerializer(
+            Review.objects.filter(title=title).order_by('-pub_date'), many=True
+        ).data
+        assert client.get(url).json()['results'] == rendered(expected), (
+            'Проверьте, что список отзывов выводится как ReviewSerializer'
+        )
+        review = Review.objects.get(pk=reviews[0]['id'])
+        assert client.get(f'{url}{review.pk}/').json() == rendered(
+            ReviewSerializer(review).data
+        )
+
+        url = f'{url}{review.pk}/comments/'
+        expected = CommentSerializer(
+            Comment.objects.filter(review=review).order_by('-pub_date'), many=True
+        ).data
+        assert client.get(url).json()['results'] == rendered(expected), (
+            'Проверьте, что список комментариев выводится как CommentSerializer'
+        )
+        comment = Comment.objects.get(pk=comments[0]['id'])
+        assert client.get(f'{url}{comment.pk}/').json() == rendered(
+            CommentSerializer(comment).data
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_writes_use_model_serializers(self, admin_client, admin):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        response = admin_client.patch(url, data=json.dumps({'text': 'новый'}),
+                                      content_type='application/json')
+        assert response.status_code == 200
+        assert response.json()['text'] == 'новый'
+        assert response.json()['author'] == admin.username
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_default_representation(self, admin_client):
+        from api.serializers import ValuesSerializer
+        from reviews.models import Genre
+
+        admin_client.post('/api/v1/genres/', data={'name': 'Рок', 'slug': 'rock'})
+
+        class GenreValuesSerializer(ValuesSerializer):
+            values_fields = ('name', 'slug')
+
+        rows = GenreValuesSerializer.values(Genre.objects.all())
+        assert GenreValuesSerializer(rows, many=True).data == [
+            {'name': 'Рок', 'slug': 'rock'}
+        ], (
+            'Проверьте, что по умолчанию ValuesSerializer выводит '
+            'поля values_fields как есть'
+        )
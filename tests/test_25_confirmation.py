@@ -0,0 +1,132 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from users.confirmation import create_code, hash_code
+from users.models import ConfirmationCode, User
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+URL_TOKEN = '/api/v1/auth/token/'
+
+
+def signup(client, username):
+    response = client.post(URL_SIGNUP, data={
+        'username': username, 'email': f'{username}@yamdb.fake'
+    })
+    assert response.status_code == 200
+    call_command('sendoutbox')
+    return re.search(r'код (\S+)', mail.outbox[-1].body).group(1)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Confirmation:
+
+    def test_01_code_is_stored_hashed(self, client):
+        code = signup(client, 'hashed')
+        confirmation = ConfirmationCode.objects.get(user__username='hashed')
+        assert confirmation.code_hash != code
+        assert confirmation.code_hash == hash_code(code), (
+            'Проверьте, что код подтверждения хранится в виде HMAC'
+        )
+        response = client.post(URL_TOKEN, data={
+            'username': 'hashed', 'confirmation_code': code
+        })
+        assert response.status_code == 200
+        assert 'token' in response.json()
+
+    def test_02_expired_code_is_rejected(self, client):
+        user = User.objects.create(username='late', email='late@yamdb.fake')
+        code = create_code(user)
+        ConfirmationCode.objects.filter(user=user).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        response = client.post(URL_TOKEN, data={
+            'username': 'late', 'confirmation_code': code
+        })
+        assert response.status_code == 400, (
+            'Проверьте, что по истёкшему коду токен не выдаётся'
+        )
+
+    def test_03_token_lookup_is_single_query(self, client):
+        user = User.objects.create(username='fast', email='fast@yamdb.fake')
+        code = create_code(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(URL_TOKEN, data={
+                'username': 'fast', 'confirmation_code': code
+            })
+        assert response.status_code == 200
+        selects = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+        ]
+        assert len(selects) == 1, (
+            'Проверьте, что пользователь и код загружаются одним запросом'
+        )
+
+    def test_04_username_is_throttled(self, client, settings):
+        settings.AUTH_THROTTLE_RATES = {'ip': '100/min', 'username': '3/min'}
+        User.objects.create(username='target', email='target@yamdb.fake')
+        statuses = [
+            client.post(URL_TOKEN, data={
+                'username': 'target', 'confirmation_code': 'wrong'
+            }).status_code
+            for _ in range(4)
+        ]
+        assert statuses == [400, 400, 400, 429], (
+            'Проверьте, что попытки подобрать код для одного имени '
+            'пользователя ограничены'
+        )
+        response = client.post(URL_TOKEN, data={
+            'username': 'other', 'confirmation_code': 'wrong'
+        })
+        assert response.status_code == 404
+
+    def test_05_ip_is_throttled(self, client, settings):
+        settings.AUTH_THROTTLE_RATES = {'ip': '2/min', 'username': '100/min'}
+        for index in range(2):
+            response = client.post(URL_TOKEN, data={'username': f'u{index}'})
+            assert response.status_code == 404
+        response = client.post(URL_TOKEN, data={'username': 'u3'})
+        assert response.status_code == 429
+        assert int(response['Retry-After']) > 0
+        response = client.post(
+            URL_TOKEN, data={'username': 'u3'}, REMOTE_ADDR='10.1.1.1'
+        )
+        assert response.status_code == 404
+
+    def test_06_code_is_single_use(self, client):
+        user = User.objects.create(username='once', email='once@yamdb.fake')
+        code = create_code(user)
+        data = {'username': 'once', 'confirmation_code': code}
+        assert client.post(URL_TOKEN, data=data).status_code == 200
+        assert client.post(URL_TOKEN, data=data).status_code == 400, (
+            'Проверьте, что код подтверждения нельзя использовать повторно'
+        )
+        assert not ConfirmationCode.objects.filter(user=user).exists()
+
+    def test_07_forwarded_for_does_not_split_ip_bucket(self, client,
+                                                       settings):
+        settings.AUTH_THROTTLE_RATES = {'ip': '2/min', 'username': '100/min'}
+        statuses = [
+            client.post(
+                URL_TOKEN, data={'username': f'u{index}'},
+                HTTP_X_FORWARDED_FOR=f'10.2.0.{index}'
+            ).status_code
+            for index in range(6)
+        ]
+        assert statuses == [404, 404, 429, 429, 429, 429], (
+            'Проверьте, что адрес клиента не берётся из X-Forwarded-For '
+            'без доверенных прокси'
+        )
+
+    def test_08_non_object_body(self, client):
+        response = client.post(
+            URL_TOKEN, data='[1, 2]', content_type='application/json'
+        )
+        assert response.status_code == 400
@@ -0,0 +1,97 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from users.authentication import StatelessJWTAuthentication
+from users.tokens import RoleAccessToken, get_token_version, revoke_tokens
+
+
+def authenticate(token):
+    request = APIRequestFactory().get(
+        '/api/v1/titles/', HTTP_AUTHORIZATION=f'Bearer {token}'
+    )
+    return StatelessJWTAuthentication().authenticate(request)[0]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26StatelessTokens:
+
+    def test_01_user_from_claims_without_queries(self, admin):
+        token = RoleAccessToken.for_user(admin)
+        assert token['role'] == 'admin' and token['ver'] == 0
+        get_token_version(admin.pk)
+        with CaptureQueriesContext(connection) as queries:
+            user = authenticate(token)
+            assert (user.pk, user.username, user.role, user.is_superuser) == (
+                admin.pk, 'TestAdmin', 'admin', False
+            )
+        assert len(queries) == 0, (
+            'Проверьте, что пользователь строится из токена без запросов к БД'
+        )
+        assert user.email == admin.email, (
+            'Проверьте, что остальные поля загружаются при обращении'
+        )
+
+    def test_02_role_change_revokes_tokens(self, user):
+        token = RoleAccessToken.for_user(user)
+        authenticate(token)
+        user.bio = 'другое описание'
+        user.save()
+        assert authenticate(token).role == 'user', (
+            'Проверьте, что изменение полей вне токена его не отзывает'
+        )
+        user.role = 'admin'
+        user.save()
+        with pytest.raises(AuthenticationFailed):
+            authenticate(token)
+        assert authenticate(RoleAccessToken.for_user(user)).role == 'admin'
+
+    def test_03_revoke_and_delete(self, user, moderator):
+        token = RoleAccessToken.for_user(user)
+        revoke_tokens(user.pk)
+        with pytest.raises(AuthenticationFailed):
+            authenticate(token)
+        token = RoleAccessToken.for_user(moderator)
+        moderator.delete()
+        with pytest.raises(AuthenticationFailed):
+            authenticate(token)
+
+    def test_04_concurrent_revocations(self, user):
+        from concurrent.futures import ThreadPoolExecutor
+
+        from django.db import connections
+
+        from users.models import TokenVersion
+
+        def revoke(_):
+            try:
+                revoke_tokens(user.pk)
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(4) as pool:
+            list(pool.map(revoke, range(8)))
+        assert TokenVersion.objects.get(user=user).version == 8, (
+            'Проверьте, что одновременный отзыв токенов не теряет '
+            'увеличения версии и не падает на создании строки'
+        )
+
+    def test_05_api_with_stateless_tokens(self, admin, monkeypatch):
+        monkeypatch.setattr(
+            APIView, 'authentication_classes', [StatelessJWTAuthentication]
+        )
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(admin)}'
+        )
+        response = client.post(
+            '/api/v1/genres/', data={'name': 'Жанр', 'slug': 'stateless'}
+        )
+        assert response.status_code == 201
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == 200
+        assert response.json()['email'] == admin.email
+        assert response.json()['bio'] == admin.bio